@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# ASGI로 실행하면 응시 경로를 비동기 뷰로 제공 (ASYNC_VIEWS=False로 끌 수 있음)
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+# 요청마다 스레드가 바뀌므로 지속 연결을 재사용할 수 없음 (풀링은 pgbouncer 등 외부에서)
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
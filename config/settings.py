@@ -38,10 +38,22 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # 조회 API의 읽기 복제본 라우팅과 쓰기 후 primary 고정 (core/db_routing.py)
+    'core.middleware.ReplicaRoutingMiddleware',
 ]
 
+# 요청별 쿼리 수/DB·캐시·렌더링 시간 계측 (Server-Timing 헤더, /api/metrics/)
+REQUEST_METRICS_ENABLED = os.getenv("REQUEST_METRICS_ENABLED", "False") == "True"
+# 계측할 요청 비율 (0~1)
+REQUEST_METRICS_SAMPLE_RATE = float(os.getenv("REQUEST_METRICS_SAMPLE_RATE", 0.01))
+if REQUEST_METRICS_ENABLED:
+    MIDDLEWARE.insert(0, 'core.middleware.RequestMetricsMiddleware')
+
 ROOT_URLCONF = 'config.urls'
 
+# 응시 경로(시작/답안 저장/제출/상세)를 비동기 뷰로 제공 (config/asgi.py로 실행하면 기본값 True)
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -68,9 +80,32 @@ DATABASES = {
         'PASSWORD': os.getenv("POSTGRES_PASSWORD", "12345678"),
         'HOST': os.getenv("POSTGRES_HOST", "localhost"),
         'PORT': os.getenv("POSTGRES_PORT", "5432"),
+        # 요청마다 새로 연결하지 않고 CONN_MAX_AGE 동안 연결을 재사용. 재사용 전 연결 상태를 확인
+        'CONN_MAX_AGE': int(os.getenv("DB_CONN_MAX_AGE", 60)),
+        'CONN_HEALTH_CHECKS': os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True",
     }
 }
 
+# 읽기 복제본: 쉼표로 구분한 host[:port][/dbname] 목록. 계정은 primary와 같음
+# 설정하면 ReplicaReadMixin을 쓴 조회 API의 GET 요청이 복제본에서 읽음 (core/db_routing.py)
+DATABASE_REPLICAS = []
+for index, spec in enumerate(filter(None, os.getenv("POSTGRES_REPLICAS", "").split(",")), start=1):
+    address, _, name = spec.strip().partition("/")
+    host, _, port = address.partition(":")
+    alias = f"replica{index}"
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'NAME': name or DATABASES['default']['NAME'],
+        # 테스트에서는 별도 테스트 DB를 만들지 않고 default를 가리킴
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['core.db_routing.PrimaryReplicaRouter']
+# 쓰기를 한 사용자가 primary에서 읽는 시간(초). 복제 지연보다 길게 설정
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'Asia/Seoul'
 USE_I18N = True
@@ -81,7 +116,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication + 사용자/프로필 캐시 (users/principal.py)
+        'users.authentication.CachedJWTAuthentication',
     )
 }
 
@@ -97,18 +133,57 @@ SWAGGER_SETTINGS = {
     },
 }
 
+# 인증된 사용자/프로필 캐시 유지 시간(초)
+AUTH_PRINCIPAL_CACHE_TIMEOUT = int(os.getenv("AUTH_PRINCIPAL_CACHE_TIMEOUT", 60))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.getenv("ACCESS_TOKEN_LIFETIME", 5))),
     'REFRESH_TOKEN_LIFETIME': timedelta(minutes=int(os.getenv("REFRESH_TOKEN_LIFETIME", 60))),
 }
 
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/1")
+
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.redis.RedisCache",
-        "LOCATION": os.getenv("REDIS_URL", "redis://127.0.0.1:6379/1"),
+        "LOCATION": REDIS_URL,
     }
 }
 
+# 퀴즈별 정답표 캐시 유지 시간(초)
+ANSWER_KEY_CACHE_TIMEOUT = int(os.getenv("ANSWER_KEY_CACHE_TIMEOUT", 3600))
+# 퀴즈별 문제 ID 목록 캐시 사용 여부 (세션 시작 시 문제 추출용)
+QUESTION_ID_INDEX_CACHE = os.getenv("QUESTION_ID_INDEX_CACHE", "True") == "True"
+# 세션 시험지 스냅샷 캐시 유지 시간(초)
+SESSION_PAPER_CACHE_TIMEOUT = int(os.getenv("SESSION_PAPER_CACHE_TIMEOUT", 21600))
+
+# 세션 문제/선택지 순서를 JSON 대신 퀴즈 구성 버전 + 시드로 저장 (기존 세션은 convert_session_orders로 변환)
+COMPACT_SESSION_ORDERS = os.getenv("COMPACT_SESSION_ORDERS", "False") == "True"
+
+# 내 퀴즈 목록 캐시 유지 시간(초). 무효화가 누락된 경우의 최대 지연 시간
+MY_LIST_CACHE_TIMEOUT = int(os.getenv("MY_LIST_CACHE_TIMEOUT", 60))
+
+# 채점된 제출 세션을 보관 테이블로 옮기기까지의 기간(일). archive_sessions 명령의 기본값
+SESSION_ARCHIVE_AFTER_DAYS = int(os.getenv("SESSION_ARCHIVE_AFTER_DAYS", 365))
+
+# 답안 쓰기 버퍼 (비워두면 답안을 DB에 바로 저장)
+# 예: quiz_sessions.answer_buffer.RedisAnswerBuffer, quiz_sessions.answer_buffer.InMemoryAnswerBuffer
+ANSWER_BUFFER_BACKEND = os.getenv("ANSWER_BUFFER_BACKEND", "")
+ANSWER_BUFFER_REDIS_URL = os.getenv("ANSWER_BUFFER_REDIS_URL", REDIS_URL)
+
+# 비동기 채점 큐 (비워두면 제출 시 바로 채점)
+# 예: quiz_sessions.grading_queue.RedisGradingQueue, quiz_sessions.grading_queue.ThreadPoolGradingQueue
+GRADING_QUEUE_BACKEND = os.getenv("GRADING_QUEUE_BACKEND", "")
+GRADING_QUEUE_REDIS_URL = os.getenv("GRADING_QUEUE_REDIS_URL", REDIS_URL)
+# ThreadPoolGradingQueue 워커 스레드 수와 한 번에 채점할 최대 세션 수
+GRADING_WORKERS = int(os.getenv("GRADING_WORKERS", 2))
+GRADING_BATCH_SIZE = int(os.getenv("GRADING_BATCH_SIZE", 100))
+
+# Idempotency-Key 응답 보관 시간(초)
+IDEMPOTENCY_KEY_TIMEOUT = int(os.getenv("IDEMPOTENCY_KEY_TIMEOUT", 86400))
+# 같은 키의 요청을 처리 중으로 표시하는 시간(초). 요청 처리 시간보다 길게 설정
+IDEMPOTENCY_PENDING_TIMEOUT = int(os.getenv("IDEMPOTENCY_PENDING_TIMEOUT", 30))
+
 REST_FRAMEWORK_EXTENSIONS = {
     'DEFAULT_USE_CACHE': 'default',
 }
\ No newline at end of file
@@ -19,5 +19,6 @@ urlpatterns = [
     path('api/users/', include('users.urls')),
     path('api/sessions/', include('quiz_sessions.urls')),
     path('api/quizzes/', include('quizzes.urls')),
+    path('api/metrics/', include('core.urls')),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
 ]
@@ -0,0 +1,46 @@
+import inspect
+
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+# 비동기 APIView (ASGI 배포용)
+# DRF APIView.dispatch는 동기 함수라 핸들러가 코루틴이어도 워커 스레드에서 실행된다.
+# AsyncAPIView는 dispatch를 코루틴으로 바꿔 ASGI 이벤트 루프에서 핸들러를 await 한다.
+# 인증/권한/스로틀 검사(initial)는 JWT 사용자 조회 등 동기 ORM을 쓰므로 sync_to_async로 실행한다.
+
+
+class AsyncAPIView(APIView):
+    """HTTP 핸들러(get/post/patch...)를 async def로 정의하는 APIView"""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            # options/405 처리는 APIView의 동기 메서드를 그대로 사용
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def same_schema_as(sync_method):
+    """동기 뷰 메서드의 swagger_auto_schema 문서를 비동기 메서드에 그대로 적용"""
+    def decorator(method):
+        method._swagger_auto_schema = sync_method._swagger_auto_schema
+        return method
+    return decorator
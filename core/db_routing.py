@@ -0,0 +1,97 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+# 읽기 복제본 라우팅 (DATABASE_REPLICAS)
+# 기본적으로 모든 쿼리는 primary(default)로 간다. ReplicaReadMixin을 쓴 조회 API의 GET 요청만
+# 인증 이후의 조회를 복제본으로 보낸다. 요청 중 DB 쓰기가 있었던 사용자는 REPLICA_PIN_SECONDS 동안
+# primary에서 읽어 복제 지연 중에도 자신이 쓴 값(답안/제출)을 바로 볼 수 있다(read-your-writes).
+# 관리 명령/워커 등 요청 밖의 쿼리와 트랜잭션 안의 조회는 항상 primary를 사용한다.
+
+
+class RoutingState:
+    def __init__(self):
+        self.replica_reads = False
+        self.wrote = False
+
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def _pin_key(user_id):
+    return f"db:primary_pin:{user_id}"
+
+
+def _pin_timeout():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+
+
+def begin():
+    """요청 시작 시 라우팅 상태를 만든다. end()에 토큰을 넘겨 되돌림"""
+    return _state.set(RoutingState())
+
+
+def end(token):
+    state = _state.get()
+    _state.reset(token)
+    return state
+
+
+def allow_replica_reads(user):
+    """현재 요청의 조회를 복제본으로 보낸다. 최근에 쓰기를 한 사용자는 primary 유지"""
+    state = _state.get()
+    if state is None or not replicas():
+        return False
+    if user.is_authenticated and cache.get(_pin_key(user.pk)):
+        return False
+    state.replica_reads = True
+    return True
+
+
+def pin_to_primary(user_id):
+    cache.set(_pin_key(user_id), True, _pin_timeout())
+
+
+async def apin_to_primary(user_id):
+    await cache.aset(_pin_key(user_id), True, _pin_timeout())
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.replica_reads or state.wrote:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas())
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            # 이후 조회는 이 요청 안에서도 primary에서
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 복제본은 primary와 같은 데이터
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replicas()
+
+
+class ReplicaReadMixin:
+    """GET/HEAD 요청에서 인증 이후의 조회를 읽기 복제본으로 보내는 뷰 mixin"""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            allow_replica_reads(request.user)
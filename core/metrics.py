@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import deque
+
+from django.core.cache import caches
+from django.db import connections
+
+# 요청별 계측 (RequestMetricsMiddleware)
+# 샘플링된 요청에 대해서만 쿼리 수/DB 시간/캐시 적중/응답 렌더링 시간을 측정하고
+# URL 이름(view_name)별로 프로세스 메모리에 누적한다. 프로세스마다 따로 집계된다.
+
+RECENT_LATENCIES = 500
+
+_MISSING = object()
+
+
+class RequestMetrics:
+    """요청 하나의 측정값"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_ms = 0.0
+        self.render_started = None
+        self.render_ms = 0.0
+        self.total_ms = 0.0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_ms += (time.perf_counter() - started) * 1000
+
+    def _wrap_get(self, backend):
+        original = backend.get
+
+        def get(key, default=None, version=None):
+            started = time.perf_counter()
+            value = original(key, _MISSING, version=version)
+            self.cache_ms += (time.perf_counter() - started) * 1000
+            if value is _MISSING:
+                self.cache_misses += 1
+                return default
+            self.cache_hits += 1
+            return value
+        return get
+
+    def _wrap_get_many(self, backend):
+        original = backend.get_many
+
+        def get_many(keys, version=None):
+            keys = list(keys)
+            started = time.perf_counter()
+            found = original(keys, version=version)
+            self.cache_ms += (time.perf_counter() - started) * 1000
+            self.cache_hits += len(found)
+            self.cache_misses += len(keys) - len(found)
+            return found
+        return get_many
+
+    def install(self):
+        """현재 스레드의 DB 연결과 캐시에 계측을 건다. 반환된 함수를 호출하면 해제"""
+        undo = []
+        for connection in connections.all():
+            connection.execute_wrappers.append(self.execute_wrapper)
+            undo.append(lambda c=connection: c.execute_wrappers.remove(self.execute_wrapper))
+        for backend in caches.all():
+            # 스레드(요청)별 캐시 인스턴스의 속성만 잠시 바꾸므로 다른 요청에는 영향 없음
+            backend.get = self._wrap_get(backend)
+            backend.get_many = self._wrap_get_many(backend)
+            undo.append(lambda b=backend: (b.__dict__.pop('get', None), b.__dict__.pop('get_many', None)))
+
+        def uninstall():
+            for step in reversed(undo):
+                step()
+        return uninstall
+
+    def start_render(self):
+        self.render_started = time.perf_counter()
+
+    def finish_render(self, response):
+        if self.render_started is not None:
+            self.render_ms = (time.perf_counter() - self.render_started) * 1000
+        return response
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self):
+        return ", ".join([
+            f'db;dur={self.db_ms:.2f};desc="{self.queries} queries"',
+            f'cache;dur={self.cache_ms:.2f};desc="hit={self.cache_hits} miss={self.cache_misses}"',
+            f'render;dur={self.render_ms:.2f}',
+            f'total;dur={self.total_ms:.2f}',
+        ])
+
+
+class MetricsRegistry:
+    """view_name별 누적 통계"""
+
+    FIELDS = ['queries', 'db_ms', 'cache_hits', 'cache_misses', 'cache_ms', 'render_ms', 'total_ms']
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view_name, metrics, status_code):
+        with self._lock:
+            entry = self._views.get(view_name)
+            if entry is None:
+                entry = self._views[view_name] = {
+                    'count': 0, 'errors': 0, 'max_ms': 0.0,
+                    'totals': dict.fromkeys(self.FIELDS, 0),
+                    'recent_ms': deque(maxlen=RECENT_LATENCIES),
+                }
+            entry['count'] += 1
+            if status_code >= 500:
+                entry['errors'] += 1
+            for field in self.FIELDS:
+                entry['totals'][field] += getattr(metrics, field)
+            entry['max_ms'] = max(entry['max_ms'], metrics.total_ms)
+            entry['recent_ms'].append(metrics.total_ms)
+
+    def snapshot(self):
+        with self._lock:
+            views = {
+                name: dict(entry, totals=dict(entry['totals']), recent_ms=sorted(entry['recent_ms']))
+                for name, entry in self._views.items()
+            }
+        result = {}
+        for name, entry in views.items():
+            count = entry['count']
+            recent = entry['recent_ms']
+            summary = {'count': count, 'errors': entry['errors'], 'max_ms': round(entry['max_ms'], 2)}
+            for field, total in entry['totals'].items():
+                summary[f'avg_{field}'] = round(total / count, 2)
+            for pct in (50, 95, 99):
+                summary[f'p{pct}_ms'] = round(recent[max(0, -(-len(recent) * pct // 100) - 1)], 2)
+            result[name] = summary
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,122 @@
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from . import db_routing
+from .metrics import RequestMetrics, registry
+
+
+class RequestMetricsMiddleware:
+    """
+    요청별 쿼리 수, DB 시간, 캐시 적중/미스, 응답 렌더링 시간, 전체 지연 시간을 측정.
+    REQUEST_METRICS_SAMPLE_RATE 비율의 요청만 측정하며, 측정한 요청에는 Server-Timing 헤더를 붙인다.
+    ASGI에서는 비동기 미들웨어로 동작해 샘플링되지 않은 요청은 스레드 전환 없이 통과
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def sampled():
+        return random.random() < getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 0)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        metrics = request._metrics = RequestMetrics()
+        uninstall = metrics.install()
+        try:
+            response = self.get_response(request)
+        finally:
+            uninstall()
+        return self.record(request, metrics, response)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        # DB 연결은 스레드별 객체이므로, 이 요청의 ORM 호출이 실행되는 스레드(sync_to_async)에서 계측을 건다.
+        # 샘플링된 요청만 스레드 전환 두 번이 추가됨
+        metrics = request._metrics = RequestMetrics()
+        uninstall = await sync_to_async(metrics.install)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(uninstall)()
+        return self.record(request, metrics, response)
+
+    @staticmethod
+    def record(request, metrics, response):
+        metrics.finish()
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match and match.view_name else 'unresolved'
+        registry.record(view_name, metrics, response.status_code)
+        response['Server-Timing'] = metrics.server_timing()
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF Response는 뷰 실행 후 렌더링되므로 렌더링 구간을 직렬화 시간으로 측정
+        metrics = getattr(request, '_metrics', None)
+        if metrics is not None:
+            metrics.start_render()
+            response.add_post_render_callback(metrics.finish_render)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    요청마다 DB 라우팅 상태(core.db_routing)를 만들고, 요청 중 DB 쓰기를 한 사용자는
+    REPLICA_PIN_SECONDS 동안 primary에서 읽도록 고정. ASGI 비동기 뷰에서도 스레드 전환 없이 동작
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = db_routing.begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            state = db_routing.end(token)
+        user_id = self.written_user_id(request, state)
+        if user_id is not None:
+            db_routing.pin_to_primary(user_id)
+        return response
+
+    async def __acall__(self, request):
+        token = db_routing.begin()
+        try:
+            response = await self.get_response(request)
+        finally:
+            state = db_routing.end(token)
+        user_id = self.written_user_id(request, state)
+        if user_id is not None:
+            await db_routing.apin_to_primary(user_id)
+        return response
+
+    @staticmethod
+    def written_user_id(request, state):
+        if not state.wrote or not db_routing.replicas():
+            return None
+        # DRF가 인증한 사용자만 (세션 인증의 lazy 사용자는 평가하지 않음)
+        user = getattr(request, 'user', None)
+        if user is None or type(user) is SimpleLazyObject or not user.is_authenticated:
+            return None
+        return user.pk
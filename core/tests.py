@@ -1,3 +1,197 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import db_routing
+from core.metrics import registry
+from core.middleware import RequestMetricsMiddleware
+from core.models import Grade
+from quizzes.models import Quiz, Question, Choice
+from users.models import UserProfile
+
+METRICS_MIDDLEWARE = ['core.middleware.RequestMetricsMiddleware', *settings.MIDDLEWARE]
+
+
+@override_settings(MIDDLEWARE=METRICS_MIDDLEWARE, REQUEST_METRICS_SAMPLE_RATE=1)
+class RequestMetricsMiddlewareTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        grade = Grade.objects.create(name="1학년")
+        self.admin = User.objects.create_superuser(username="admin", password="adminpass")
+        self.user = User.objects.create_user(username="student", password="userpass")
+        UserProfile.objects.create(user=self.user, grade=grade)
+        Quiz.objects.create(title="계측 퀴즈", num_questions=1, grade=grade, created_by=self.admin)
+
+    def login_as(self, username, password):
+        token = self.client.post("/api/users/login/", {
+            "username": username, "password": password
+        }, format="json").data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_server_timing_and_metrics_endpoint(self):
+        self.login_as("student", "userpass")
+        first = self.client.get("/api/sessions/my_list/")
+        second = self.client.get("/api/sessions/my_list/")
+        self.assertEqual(first.status_code, 200)
+        timing = first["Server-Timing"]
+        for name in ("db;", "cache;", "render;", "total;"):
+            self.assertIn(name, timing)
+        self.assertIn("miss=", timing)
+        self.assertNotIn("miss=0", timing)
+        # 두 번째 요청은 캐시된 목록을 사용
+        self.assertNotIn("hit=0", second["Server-Timing"])
+
+        self.login_as("admin", "adminpass")
+        res = self.client.get("/api/metrics/")
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.data["enabled"])
+        my_list = res.data["views"]["my-quiz-status"]
+        self.assertEqual(my_list["count"], 2)
+        self.assertGreater(my_list["avg_queries"], 0)
+        self.assertGreater(my_list["avg_cache_hits"], 0)
+        self.assertIn("p95_ms", my_list)
+        self.assertIn("answer_key_cache", res.data)
+
+        self.assertEqual(self.client.delete("/api/metrics/").status_code, 204)
+        self.assertNotIn("my-quiz-status", self.client.get("/api/metrics/").data["views"])
+
+    async def test_async_requests_are_measured(self):
+        token = str(AccessToken.for_user(self.user))
+        response = await self.async_client.get(
+            "/api/sessions/my_list/", headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('db;dur=0.00;desc="0 queries"', response["Server-Timing"])
+        self.assertNotIn("miss=0", response["Server-Timing"])
+        self.assertEqual(registry.snapshot()["my-quiz-status"]["count"], 1)
+        self.assertNotIn("get", vars(caches["default"]))
+
+    def test_middleware_runs_without_async_adaptation(self):
+        async def get_response(request):
+            return None
+
+        self.assertTrue(iscoroutinefunction(RequestMetricsMiddleware(get_response)))
+        self.assertFalse(iscoroutinefunction(RequestMetricsMiddleware(lambda request: None)))
+
+    def test_instrumentation_is_removed_after_request(self):
+        self.login_as("student", "userpass")
+        self.client.get("/api/sessions/my_list/")
+        self.assertNotIn("get", vars(caches["default"]))
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_recorded(self):
+        self.login_as("student", "userpass")
+        res = self.client.get("/api/sessions/my_list/")
+        self.assertNotIn("Server-Timing", res)
+        self.assertEqual(registry.snapshot(), {})
+
+    def test_metrics_endpoint_requires_staff(self):
+        self.login_as("student", "userpass")
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 403)
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class PrimaryReplicaRouterTest(TransactionTestCase):
+    """같은 테스트 DB에 연결한 두 번째 연결(replica)을 복제본 대신 사용"""
+
+    def setUp(self):
+        cache.clear()
+        connections.settings["replica"] = dict(connections["default"].settings_dict)
+        # 테스트 클래스의 databases에 없는 별칭이라 미리 연결해 둠
+        connections["replica"].connect()
+        self.addCleanup(self.remove_replica)
+
+        grade = Grade.objects.create(name="1학년")
+        admin = User.objects.create_superuser(username="admin", password="adminpass")
+        self.user = User.objects.create_user(username="student", password="userpass")
+        UserProfile.objects.create(user=self.user, grade=grade)
+        self.quiz = Quiz.objects.create(title="복제본 퀴즈", num_questions=1, grade=grade, created_by=admin)
+        question = Question.objects.create(quiz=self.quiz, text="1+1=?")
+        Choice.objects.create(question=question, text="2", is_correct=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def remove_replica(self):
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+
+    def queries_by_alias(self, method, url):
+        with CaptureQueriesContext(connections["default"]) as primary, \
+                CaptureQueriesContext(connections["replica"]) as replica:
+            response = getattr(self.client, method)(url)
+        self.assertLess(response.status_code, 400)
+        return response, len(primary.captured_queries), len(replica.captured_queries)
+
+    def test_router_defaults_to_primary(self):
+        router = db_routing.PrimaryReplicaRouter()
+        # 요청 밖 (관리 명령, 워커)
+        self.assertEqual(router.db_for_read(Quiz), "default")
+
+        token = db_routing.begin()
+        try:
+            self.assertEqual(router.db_for_read(Quiz), "default")
+            self.assertTrue(db_routing.allow_replica_reads(self.user))
+            self.assertEqual(router.db_for_read(Quiz), "replica")
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Quiz), "default")
+            self.assertEqual(router.db_for_write(Quiz), "default")
+            # 쓰기 이후에는 같은 요청 안에서도 primary에서 읽음
+            self.assertEqual(router.db_for_read(Quiz), "default")
+        finally:
+            db_routing.end(token)
+        self.assertFalse(router.allow_migrate("replica", "quizzes"))
+        self.assertTrue(router.allow_migrate("default", "quizzes"))
+
+    def test_reads_go_to_replica_until_user_writes(self):
+        _, primary, replica = self.queries_by_alias("get", "/api/sessions/my_list/")
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+        response, primary, replica = self.queries_by_alias("post", f"/api/sessions/{self.quiz.id}/start/")
+        self.assertEqual(replica, 0)
+        session_url = f"/api/sessions/sessions/{response.data['session_id']}/"
+
+        # 방금 쓴 사용자는 REPLICA_PIN_SECONDS 동안 primary에서 읽음 (read-your-writes)
+        _, primary, replica = self.queries_by_alias("get", session_url)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+        cache.delete(db_routing._pin_key(self.user.id))
+        response, primary, replica = self.queries_by_alias("get", session_url)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+        self.assertEqual(response.data["quiz"], self.quiz.id)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_uses_primary(self):
+        _, primary, replica = self.queries_by_alias("get", "/api/sessions/my_list/")
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    async def test_async_middleware_routes_reads(self):
+        # 이벤트 루프 스레드에서는 연결별 쿼리를 캡처할 수 없으므로 라우터 결정을 기록
+        aliases = []
+        db_for_read = db_routing.PrimaryReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            aliases.append(db_for_read(router, model, **hints))
+            return aliases[-1]
+
+        token = str(AccessToken.for_user(self.user))
+        with mock.patch.object(db_routing.PrimaryReplicaRouter, "db_for_read", record):
+            response = await self.async_client.get(
+                "/api/sessions/my_list/", headers={"Authorization": f"Bearer {token}"}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("replica", aliases)
@@ -1,3 +1,32 @@
-from django.shortcuts import render
+from django.conf import settings
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from quizzes import answer_keys
+from .metrics import registry
+
+METRICS_MIDDLEWARE = 'core.middleware.RequestMetricsMiddleware'
+
+
+class RequestMetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="요청 계측 통계 (관리자)",
+        operation_description="이 프로세스에서 샘플링된 요청의 URL별 쿼리 수, DB/캐시/렌더링 시간, 지연 시간 통계"
+    )
+    def get(self, request):
+        return Response({
+            'enabled': METRICS_MIDDLEWARE in settings.MIDDLEWARE,
+            'sample_rate': getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 0),
+            'views': registry.snapshot(),
+            'answer_key_cache': answer_keys.stats(),
+        })
+
+    @swagger_auto_schema(operation_summary="요청 계측 통계 초기화 (관리자)")
+    def delete(self, request):
+        registry.reset()
+        answer_keys.reset_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
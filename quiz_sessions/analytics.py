@@ -0,0 +1,315 @@
+import math
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import BigIntegerField, Case, F, Value, When
+
+from quizzes import answer_keys
+from quizzes.models import Question, Choice
+from .orders import ORDER_FIELDS, session_orders
+from .models import UserQuizSession, ArchivedQuizSession, QuizStats, QuizScoreBucket, QuestionStats, ChoiceStats
+
+# 퀴즈 통계 (점수 분포, 문항 난이도/변별도, 선택지별 응답 수)
+# 세션이 채점될 때마다 증가분만 UPDATE로 더하므로 조회 시 answers JSON을 스캔하지 않는다.
+# 같은 퀴즈의 집계는 QuizStats 행 잠금으로 직렬화되고, 세션마다 반영된 집계 세대(stats_epoch)를 표시해 두 번 더하지 않는다.
+# 제출/채점 트랜잭션이 이 잠금을 잡지 않도록 record_after_commit()으로 커밋 후 별도 트랜잭션에서 더한다.
+# 커밋 후 콜백은 같은 요청 안에서 실행되므로 다른 집계가 잠금을 잡고 있으면 그만큼 응답이 늦어진다.
+# 세션 삭제나 save()를 거치지 않은 점수 변경은 반영되지 않으므로 rebuild_quiz_stats로 다시 계산한다.
+
+REBUILD_CHUNK_SIZE = 2000
+QUESTION_FIELDS = ['presented', 'answered', 'correct', 'score_sum', 'score_sq_sum', 'correct_score_sum']
+
+
+class QuizAggregate:
+    """세션 여러 개의 집계 증가분"""
+
+    def __init__(self, answer_key):
+        self.answer_key = answer_key
+        self.submissions = 0
+        self.score_sum = 0
+        self.score_sq_sum = 0
+        self.buckets = Counter()
+        self.questions = defaultdict(Counter)
+        self.choices = Counter()
+
+    def add(self, session):
+        score = session.score
+        self.submissions += 1
+        self.score_sum += score
+        self.score_sq_sum += score * score
+        self.buckets[score] += 1
+        question_order, choice_order = session_orders(session)
+        for question_id in question_order:
+            stats = self.questions[question_id]
+            stats['presented'] += 1
+            stats['score_sum'] += score
+            stats['score_sq_sum'] += score * score
+            choice_id = session.answers.get(str(question_id))
+            # 출제된 선택지가 아닌 답안은 집계하지 않음
+            if choice_id not in choice_order.get(str(question_id), []):
+                continue
+            stats['answered'] += 1
+            self.choices[choice_id] += 1
+            if self.answer_key.get(question_id) == choice_id:
+                stats['correct'] += 1
+                stats['correct_score_sum'] += score
+
+
+def _increment(queryset, key_field, deltas):
+    """{key: {field: 증가량}}을 한 번의 UPDATE로 더함. 갱신된 행 수를 반환"""
+    fields = {field for delta in deltas.values() for field in delta}
+    updates = {}
+    for field in fields:
+        values = {key: delta[field] for key, delta in deltas.items() if delta[field]}
+        if not values:
+            continue
+        if len(values) == len(deltas) and len(set(values.values())) == 1:
+            # 모든 행에 같은 값을 더하는 경우 (세션 하나를 반영할 때 대부분)
+            updates[field] = F(field) + next(iter(values.values()))
+        else:
+            whens = [When(**{key_field: key}, then=Value(value)) for key, value in values.items()]
+            updates[field] = F(field) + Case(*whens, default=Value(0), output_field=BigIntegerField())
+    return queryset.filter(**{f'{key_field}__in': list(deltas)}).update(**updates)
+
+
+def _existing(model, ids):
+    # 세션 이후 삭제된 문제/선택지는 집계 행을 만들지 않음
+    return set(model.objects.filter(id__in=ids).values_list('id', flat=True))
+
+
+def _increment_or_create(model, key_field, deltas, make, source=None, **filters):
+    if not deltas:
+        return
+    queryset = model.objects.filter(**filters)
+    if _increment(queryset, key_field, deltas) == len(deltas):
+        return
+    # 처음 집계되는 행은 증가분을 초기값으로 생성 (퀴즈 행 잠금 안이므로 동시에 생성되지 않음)
+    existing = set(queryset.filter(**{f'{key_field}__in': list(deltas)}).values_list(key_field, flat=True))
+    missing = [key for key in deltas if key not in existing]
+    if source is not None:
+        missing = _existing(source, missing)
+    model.objects.bulk_create([make(key, deltas[key]) for key in missing])
+
+
+def _lock_quiz_stats(quiz_id):
+    """QuizStats 행을 잠그고(없으면 생성) 현재 집계 세대를 반환"""
+    stats = QuizStats.objects.select_for_update().filter(quiz_id=quiz_id).values_list('epoch', flat=True)
+    epoch = stats.first()
+    if epoch is None:
+        QuizStats.objects.get_or_create(quiz_id=quiz_id)
+        epoch = stats.get()
+    return epoch
+
+
+def _apply(quiz_id, aggregate):
+    QuizStats.objects.filter(quiz_id=quiz_id).update(
+        submissions=F('submissions') + aggregate.submissions,
+        score_sum=F('score_sum') + aggregate.score_sum,
+        score_sq_sum=F('score_sq_sum') + aggregate.score_sq_sum,
+    )
+    _increment_or_create(
+        QuizScoreBucket, 'score', {score: {'count': n} for score, n in aggregate.buckets.items()},
+        lambda score, delta: QuizScoreBucket(quiz_id=quiz_id, score=score, count=delta['count']),
+        quiz_id=quiz_id,
+    )
+    _increment_or_create(
+        QuestionStats, 'question_id',
+        {qid: {field: delta[field] for field in QUESTION_FIELDS} for qid, delta in aggregate.questions.items()},
+        lambda qid, delta: QuestionStats(question_id=qid, quiz_id=quiz_id, **delta),
+        source=Question,
+    )
+    _increment_or_create(
+        ChoiceStats, 'choice_id', {cid: {'picks': n} for cid, n in aggregate.choices.items()},
+        lambda cid, delta: ChoiceStats(choice_id=cid, quiz_id=quiz_id, picks=delta['picks']),
+        source=Choice,
+    )
+
+
+def _unrecorded(session_ids):
+    """아직 통계에 반영되지 않은 세션 행을 잠금 (세션 행 -> QuizStats 순으로 잠가 rebuild_quiz와 교착되지 않음)"""
+    return (
+        UserQuizSession.objects.select_for_update()
+        .filter(id__in=session_ids, stats_epoch__isnull=True)
+        .order_by('id')
+    )
+
+
+@transaction.atomic
+def _record(quiz_id, sessions):
+    recorded = set(_unrecorded([session.id for session in sessions]).values_list('id', flat=True))
+    sessions = [session for session in sessions if session.id in recorded]
+    if not sessions:
+        return
+    aggregate = QuizAggregate(answer_keys.get_answer_key(quiz_id))
+    for session in sessions:
+        aggregate.add(session)
+    epoch = _lock_quiz_stats(quiz_id)
+    _apply(quiz_id, aggregate)
+    UserQuizSession.objects.filter(id__in=recorded).update(stats_epoch=epoch)
+
+
+def record_sessions(sessions):
+    """채점된 세션들을 퀴즈 통계에 더함 (퀴즈마다 한 트랜잭션). 이미 반영된 세션은 건너뜀"""
+    by_quiz = defaultdict(list)
+    for session in sessions:
+        if session.score is not None:
+            by_quiz[session.quiz_id].append(session)
+    for quiz_id in sorted(by_quiz):
+        _record(quiz_id, by_quiz[quiz_id])
+
+
+def record_after_commit(sessions):
+    """
+    현재 트랜잭션이 커밋된 뒤 record_sessions를 실행.
+    집계가 실패해도 이미 커밋된 제출/채점은 그대로 두고 로그만 남긴다 (rebuild_quiz_stats로 복구)
+    """
+    transaction.on_commit(lambda: record_sessions(sessions), robust=True)
+
+
+def _aggregate_sessions(quiz_id, epoch, chunk_size):
+    """
+    채점된 세션(보관된 세션 포함)을 id 순 chunk로 읽어 집계하고 (집계, 이번에 세대를 표시한 세션 ID)를 반환.
+    이번 세대로 표시된 세션은 재계산 중 record_sessions가 반영한 것이므로 건너뛴다 (반영 시 다시 더함)
+    """
+    aggregate = QuizAggregate(answer_keys.load_from_db(quiz_id))
+    marked = set()
+    for model in (UserQuizSession, ArchivedQuizSession):
+        fields = ['id', 'answers', 'score', *ORDER_FIELDS]
+        if model is UserQuizSession:
+            fields.append('stats_epoch')
+        sessions = model.objects.filter(quiz_id=quiz_id, is_submitted=True, score__isnull=False)
+        last_id = 0
+        while True:
+            chunk = list(sessions.filter(id__gt=last_id).order_by('id').only(*fields)[:chunk_size])
+            if not chunk:
+                break
+            unrecorded = []
+            for session in chunk:
+                stats_epoch = getattr(session, 'stats_epoch', None)
+                if model is UserQuizSession and stats_epoch is None:
+                    unrecorded.append(session.id)
+                elif stats_epoch != epoch:
+                    aggregate.add(session)
+            if unrecorded:
+                # 커밋 후 집계가 아직 실행되지 않은 세션: 잠그고 이번 세대로 표시해 이후 record_sessions가 건너뛰게 함
+                locked = list(_unrecorded(unrecorded).filter(is_submitted=True, score__isnull=False).only(*fields))
+                for session in locked:
+                    aggregate.add(session)
+                    marked.add(session.id)
+                UserQuizSession.objects.filter(id__in=[session.id for session in locked]).update(stats_epoch=epoch)
+            last_id = chunk[-1].id
+    return aggregate, marked
+
+
+def rebuild_quiz(quiz_id, chunk_size=REBUILD_CHUNK_SIZE):
+    """
+    채점된 세션(보관된 세션 포함)을 id 순 chunk로 읽어 퀴즈 통계를 처음부터 다시 계산. 반영한 세션 수를 반환.
+    세션을 읽는 동안에는 QuizStats 행을 잠그지 않으므로 제출 후 집계는 시작과 반영 시점에만 잠시 기다린다.
+    그 사이 반영된 세션은 결과에 더해 바꿔 넣는다. 더 나중에 시작된 재계산이 있으면 반영하지 않고 None을 반환
+    """
+    with transaction.atomic():
+        epoch = _lock_quiz_stats(quiz_id) + 1
+        QuizStats.objects.filter(quiz_id=quiz_id).update(epoch=epoch)
+
+    with transaction.atomic():
+        aggregate, marked = _aggregate_sessions(quiz_id, epoch, chunk_size)
+        if _lock_quiz_stats(quiz_id) != epoch:
+            # 세대 표시를 되돌려 나중 재계산이 이 세션들을 집계하게 함
+            transaction.set_rollback(True)
+            return None
+        recorded = UserQuizSession.objects.filter(quiz_id=quiz_id, stats_epoch=epoch).values_list('id', flat=True)
+        pending = sorted(set(recorded) - marked)
+        for start in range(0, len(pending), chunk_size):
+            for session in UserQuizSession.objects.filter(id__in=pending[start:start + chunk_size]).only(
+                'id', 'answers', 'score', *ORDER_FIELDS
+            ):
+                aggregate.add(session)
+
+        QuizStats.objects.filter(quiz_id=quiz_id).update(
+            submissions=aggregate.submissions, score_sum=aggregate.score_sum, score_sq_sum=aggregate.score_sq_sum,
+        )
+        QuizScoreBucket.objects.filter(quiz_id=quiz_id).delete()
+        QuestionStats.objects.filter(quiz_id=quiz_id).delete()
+        ChoiceStats.objects.filter(quiz_id=quiz_id).delete()
+        QuizScoreBucket.objects.bulk_create([
+            QuizScoreBucket(quiz_id=quiz_id, score=score, count=n) for score, n in aggregate.buckets.items()
+        ])
+        valid = _existing(Question, aggregate.questions)
+        QuestionStats.objects.bulk_create([
+            QuestionStats(question_id=qid, quiz_id=quiz_id, **{field: delta[field] for field in QUESTION_FIELDS})
+            for qid, delta in aggregate.questions.items() if qid in valid
+        ], batch_size=1000)
+        valid = _existing(Choice, aggregate.choices)
+        ChoiceStats.objects.bulk_create([
+            ChoiceStats(choice_id=cid, quiz_id=quiz_id, picks=n) for cid, n in aggregate.choices.items() if cid in valid
+        ], batch_size=1000)
+    return aggregate.submissions
+
+
+def _discrimination(stats):
+    # 점이연 상관계수: 문항 정답 여부와 (문항을 포함한) 총점의 상관
+    n, correct = stats.presented, stats.correct
+    if n == 0 or correct in (0, n):
+        return None
+    mean = stats.score_sum / n
+    variance = stats.score_sq_sum / n - mean * mean
+    if variance <= 0:
+        return None
+    mean_correct = stats.correct_score_sum / correct
+    mean_wrong = (stats.score_sum - stats.correct_score_sum) / (n - correct)
+    p = correct / n
+    return round((mean_correct - mean_wrong) / math.sqrt(variance) * math.sqrt(p * (1 - p)), 4)
+
+
+def quiz_report(quiz_id):
+    """관리자 통계 API 응답"""
+    stats = QuizStats.objects.filter(quiz_id=quiz_id).first()
+    submissions = stats.submissions if stats else 0
+    mean = variance = None
+    if submissions:
+        mean = stats.score_sum / submissions
+        variance = max(stats.score_sq_sum / submissions - mean * mean, 0)
+
+    question_stats = QuestionStats.objects.filter(quiz_id=quiz_id).in_bulk()
+    picks = dict(ChoiceStats.objects.filter(quiz_id=quiz_id).values_list('choice_id', 'picks'))
+    choices = defaultdict(list)
+    for choice in Choice.objects.filter(question__quiz_id=quiz_id).order_by('id').values('id', 'question_id', 'text', 'is_correct'):
+        choices[choice['question_id']].append(choice)
+
+    questions = []
+    for question in Question.objects.filter(quiz_id=quiz_id).order_by('id').values('id', 'text'):
+        qs = question_stats.get(question['id'])
+        presented = qs.presented if qs else 0
+        answered = qs.answered if qs else 0
+        questions.append({
+            'question_id': question['id'],
+            'text': question['text'],
+            'presented': presented,
+            'answered': answered,
+            'correct': qs.correct if qs else 0,
+            'difficulty': round(qs.correct / presented, 4) if presented else None,
+            'discrimination': _discrimination(qs) if qs else None,
+            'choices': [
+                {
+                    'choice_id': c['id'],
+                    'text': c['text'],
+                    'is_correct': c['is_correct'],
+                    'picks': picks.get(c['id'], 0),
+                    'pick_rate': round(picks.get(c['id'], 0) / answered, 4) if answered else None,
+                }
+                for c in choices[question['id']]
+            ],
+        })
+
+    return {
+        'quiz_id': quiz_id,
+        'submissions': submissions,
+        'mean': round(mean, 4) if mean is not None else None,
+        'variance': round(variance, 4) if variance is not None else None,
+        'stddev': round(math.sqrt(variance), 4) if variance is not None else None,
+        'histogram': [
+            {'score': score, 'count': count}
+            for score, count in QuizScoreBucket.objects.filter(quiz_id=quiz_id).order_by('score').values_list('score', 'count')
+        ],
+        'questions': questions,
+    }
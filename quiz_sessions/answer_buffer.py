@@ -0,0 +1,241 @@
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .answers import stale_question_ids
+from .models import UserQuizSession
+
+# 답안 쓰기 버퍼 (write-behind)
+# ANSWER_BUFFER_BACKEND가 설정되면 SaveAnswerView는 DB 대신 버퍼에 답안을 기록하고,
+# 백그라운드 flush(flush_answer_buffer 명령) 또는 제출 시점에 DB로 일괄 반영한다.
+#
+# 제출 시 close()로 버퍼를 닫으면서 남은 답안을 읽고, 닫힌 세션에 대한 put()은 실패한다.
+# put()과 close()는 각각 원자적으로 실행되므로 저장 완료 응답을 받은 답안은 반드시 제출에 반영된다.
+# flush와 제출은 답안을 읽기만 하고, DB 트랜잭션이 커밋된 뒤 discard()로 반영한 답안만 지운다.
+# 롤백되거나 커밋 전에 프로세스가 종료되어도 답안은 버퍼에 남는다.
+# put_latest()는 일괄 저장 API의 순번 있는 답안용으로, 문제별 마지막 순번을 버퍼에 함께 두고
+# 그보다 큰 순번의 답안만 반영한다. 순번은 flush 후에도 남아 있어 늦게 도착한 이전 요청을 계속 걸러낸다.
+
+
+class InMemoryAnswerBuffer:
+    """단일 프로세스용 버퍼 (테스트/개발용)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._answers = {}
+        self._dirty = set()
+        self._closed = set()
+        self._seqs = {}
+
+    def put(self, session_id, answers):
+        with self._lock:
+            if session_id in self._closed:
+                return False
+            self._answers.setdefault(session_id, {}).update(answers)
+            self._dirty.add(session_id)
+            return True
+
+    def put_latest(self, session_id, answers, seqs):
+        with self._lock:
+            if session_id in self._closed:
+                return False, set()
+            stored = self._seqs.setdefault(session_id, {})
+            stale = stale_question_ids(stored, seqs)
+            answers = {qid: choice_id for qid, choice_id in answers.items() if qid not in stale}
+            stored.update({qid: seqs[qid] for qid in answers if qid in seqs})
+            self._answers.setdefault(session_id, {}).update(answers)
+            self._dirty.add(session_id)
+            return True, stale
+
+    def peek(self, session_id):
+        with self._lock:
+            return dict(self._answers.get(session_id, {}))
+
+    def close(self, session_id):
+        with self._lock:
+            self._closed.add(session_id)
+            return dict(self._answers.get(session_id, {}))
+
+    def reopen(self, session_id):
+        """제출이 실패한 세션의 버퍼를 다시 엶"""
+        with self._lock:
+            self._closed.discard(session_id)
+
+    def discard(self, session_id, answers):
+        """DB에 반영된 답안을 지움. 그 사이 다른 선택지로 바뀐 답안은 남김"""
+        with self._lock:
+            current = self._answers.get(session_id, {})
+            for question_id, choice_id in answers.items():
+                if current.get(question_id) == choice_id:
+                    del current[question_id]
+            if not current:
+                self._answers.pop(session_id, None)
+                self._dirty.discard(session_id)
+
+    def dirty_sessions(self, limit):
+        with self._lock:
+            return list(self._dirty)[:limit]
+
+
+class RedisAnswerBuffer:
+    """세션별 Redis hash에 답안을 보관하는 버퍼"""
+
+    DIRTY_KEY = 'answer_buffer:dirty'
+    # KEYS: 답안 hash, 닫힘 표시, 순번 hash, dirty set / ARGV: 세션 ID, (문제 ID, 선택지 ID, 순번) 반복
+    # 닫힌 세션이면 -1, 아니면 건너뛴 문제 ID 목록을 반환
+    PUT_LATEST_SCRIPT = """
+    if redis.call('EXISTS', KEYS[2]) == 1 then
+        return -1
+    end
+    local stale = {}
+    for i = 2, #ARGV, 3 do
+        local seq = tonumber(ARGV[i + 2])
+        local current = tonumber(redis.call('HGET', KEYS[3], ARGV[i]) or '-1')
+        if seq ~= nil and seq <= current then
+            table.insert(stale, ARGV[i])
+        else
+            redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+            if seq ~= nil then
+                redis.call('HSET', KEYS[3], ARGV[i], seq)
+            end
+        end
+    end
+    redis.call('SADD', KEYS[4], ARGV[1])
+    return stale
+    """
+    # KEYS: 답안 hash, dirty set / ARGV: 세션 ID, (문제 ID, 선택지 ID) 반복
+    # 값이 그대로인 답안만 지우고, 남은 답안이 없으면 dirty set에서 뺌
+    DISCARD_SCRIPT = """
+    for i = 2, #ARGV, 2 do
+        if redis.call('HGET', KEYS[1], ARGV[i]) == ARGV[i + 1] then
+            redis.call('HDEL', KEYS[1], ARGV[i])
+        end
+    end
+    if redis.call('HLEN', KEYS[1]) == 0 then
+        redis.call('SREM', KEYS[2], ARGV[1])
+    end
+    return 1
+    """
+
+    def __init__(self):
+        import redis
+
+        self.client = redis.Redis.from_url(settings.ANSWER_BUFFER_REDIS_URL)
+        self.closed_timeout = getattr(settings, 'ANSWER_BUFFER_CLOSED_TIMEOUT', 60 * 60 * 24)
+        self._put_latest = self.client.register_script(self.PUT_LATEST_SCRIPT)
+        self._discard = self.client.register_script(self.DISCARD_SCRIPT)
+
+    def _key(self, session_id):
+        return f"answer_buffer:{session_id}"
+
+    def _closed_key(self, session_id):
+        return f"answer_buffer:{session_id}:closed"
+
+    def _seqs_key(self, session_id):
+        return f"answer_buffer:{session_id}:seqs"
+
+    @staticmethod
+    def _decode(raw):
+        return {k.decode(): int(v) for k, v in raw.items()}
+
+    def put(self, session_id, answers):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.exists(self._closed_key(session_id))
+        pipe.hset(self._key(session_id), mapping=answers)
+        pipe.sadd(self.DIRTY_KEY, session_id)
+        closed, _, _ = pipe.execute()
+        # close() 이후에 기록된 답안은 제출에 반영되지 않으므로 실패로 처리
+        return not closed
+
+    def put_latest(self, session_id, answers, seqs):
+        args = [session_id]
+        for qid, choice_id in answers.items():
+            args += [qid, choice_id, seqs.get(qid, '')]
+        keys = [self._key(session_id), self._closed_key(session_id), self._seqs_key(session_id), self.DIRTY_KEY]
+        result = self._put_latest(keys=keys, args=args)
+        if result == -1:
+            return False, set()
+        return True, {qid.decode() for qid in result}
+
+    def peek(self, session_id):
+        return self._decode(self.client.hgetall(self._key(session_id)))
+
+    def close(self, session_id):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(self._closed_key(session_id), 1, ex=self.closed_timeout)
+        # 제출 실패로 다시 열릴 수 있으므로 순번은 닫힘 표시와 같은 기간 동안 유지
+        pipe.expire(self._seqs_key(session_id), self.closed_timeout)
+        pipe.hgetall(self._key(session_id))
+        _, _, raw = pipe.execute()
+        return self._decode(raw)
+
+    def reopen(self, session_id):
+        self.client.delete(self._closed_key(session_id))
+
+    def discard(self, session_id, answers):
+        args = [session_id]
+        for question_id, choice_id in answers.items():
+            args += [question_id, choice_id]
+        self._discard(keys=[self._key(session_id), self.DIRTY_KEY], args=args)
+
+    def dirty_sessions(self, limit):
+        return [int(sid) for sid in self.client.srandmember(self.DIRTY_KEY, limit)]
+
+
+_buffers = {}
+_buffers_lock = threading.Lock()
+
+
+def get_buffer():
+    """설정된 답안 버퍼 인스턴스. 설정이 없으면 None (DB에 바로 저장)"""
+    path = getattr(settings, 'ANSWER_BUFFER_BACKEND', None)
+    if not path:
+        return None
+    with _buffers_lock:
+        if path not in _buffers:
+            _buffers[path] = import_string(path)()
+        return _buffers[path]
+
+
+def flush(session_ids):
+    """버퍼에 쌓인 답안을 세션별로 모아 한 번의 bulk_update로 DB에 반영. 반영한 세션 수를 반환"""
+    buffer = get_buffer()
+    if buffer is None or not session_ids:
+        return 0
+
+    pending = {}
+    with transaction.atomic():
+        # 행 잠금을 먼저 잡고 버퍼를 읽어야 동시에 진행되는 제출과 답안이 엇갈리지 않음
+        sessions = list(
+            UserQuizSession.objects.select_for_update()
+            .filter(id__in=session_ids, is_submitted=False)
+            .only('id', 'answers')
+        )
+        for session in sessions:
+            answers = buffer.peek(session.id)
+            if answers:
+                pending[session.id] = answers
+                session.answers.update(answers)
+        UserQuizSession.objects.bulk_update(
+            [s for s in sessions if s.id in pending], ['answers']
+        )
+        # 커밋된 뒤에만 버퍼에서 지움 (실패하면 다음 flush에서 같은 답안을 다시 반영)
+        transaction.on_commit(lambda: _discard(buffer, pending), robust=True)
+    # 삭제되었거나 이미 제출된 세션은 버퍼에서 정리
+    for session_id in set(session_ids) - {s.id for s in sessions}:
+        buffer.discard(session_id, buffer.peek(session_id))
+    return len(pending)
+
+
+def _discard(buffer, answers_by_session):
+    for session_id, answers in answers_by_session.items():
+        buffer.discard(session_id, answers)
+
+
+def flush_dirty(batch_size=500):
+    buffer = get_buffer()
+    if buffer is None:
+        return 0
+    return flush(buffer.dirty_sessions(batch_size))
@@ -0,0 +1,89 @@
+import json
+
+from django.db import NotSupportedError, models, transaction
+
+from .models import UserQuizSession
+from .orders import ORDER_FIELDS, session_orders
+
+# 답안 저장
+# 세션 행을 읽어 answers 전체를 다시 쓰지 않고, DB에서 JSON 병합으로 원자적으로 반영한다.
+
+
+class JSONMerge(models.Func):
+    """JSON 컬럼에 dict를 DB 안에서 병합 (PostgreSQL: jsonb ||, SQLite: json_patch)"""
+    output_field = models.JSONField()
+
+    def __init__(self, expression, data):
+        super().__init__(expression)
+        self.data = json.dumps(data)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        lhs, params = compiler.compile(self.source_expressions[0])
+        return f"(COALESCE({lhs}, '{{}}'::jsonb) || %s::jsonb)", (*params, self.data)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        lhs, params = compiler.compile(self.source_expressions[0])
+        return f"json_patch(COALESCE({lhs}, '{{}}'), %s)", (*params, self.data)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(f"JSONMerge is not supported on {connection.vendor}.")
+
+
+# 답안 검증에 필요한 필드 (answers 컬럼은 읽지 않음)
+ANSWER_CHECK_FIELDS = ('id', 'is_submitted', *ORDER_FIELDS)
+
+
+def validate_answer(session, question_id, choice_id):
+    """세션에 출제된 문제/선택지인지 메모리에서 확인. 오류 메시지 또는 None 반환"""
+    choice_ids = session_orders(session)[1].get(str(question_id))
+    if choice_ids is None:
+        return '세션에 출제되지 않은 문제입니다.'
+    if choice_id not in choice_ids:
+        return '문제에 속하지 않은 선택지입니다.'
+    return None
+
+
+def save_answers(session_id, answers):
+    """{str(question_id): choice_id} 를 미제출 세션의 answers에 원자적으로 병합. 반영되면 True"""
+    updated = UserQuizSession.objects.filter(id=session_id, is_submitted=False).update(
+        answers=JSONMerge('answers', answers)
+    )
+    return updated == 1
+
+
+def stale_question_ids(stored_seqs, seqs):
+    """저장된 순번 이하인(이미 더 늦은 답안이 반영된) 문제 ID"""
+    return {qid for qid, seq in seqs.items() if seq <= stored_seqs.get(qid, -1)}
+
+
+def save_latest_answers(session_id, answers, seqs):
+    """
+    순번이 있는 답안 병합. 문제별로 저장된 순번보다 큰 답안만 반영하고 그 순번을 answer_seqs에 기록.
+    순서가 바뀌어 도착한 이전 요청이 최신 답안을 덮어쓰지 않도록 행을 잠그고 비교한다.
+    (반영 여부, 건너뛴 문제 ID 집합)을 반환
+    """
+    with transaction.atomic():
+        stored = (
+            UserQuizSession.objects.select_for_update()
+            .filter(id=session_id, is_submitted=False)
+            .values_list('answer_seqs', flat=True)
+            .first()
+        )
+        if stored is None:
+            return False, set()
+        stale = stale_question_ids(stored, seqs)
+        answers = {qid: choice_id for qid, choice_id in answers.items() if qid not in stale}
+        if answers:
+            UserQuizSession.objects.filter(id=session_id).update(
+                answers=JSONMerge('answers', answers),
+                answer_seqs=JSONMerge('answer_seqs', {qid: seqs[qid] for qid in answers if qid in seqs}),
+            )
+    return True, stale
+
+
+async def asave_answers(session_id, answers):
+    """save_answers의 비동기 버전"""
+    updated = await UserQuizSession.objects.filter(id=session_id, is_submitted=False).aupdate(
+        answers=JSONMerge('answers', answers)
+    )
+    return updated == 1
@@ -0,0 +1,102 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import UserQuizSession, ArchivedQuizSession
+
+# 오래된 세션 보관 (archive_sessions 명령)
+# 채점까지 끝난 제출 세션 중 started_at이 기준 시각 이전인 것을 id 순 chunk로 ArchivedQuizSession에 옮긴다.
+# chunk마다 한 트랜잭션에서 INSERT ... SELECT / DELETE 를 실행하므로 answers JSON을 애플리케이션으로 읽지 않고,
+# 중간에 중단되어도 세션이 양쪽에 중복되거나 사라지지 않는다.
+# 라이브 테이블은 작게 유지되어 응시 경로의 인덱스/VACUUM 부담이 줄고, 보관 테이블은 (PostgreSQL)
+# started_at 기준 월별 파티션이라 오래된 달은 파티션 단위로 분리(DETACH)/백업/삭제할 수 있다.
+
+CHUNK_SIZE = 1000
+COLUMNS = [
+    'id', 'user_id', 'quiz_id', 'question_order', 'choice_order', 'order_seed', 'quiz_version', 'answers',
+    'is_submitted', 'score', 'started_at', 'submitted_at',
+]
+
+
+def archivable_sessions(before, quiz_id=None):
+    """보관 대상: 채점된 제출 세션 중 before 이전에 시작된 세션"""
+    sessions = UserQuizSession.objects.filter(is_submitted=True, score__isnull=False, started_at__lt=before)
+    if quiz_id is not None:
+        sessions = sessions.filter(quiz_id=quiz_id)
+    return sessions
+
+
+def _month_start(value):
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def _next_month(month):
+    return month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+
+
+def partition_name(month):
+    return f"{ArchivedQuizSession._meta.db_table}_p{month:%Y_%m}"
+
+
+def ensure_partitions(start, end):
+    """start~end(started_at)가 속하는 월별 파티션을 만든다 (PostgreSQL 외에는 파티션 없음)"""
+    if connection.vendor != 'postgresql':
+        return
+    quote = connection.ops.quote_name
+    month = _month_start(start)
+    with connection.cursor() as cursor:
+        while month <= end:
+            upper = _next_month(month)
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {quote(partition_name(month))} "
+                f"PARTITION OF {quote(ArchivedQuizSession._meta.db_table)} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+            month = upper
+
+
+def _move(session_ids):
+    """세션을 보관 테이블로 옮기고 옮긴 수를 반환. 호출하는 쪽의 트랜잭션 안에서 실행"""
+    quote = connection.ops.quote_name
+    live = quote(UserQuizSession._meta.db_table)
+    archived = quote(ArchivedQuizSession._meta.db_table)
+    columns = ', '.join(quote(column) for column in COLUMNS)
+    placeholders = ', '.join(['%s'] * len(session_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {archived} ({columns}, {quote('archived_at')}) "
+            f"SELECT {columns}, %s FROM {live} WHERE {quote('id')} IN ({placeholders})",
+            [timezone.now(), *session_ids],
+        )
+        # 시그널(post_delete)을 거치지 않도록 직접 삭제. 제출/채점이 끝난 세션이라 무효화할 캐시가 없음
+        cursor.execute(f"DELETE FROM {live} WHERE {quote('id')} IN ({placeholders})", session_ids)
+        return cursor.rowcount
+
+
+def iter_archive(before, chunk_size=CHUNK_SIZE, quiz_id=None, dry_run=False):
+    """
+    chunk마다 누적 진행 상황 {'total', 'archived'}를 yield (대상이 없거나 dry_run이면 한 번).
+    dry_run이면 옮기지 않고 대상 수만 계산
+    """
+    sessions = archivable_sessions(before, quiz_id)
+    progress = {'total': sessions.count(), 'archived': 0}
+    if dry_run or not progress['total']:
+        yield dict(progress)
+        return
+    last_id = 0
+    while True:
+        chunk = list(sessions.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size])
+        if not chunk:
+            return
+        with transaction.atomic():
+            # 재채점 등 동시 수정과 겹치지 않도록 잠근 뒤, 그 사이 조건이 바뀐 세션은 제외
+            rows = list(
+                sessions.select_for_update().filter(id__in=chunk).order_by('id').values_list('id', 'started_at')
+            )
+            if rows:
+                ensure_partitions(min(row[1] for row in rows), max(row[1] for row in rows))
+                progress['archived'] += _move([row[0] for row in rows])
+        last_id = chunk[-1]
+        yield dict(progress)
@@ -0,0 +1,97 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.shortcuts import aget_object_or_404
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.async_views import AsyncAPIView, same_schema_as
+from quizzes.models import Quiz
+from users import principal
+from . import idempotency, orders
+from .models import UserQuizSession
+from .answer_buffer import get_buffer as get_answer_buffer
+from .answers import ANSWER_CHECK_FIELDS, validate_answer, asave_answers
+from .papers import aget_paper
+from .serializers import SaveAnswerSerializer, UserQuizSessionDetailSerializer
+from .views import StartQuizSessionView, SubmitQuizSessionView, SaveAnswerView, UserQuizSessionDetailView
+
+# 응시 경로(시작/답안 저장/제출/상세)의 비동기 뷰 (ASYNC_VIEWS=True일 때 urls.py에서 사용)
+# 동기 뷰와 같은 URL/권한/JWT 인증/응답을 유지하면서 조회는 비동기 ORM과 비동기 캐시 API로 처리한다.
+# 트랜잭션이 필요한 구간(세션 생성, 제출 시 행 잠금/채점)은 비동기 ORM이 트랜잭션을 지원하지 않으므로
+# 동기 뷰의 같은 메서드를 sync_to_async로 한 번에 실행한다.
+
+
+class AsyncStartQuizSessionView(AsyncAPIView, StartQuizSessionView):
+
+    @same_schema_as(StartQuizSessionView.post)
+    @idempotency.idempotent
+    async def post(self, request, quiz_id):
+        user = request.user
+        profile = await principal.aget_profile(user)
+        if not profile or not profile.grade_id:
+            return Response({"detail": "학년 정보가 없습니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        quiz = await Quiz.objects.filter(Q(grade__isnull=True) | Q(grade_id=profile.grade_id), id=quiz_id).afirst()
+        if quiz is None:
+            return Response({"detail": "학년에 맞는 퀴즈가 아닙니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        existing = await UserQuizSession.objects.filter(user=user, quiz=quiz, is_submitted=False).afirst()
+        if existing:
+            return Response({'session_id': existing.id}, status=status.HTTP_200_OK)
+
+        session, created = await sync_to_async(self.create_session)(user, quiz)
+        return Response(
+            {'session_id': session.id}, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+
+class AsyncSubmitQuizSessionView(AsyncAPIView, SubmitQuizSessionView):
+
+    @same_schema_as(SubmitQuizSessionView.post)
+    @idempotency.idempotent
+    async def post(self, request, session_id):
+        return await sync_to_async(self.submit)(request, session_id)
+
+
+class AsyncSaveAnswerView(AsyncAPIView, SaveAnswerView):
+
+    @same_schema_as(SaveAnswerView.patch)
+    async def patch(self, request, session_id):
+        serializer = SaveAnswerSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        question_id = serializer.validated_data['question_id']
+        choice_id = serializer.validated_data['choice_id']
+
+        session = await aget_object_or_404(
+            UserQuizSession.objects.only(*ANSWER_CHECK_FIELDS), id=session_id, user=request.user
+        )
+        if session.is_submitted:
+            return Response({'detail': '이미 제출된 세션입니다.'}, status=400)
+        await orders.asession_orders(session)
+        error = validate_answer(session, question_id, choice_id)
+        if error:
+            return Response({'detail': error}, status=400)
+
+        answer = {str(question_id): choice_id}
+        buffer = get_answer_buffer()
+        if buffer is not None:
+            saved = await sync_to_async(buffer.put)(session.id, answer)
+        else:
+            saved = await asave_answers(session.id, answer)
+        if not saved:
+            return Response({'detail': '이미 제출된 세션입니다.'}, status=400)
+        return Response({'status': 'saved'}, status=200)
+
+
+class AsyncUserQuizSessionDetailView(AsyncAPIView, UserQuizSessionDetailView):
+
+    @same_schema_as(UserQuizSessionDetailView.get)
+    async def get(self, request, pk):
+        session = await aget_object_or_404(UserQuizSession, id=pk, user=request.user)
+        buffer = get_answer_buffer()
+        if buffer is not None and not session.is_submitted:
+            session.answers.update(await sync_to_async(buffer.peek)(session.id))
+        paper = await aget_paper(session)
+        serializer = UserQuizSessionDetailSerializer(session, context={'request': request, 'paper': paper})
+        return Response(serializer.data)
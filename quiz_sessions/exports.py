@@ -0,0 +1,56 @@
+import csv
+import json
+from itertools import chain
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import UserQuizSession, ArchivedQuizSession
+
+# 관리자용 퀴즈별 응시 세션 내보내기 (NDJSON, CSV). 보관된 세션을 먼저, 라이브 세션을 이어서 각각 id 순으로 내보낸다.
+# iterator(chunk_size)와 only()로 필요한 컬럼만 chunk 단위로 읽어 응시 수와 무관하게 메모리 사용량이 일정하다.
+
+FORMATS = ['ndjson', 'csv']
+EXPORT_FIELDS = ['id', 'user_id', 'quiz_id', 'answers', 'is_submitted', 'score', 'started_at', 'submitted_at']
+CHUNK_SIZE = 2000
+
+
+def iter_sessions(quiz_id, chunk_size=CHUNK_SIZE):
+    return chain.from_iterable(
+        model.objects
+        .filter(quiz_id=quiz_id)
+        .order_by('id')
+        .only(*EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+        for model in (ArchivedQuizSession, UserQuizSession)
+    )
+
+
+def _row(session):
+    return {field: getattr(session, field) for field in EXPORT_FIELDS}
+
+
+def iter_ndjson(quiz_id, chunk_size=CHUNK_SIZE):
+    for session in iter_sessions(quiz_id, chunk_size):
+        yield json.dumps(_row(session), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, dict):
+        return json.dumps(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(quiz_id, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for session in iter_sessions(quiz_id, chunk_size):
+        yield writer.writerow(_csv_value(getattr(session, field)) for field in EXPORT_FIELDS)
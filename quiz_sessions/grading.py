@@ -0,0 +1,23 @@
+from quizzes import answer_keys
+
+
+def score_answers(answers, answer_key, question_ids):
+    """답안 dict 전체를 메모리에서 채점. 세션에 출제되지 않은 문제의 답안은 무시"""
+    allowed = set(question_ids)
+    total = 0
+    for q_id, selected_cid in answers.items():
+        try:
+            q_id = int(q_id)
+            if q_id in allowed and answer_key.get(q_id) == int(selected_cid):
+                total += 1
+        except (TypeError, ValueError):
+            continue
+    return total
+
+
+def grade_session(session):
+    # models가 grading을 import하므로 함수 안에서 import
+    from .orders import session_orders
+
+    answer_key = answer_keys.get_answer_key(session.quiz_id)
+    return score_answers(session.answers, answer_key, session_orders(session)[0])
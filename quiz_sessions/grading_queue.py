@@ -0,0 +1,124 @@
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.utils.module_loading import import_string
+
+from . import analytics
+from .grading import grade_session
+from .models import UserQuizSession
+from .orders import ORDER_FIELDS
+
+# 비동기 채점 (GRADING_QUEUE_BACKEND)
+# 설정되면 제출 API는 세션을 제출 상태로만 바꾸고(score는 null) 커밋 후 세션 ID를 큐에 넣는다.
+# 워커가 여러 세션을 모아 채점한 뒤 bulk_update로 score를 기록하고, 클라이언트는 결과 API를 조회한다.
+# 채점에 실패한 세션은 score가 null로 남으므로 grade_worker --pending 으로 다시 큐에 넣을 수 있다.
+
+logger = logging.getLogger(__name__)
+
+GRADE_FIELDS = ['id', 'answers', 'score', *ORDER_FIELDS]
+
+
+@transaction.atomic
+def grade_sessions(session_ids):
+    """
+    제출되었지만 아직 채점되지 않은 세션을 채점해 한 번의 bulk_update로 저장하고 퀴즈 통계에 반영.
+    채점한 세션 수를 반환
+    """
+    sessions = list(
+        UserQuizSession.objects
+        .select_for_update(skip_locked=True)
+        .filter(id__in=session_ids, is_submitted=True, score__isnull=True)
+        .only(*GRADE_FIELDS)
+    )
+    for session in sessions:
+        session.score = grade_session(session)
+    UserQuizSession.objects.bulk_update(sessions, ['score'])
+    analytics.record_after_commit(sessions)
+    return len(sessions)
+
+
+def pending_session_ids(limit=None):
+    """제출되었지만 채점되지 않은 세션 ID"""
+    ids = (
+        UserQuizSession.objects
+        .filter(is_submitted=True, score__isnull=True)
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+    return list(ids[:limit] if limit else ids)
+
+
+class ThreadPoolGradingQueue:
+    """프로세스 내부 워커 스레드로 채점 (테스트/단일 서버용)"""
+
+    def __init__(self):
+        self.batch_size = getattr(settings, 'GRADING_BATCH_SIZE', 100)
+        self._queue = queue.Queue()
+        for _ in range(getattr(settings, 'GRADING_WORKERS', 2)):
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def enqueue(self, session_ids):
+        for session_id in session_ids:
+            self._queue.put(session_id)
+
+    def join(self):
+        """큐에 들어간 세션이 모두 처리될 때까지 대기"""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            # 제출이 몰리면 대기 중인 세션을 batch_size까지 모아 한 번에 채점
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                grade_sessions(batch)
+            except Exception:
+                logger.exception("세션 채점 실패: %s", batch)
+            finally:
+                if self._queue.empty():
+                    # 대기 중인 세션이 없으면 연결을 닫아 유휴 워커가 DB 연결을 붙잡지 않게 함 (CONN_MAX_AGE)
+                    connections.close_all()
+                else:
+                    close_old_connections()
+                for _ in batch:
+                    self._queue.task_done()
+
+
+class RedisGradingQueue:
+    """Redis list 기반 큐. grade_worker 명령으로 채점"""
+
+    KEY = 'grading:queue'
+
+    def __init__(self):
+        import redis
+
+        self.client = redis.Redis.from_url(settings.GRADING_QUEUE_REDIS_URL)
+
+    def enqueue(self, session_ids):
+        if session_ids:
+            self.client.rpush(self.KEY, *session_ids)
+
+    def pop(self, limit):
+        return [int(session_id) for session_id in self.client.lpop(self.KEY, limit) or []]
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_queue():
+    """설정된 채점 큐 인스턴스. 설정이 없으면 None (제출 시 바로 채점)"""
+    path = getattr(settings, 'GRADING_QUEUE_BACKEND', None)
+    if not path:
+        return None
+    with _queues_lock:
+        if path not in _queues:
+            _queues[path] = import_string(path)()
+        return _queues[path]
@@ -0,0 +1,93 @@
+import functools
+import inspect
+
+from django.conf import settings
+from django.core.cache import cache
+from drf_yasg import openapi
+from rest_framework import status
+from rest_framework.response import Response
+
+# Idempotency-Key 헤더 처리
+# 같은 사용자가 같은 경로에 같은 키로 다시 요청하면 처음 응답을 그대로 돌려주고 작업은 다시 하지 않는다.
+# 처리 중 표시(PENDING)는 짧게만 유지해 워커가 응답을 저장하지 못하고 죽어도 잠시 뒤 재시도가 처리된다.
+
+HEADER = 'Idempotency-Key'
+PENDING = '__pending__'
+
+header_parameter = openapi.Parameter(
+    HEADER, openapi.IN_HEADER, type=openapi.TYPE_STRING, required=False,
+    description="재시도 시 같은 값을 보내면 최초 응답을 그대로 반환합니다.",
+)
+
+
+def _timeout():
+    return getattr(settings, 'IDEMPOTENCY_KEY_TIMEOUT', 60 * 60 * 24)
+
+
+def _pending_timeout():
+    return getattr(settings, 'IDEMPOTENCY_PENDING_TIMEOUT', 30)
+
+
+def _cache_key(request, key):
+    return f"idempotency:{request.user.pk}:{request.path}:{key}"
+
+
+def _pending_or_replay(stored):
+    if stored is None or stored == PENDING:
+        return Response({'detail': '같은 요청을 처리 중입니다.'}, status=status.HTTP_409_CONFLICT)
+    response = Response(stored['data'], status=stored['status'])
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view_method):
+    if inspect.iscoroutinefunction(view_method):
+        return _idempotent_async(view_method)
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+
+        cache_key = _cache_key(request, key)
+        # 동시에 같은 키로 들어온 요청은 하나만 처리
+        if not cache.add(cache_key, PENDING, _pending_timeout()):
+            return _pending_or_replay(cache.get(cache_key))
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            cache.delete(cache_key)
+            raise
+        if response.status_code >= 500:
+            cache.delete(cache_key)
+        else:
+            cache.set(cache_key, {'status': response.status_code, 'data': response.data}, _timeout())
+        return response
+    return wrapper
+
+
+def _idempotent_async(view_method):
+    # 비동기 뷰용: 같은 동작을 async 캐시 API로 수행
+    @functools.wraps(view_method)
+    async def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return await view_method(self, request, *args, **kwargs)
+
+        cache_key = _cache_key(request, key)
+        if not await cache.aadd(cache_key, PENDING, _pending_timeout()):
+            return _pending_or_replay(await cache.aget(cache_key))
+
+        try:
+            response = await view_method(self, request, *args, **kwargs)
+        except Exception:
+            await cache.adelete(cache_key)
+            raise
+        if response.status_code >= 500:
+            await cache.adelete(cache_key)
+        else:
+            await cache.aset(cache_key, {'status': response.status_code, 'data': response.data}, _timeout())
+        return response
+    return wrapper
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from quiz_sessions.archive import CHUNK_SIZE, iter_archive
+
+
+class Command(BaseCommand):
+    help = "채점된 제출 세션 중 오래된 세션을 chunk 단위로 보관 테이블(ArchivedQuizSession)로 옮깁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=settings.SESSION_ARCHIVE_AFTER_DAYS,
+            help="시작한 지 N일이 지난 세션을 보관 (기본값 SESSION_ARCHIVE_AFTER_DAYS)",
+        )
+        parser.add_argument('--before', help="이 시각(YYYY-MM-DD 또는 ISO 8601) 이전에 시작된 세션을 보관")
+        parser.add_argument('--quiz', type=int, help="특정 퀴즈의 세션만 보관")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="옮기지 않고 대상 세션 수만 출력")
+
+    def handle(self, *args, **options):
+        if options['before']:
+            before = parse_datetime(options['before'])
+            if before is None and parse_date(options['before']):
+                before = parse_datetime(f"{options['before']}T00:00:00")
+            if before is None:
+                raise CommandError(f"잘못된 시각입니다: {options['before']}")
+            if timezone.is_naive(before):
+                before = timezone.make_aware(before)
+        else:
+            before = timezone.now() - timedelta(days=options['older_than_days'])
+
+        for progress in iter_archive(before, options['chunk_size'], options['quiz'], options['dry_run']):
+            if not options['dry_run'] and progress['total']:
+                self.stdout.write(f"{progress['archived']}/{progress['total']} 보관")
+        label = timezone.localtime(before).strftime('%Y-%m-%d %H:%M')
+        if options['dry_run']:
+            self.stdout.write(f"[dry-run] {label} 이전 보관 대상 세션 {progress['total']}개")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{label} 이전 세션 {progress['total']}개 중 {progress['archived']}개를 보관했습니다."
+        ))
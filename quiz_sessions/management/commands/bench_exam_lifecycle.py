@@ -0,0 +1,417 @@
+import asyncio
+import json
+import random
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Grade
+from quizzes.models import Quiz, Question, Choice
+from users.models import UserProfile
+from quiz_sessions.models import UserQuizSession
+from quiz_sessions.orders import ORDER_FIELDS, session_orders, asession_orders
+
+ENDPOINTS = ['start', 'save_answer', 'submit', 'detail', 'my_list']
+PERCENTILES = [50, 95, 99]
+
+
+class StatementCounter:
+    """execute_wrapper: 요청 하나에서 실행된 쿼리 수와 INSERT/UPDATE/DELETE로 변경된 행 수를 센다"""
+
+    WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE')
+
+    def __init__(self):
+        self.queries = 0
+        self.rows_written = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        self.queries += 1
+        statement = sql.lstrip().upper()
+        if statement.startswith('INSERT'):
+            # INSERT ... RETURNING은 결과를 읽기 전까지 rowcount가 0/-1인 드라이버(SQLite 등)가 있어 파라미터 수로 계산
+            self.rows_written += self.inserted_rows(sql, params, many)
+        elif statement.startswith(self.WRITE_PREFIXES):
+            self.rows_written += max(context['cursor'].rowcount, 0)
+        return result
+
+    @staticmethod
+    def inserted_rows(sql, params, many):
+        if not params:
+            return 0
+        if many:
+            return len(params)
+        columns = sql[sql.index('(') + 1:sql.index(')')].count(',') + 1
+        return len(params) // columns
+
+
+class AsgiResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+async def asgi_request(app, method, path, host, headers, data=None):
+    """ASGI 애플리케이션에 HTTP 요청 하나를 직접 전달 (uvicorn 등 서버 없이 같은 이벤트 루프에서 실행)"""
+    body = json.dumps(data).encode() if data is not None else b''
+    headers = {'host': host, 'content-type': 'application/json', 'content-length': str(len(body)), **headers}
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method, 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        'client': ('127.0.0.1', 0), 'server': (host, 80),
+    }
+    sent = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        # 응답이 끝날 때까지 연결을 유지
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    status_code, chunks = None, []
+
+    async def send(message):
+        nonlocal status_code
+        if message['type'] == 'http.response.start':
+            status_code = message['status']
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        disconnected.set()
+    return AsgiResponse(status_code, b''.join(chunks))
+
+
+class ConcurrencyMonitor:
+    """동시에 처리 중인 요청 수와 프로세스 스레드 수의 최댓값을 기록"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.peak_threads = threading.active_count()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            # 모니터 스레드 자신은 제외
+            self.peak_threads = max(self.peak_threads, threading.active_count() - 1)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stopped.set()
+        self._thread.join()
+
+    def enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+def percentile(sorted_values, pct):
+    # nearest-rank 방식
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples):
+    latencies = sorted(s['ms'] for s in samples)
+    ok = [s for s in samples if s['ok']]
+    summary = {
+        'requests': len(samples),
+        'errors': len(samples) - len(ok),
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else None,
+    }
+    for pct in PERCENTILES:
+        value = percentile(latencies, pct)
+        summary[f'p{pct}_ms'] = round(value, 3) if value is not None else None
+    # ASGI 모드는 요청별 쿼리 수를 세지 않음 (queries/rows가 None)
+    counted = [s for s in ok if s['queries'] is not None]
+    summary['queries_per_request'] = round(sum(s['queries'] for s in counted) / len(counted), 2) if counted else None
+    summary['rows_written_per_request'] = round(sum(s['rows'] for s in counted) / len(counted), 2) if counted else None
+    summary['rows_written'] = sum(s['rows'] for s in counted) if counted else None
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "시작 → 답안 저장 → 제출 → 상세 → 내 목록 흐름을 여러 사용자가 동시에 수행하며 "
+        "엔드포인트별 지연 시간(p50/p95/p99), 요청당 쿼리 수, 변경된 행 수를 측정합니다. "
+        "--server asgi는 같은 흐름을 하나의 이벤트 루프에서 ASGI 애플리케이션으로 보내 "
+        "동시 처리 요청 수와 필요한 스레드 수를 WSGI(연결당 스레드)와 비교합니다. "
+        "생성한 데이터는 측정 후 삭제됩니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grades', type=int, default=3)
+        parser.add_argument('--users', type=int, default=30)
+        parser.add_argument('--quizzes', type=int, default=6)
+        parser.add_argument('--questions', type=int, default=50, help="퀴즈별 문제은행 크기")
+        parser.add_argument('--draw', type=int, default=10, help="세션당 출제 문제 수")
+        parser.add_argument('--choices', type=int, default=4)
+        parser.add_argument('--attempts', type=int, default=2, help="사용자별 응시할 퀴즈 수")
+        parser.add_argument('--concurrency', type=int, default=4, help="동시에 실행할 사용자(연결) 수 (SQLite는 1 권장)")
+        parser.add_argument(
+            '--server', choices=['wsgi', 'asgi'], default='wsgi',
+            help="wsgi: 연결마다 스레드 하나 / asgi: 이벤트 루프 하나 (ASYNC_VIEWS=True로 실행하면 비동기 뷰 사용)",
+        )
+        parser.add_argument('--seed', type=int, default=0, help="답안 선택용 난수 시드")
+        parser.add_argument('--output', help="결과를 저장할 JSON 파일 경로")
+        parser.add_argument('--baseline', help="비교할 이전 결과 JSON 파일 경로")
+        parser.add_argument('--keep-data', action='store_true', help="측정 후 생성한 데이터를 삭제하지 않음")
+
+    def handle(self, *args, **options):
+        self.host = next((h for h in settings.ALLOWED_HOSTS if h and h != '*' and not h.startswith('.')), 'localhost')
+        self.prefix = f"bench-{uuid.uuid4().hex[:6]}"
+        self.lock = threading.Lock()
+        self.samples = {name: [] for name in ENDPOINTS}
+
+        if options['server'] == 'asgi' and not settings.ASYNC_VIEWS:
+            self.stderr.write("ASYNC_VIEWS=False: ASGI에서도 동기 뷰가 요청별 스레드에서 실행됩니다.")
+
+        plan = self.seed(options)
+        try:
+            started = time.perf_counter()
+            with ConcurrencyMonitor() as self.monitor:
+                if options['server'] == 'asgi':
+                    asyncio.run(self.run_asgi(plan, options))
+                else:
+                    with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+                        list(executor.map(lambda args: self.run_user(*args, options['seed']), plan))
+            elapsed = time.perf_counter() - started
+        finally:
+            if not options['keep_data']:
+                self.cleanup()
+
+        result = {
+            'revision': git_revision(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'server': options['server'],
+            'async_views': settings.ASYNC_VIEWS,
+            'options': {
+                key: options[key] for key in (
+                    'grades', 'users', 'quizzes', 'questions', 'draw', 'choices', 'attempts', 'concurrency', 'seed'
+                )
+            },
+            'elapsed_s': round(elapsed, 3),
+            'requests_per_s': round(sum(len(s) for s in self.samples.values()) / elapsed, 2),
+            'peak_in_flight': self.monitor.peak_in_flight,
+            'peak_threads': self.monitor.peak_threads,
+            'endpoints': {name: summarize(samples) for name, samples in self.samples.items()},
+        }
+        self.report(result, options.get('baseline'))
+        if options.get('output'):
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"결과 저장: {options['output']}")
+
+    def seed(self, options):
+        grades = [Grade.objects.create(name=f"{self.prefix}-{i}") for i in range(options['grades'])]
+        admin = User.objects.create(username=f"{self.prefix}-admin")
+        quizzes = Quiz.objects.bulk_create([
+            Quiz(
+                title=f"{self.prefix} 퀴즈 {i}", num_questions=options['draw'],
+                grade=grades[i % len(grades)], created_by=admin,
+            )
+            for i in range(options['quizzes'])
+        ])
+        questions = Question.objects.bulk_create(
+            [Question(quiz=quiz, text=f"문제 {j}") for quiz in quizzes for j in range(options['questions'])],
+            batch_size=5000,
+        )
+        Choice.objects.bulk_create(
+            [Choice(question=q, text=str(k), is_correct=k == 0) for q in questions for k in range(options['choices'])],
+            batch_size=5000,
+        )
+        users = User.objects.bulk_create([
+            User(username=f"{self.prefix}-user{i}") for i in range(options['users'])
+        ])
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, grade=grades[i % len(grades)]) for i, user in enumerate(users)
+        ])
+
+        quizzes_by_grade = {}
+        for quiz in quizzes:
+            quizzes_by_grade.setdefault(quiz.grade_id, []).append(quiz.id)
+        plan = []
+        for i, user in enumerate(users):
+            available = quizzes_by_grade.get(grades[i % len(grades)].id, [])
+            quiz_ids = [available[(i + k) % len(available)] for k in range(min(options['attempts'], len(available)))]
+            plan.append((i, str(AccessToken.for_user(user)), quiz_ids))
+        return plan
+
+    def cleanup(self):
+        # 사용자 삭제 시 프로필/세션, 관리자 삭제 시 퀴즈/문제/선택지가 함께 삭제됨
+        User.objects.filter(username__startswith=f"{self.prefix}-").delete()
+        Grade.objects.filter(name__startswith=f"{self.prefix}-").delete()
+
+    def run_user(self, index, token, quiz_ids, seed):
+        rng = random.Random(seed * 100003 + index)
+        client = Client(HTTP_HOST=self.host, HTTP_AUTHORIZATION=f"Bearer {token}")
+        try:
+            for quiz_id in quiz_ids:
+                res = self.call('start', client.post, f"/api/sessions/{quiz_id}/start/")
+                if res is None or res.status_code not in (200, 201):
+                    continue
+                session_id = res.json()['session_id']
+                # 답안 선택에 필요한 출제 정보는 측정 밖에서 조회
+                question_order, choice_order = session_orders(
+                    UserQuizSession.objects.only(*ORDER_FIELDS).get(id=session_id)
+                )
+                for question_id in question_order:
+                    self.call(
+                        'save_answer', client.patch, f"/api/sessions/sessions/{session_id}/answers/",
+                        data={'question_id': question_id, 'choice_id': rng.choice(choice_order[str(question_id)])},
+                        content_type='application/json',
+                    )
+                self.call('submit', client.post, f"/api/sessions/sessions/{session_id}/submit/")
+                self.call('detail', client.get, f"/api/sessions/sessions/{session_id}/")
+                self.call('my_list', client.get, "/api/sessions/my_list/")
+        finally:
+            connection.close()
+
+    def call(self, endpoint, method, path, **kwargs):
+        counter = StatementCounter()
+        with connection.execute_wrapper(counter):
+            self.monitor.enter()
+            started = time.perf_counter()
+            try:
+                response = method(path, **kwargs)
+                ok = response.status_code < 400
+            except Exception as exc:
+                # SQLite 동시 쓰기 잠금 등은 오류로 집계하고 계속 진행
+                self.stderr.write(f"{endpoint} {path}: {exc}")
+                response, ok = None, False
+            elapsed = (time.perf_counter() - started) * 1000
+            self.monitor.leave()
+        with self.lock:
+            self.samples[endpoint].append({
+                'ms': elapsed, 'ok': ok, 'queries': counter.queries, 'rows': counter.rows_written,
+            })
+        return response
+
+    async def run_asgi(self, plan, options):
+        app = get_asgi_application()
+        connections = asyncio.Semaphore(options['concurrency'])
+
+        async def run(index, token, quiz_ids):
+            async with connections:
+                await self.run_user_async(app, index, token, quiz_ids, options['seed'])
+        await asyncio.gather(*(run(*args) for args in plan))
+
+    async def run_user_async(self, app, index, token, quiz_ids, seed):
+        rng = random.Random(seed * 100003 + index)
+        headers = {'authorization': f"Bearer {token}"}
+        for quiz_id in quiz_ids:
+            res = await self.acall(app, 'start', 'POST', f"/api/sessions/{quiz_id}/start/", headers)
+            if res is None or res.status_code not in (200, 201):
+                continue
+            session_id = res.json()['session_id']
+            question_order, choice_order = await asession_orders(
+                await UserQuizSession.objects.only(*ORDER_FIELDS).aget(id=session_id)
+            )
+            for question_id in question_order:
+                await self.acall(
+                    app, 'save_answer', 'PATCH', f"/api/sessions/sessions/{session_id}/answers/", headers,
+                    data={'question_id': question_id, 'choice_id': rng.choice(choice_order[str(question_id)])},
+                )
+            await self.acall(app, 'submit', 'POST', f"/api/sessions/sessions/{session_id}/submit/", headers)
+            await self.acall(app, 'detail', 'GET', f"/api/sessions/sessions/{session_id}/", headers)
+            await self.acall(app, 'my_list', 'GET', "/api/sessions/my_list/", headers)
+
+    async def acall(self, app, endpoint, method, path, headers, data=None):
+        # 쿼리가 요청별 스레드에서 실행되므로 쿼리 수/변경 행 수는 세지 않음
+        self.monitor.enter()
+        started = time.perf_counter()
+        try:
+            response = await asgi_request(app, method, path, self.host, headers, data)
+            ok = response.status_code < 400
+        except Exception as exc:
+            self.stderr.write(f"{endpoint} {path}: {exc}")
+            response, ok = None, False
+        elapsed = (time.perf_counter() - started) * 1000
+        self.monitor.leave()
+        self.samples[endpoint].append({'ms': elapsed, 'ok': ok, 'queries': None, 'rows': None})
+        return response
+
+    def report(self, result, baseline_path):
+        baseline, previous = {}, None
+        if baseline_path:
+            with open(baseline_path, encoding='utf-8') as f:
+                previous = json.load(f)
+            baseline = previous.get('endpoints', {})
+
+        self.stdout.write(
+            f"{result['database']} / {result['server']} / revision {result['revision']} / "
+            f"{result['elapsed_s']}s / {result['requests_per_s']} req/s / "
+            f"동시 요청 최대 {result['peak_in_flight']} / 스레드 최대 {result['peak_threads']}"
+        )
+        if previous and 'peak_threads' in previous:
+            self.stdout.write(
+                f"baseline {previous.get('server', 'wsgi')}: {previous['requests_per_s']} req/s / "
+                f"동시 요청 최대 {previous['peak_in_flight']} / 스레드 최대 {previous['peak_threads']}"
+            )
+        self.stdout.write(
+            f"{'endpoint':<13}{'requests':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+            f"{'queries':>9}{'rows':>7}"
+        )
+        for name, summary in result['endpoints'].items():
+            line = (
+                f"{name:<13}{summary['requests']:>9}{summary['errors']:>8}"
+                f"{_fmt(summary['p50_ms']):>10}{_fmt(summary['p95_ms']):>10}{_fmt(summary['p99_ms']):>10}"
+                f"{_fmt(summary['queries_per_request']):>9}{_fmt(summary['rows_written_per_request']):>7}"
+            )
+            before = baseline.get(name)
+            if before and before.get('p95_ms') and summary['p95_ms'] is not None:
+                change = (summary['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100
+                line += f"  p95 {change:+.1f}%"
+                if None not in (before.get('queries_per_request'), summary['queries_per_request']) and \
+                        before['queries_per_request'] != summary['queries_per_request']:
+                    line += f", queries {before.get('queries_per_request')} → {summary['queries_per_request']}"
+            self.stdout.write(line)
+
+
+def _fmt(value):
+    return '-' if value is None else f"{value:.2f}"
@@ -0,0 +1,87 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from quizzes.models import Quiz, Question, Choice
+from quiz_sessions.sampling import draw_question_ids, build_choice_order
+
+
+class _Rollback(Exception):
+    pass
+
+
+def sample_legacy(quiz):
+    # 기존 StartQuizSessionView 방식 - 비교용
+    questions = list(quiz.questions.all())
+    random.shuffle(questions)
+    questions = questions[:quiz.num_questions]
+    choice_order = {}
+    for question in questions:
+        choices = list(question.choices.all())
+        random.shuffle(choices)
+        choice_order[str(question.id)] = [c.id for c in choices]
+    return [q.id for q in questions], choice_order
+
+
+def sample_ids(quiz, use_cache):
+    question_order = draw_question_ids(quiz, use_cache=use_cache)
+    return question_order, build_choice_order(question_order, quiz.shuffle_choices)
+
+
+class Command(BaseCommand):
+    help = "세션 시작 시 문제 추출 비용을 문제은행 크기별로 측정합니다. 모든 데이터는 롤백됩니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bank-sizes', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000])
+        parser.add_argument('--draw', type=int, default=20)
+        parser.add_argument('--choices', type=int, default=4)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--skip-legacy', action='store_true', help="기존 방식 측정 생략 (큰 문제은행에서 느림)")
+
+    def handle(self, *args, **options):
+        strategies = [
+            ('ids', lambda quiz: sample_ids(quiz, use_cache=False)),
+            ('ids+cache', lambda quiz: sample_ids(quiz, use_cache=True)),
+        ]
+        if not options['skip_legacy']:
+            strategies.append(('legacy', sample_legacy))
+
+        self.stdout.write(f"{'strategy':<12}{'bank':>9}{'draw':>6}{'queries':>9}{'avg ms':>10}")
+        for bank_size in options['bank_sizes']:
+            try:
+                with transaction.atomic():
+                    quiz = self.seed(bank_size, options['draw'], options['choices'])
+                    for name, sample in strategies:
+                        queries, elapsed = self.measure(sample, quiz, options['repeat'])
+                        self.stdout.write(
+                            f"{name:<12}{bank_size:>9}{options['draw']:>6}{queries:>9}{elapsed * 1000:>10.2f}"
+                        )
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def seed(self, bank_size, draw, num_choices):
+        user = User.objects.create(username='__bench_question_sampling__')
+        quiz = Quiz.objects.create(title='bench', num_questions=draw, created_by=user)
+        questions = Question.objects.bulk_create(
+            [Question(quiz=quiz, text=f"문제 {i}") for i in range(bank_size)], batch_size=5000
+        )
+        Choice.objects.bulk_create(
+            [Choice(question=q, text=str(j), is_correct=j == 0) for q in questions for j in range(num_choices)],
+            batch_size=5000,
+        )
+        return quiz
+
+    def measure(self, sample, quiz, repeat):
+        # 첫 실행은 캐시 워밍업
+        sample(quiz)
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            for _ in range(repeat):
+                sample(quiz)
+            elapsed = (time.perf_counter() - started) / repeat
+        return len(ctx.captured_queries) // repeat, elapsed
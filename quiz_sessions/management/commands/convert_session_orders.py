@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from quiz_sessions.models import UserQuizSession, ArchivedQuizSession
+from quiz_sessions.orders import CHUNK_SIZE, iter_convert
+
+
+class Command(BaseCommand):
+    help = "세션의 문제/선택지 순서를 압축 형식(구성 버전 + 시드)과 JSON 형식 사이에서 chunk 단위로 변환합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--to', choices=['compact', 'json'], default='compact')
+        parser.add_argument('--quiz', type=int, help="특정 퀴즈의 세션만 변환")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="저장하지 않고 변환 가능한 세션 수만 계산")
+
+    def handle(self, *args, **options):
+        to_compact = options['to'] == 'compact'
+        prefix = "[dry-run] " if options['dry_run'] else ""
+        # 보관된 세션도 같은 형식으로 변환
+        for model in (UserQuizSession, ArchivedQuizSession):
+            for progress in iter_convert(
+                model, to_compact, options['quiz'], options['chunk_size'], options['dry_run']
+            ):
+                if progress['total']:
+                    self.stdout.write(f"{model.__name__}: {progress['processed']}/{progress['total']} 처리")
+            self.stdout.write(self.style.SUCCESS(
+                f"{prefix}{model.__name__}: {progress['converted']}개 세션을 {options['to']} 형식으로 변환 "
+                f"(변환 불가 {progress['skipped']}개)"
+            ))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz_sessions.answer_buffer import get_buffer, flush_dirty
+
+
+class Command(BaseCommand):
+    help = "답안 버퍼(ANSWER_BUFFER_BACKEND)에 쌓인 답안을 DB에 일괄 반영합니다. --loop 옵션으로 백그라운드 flusher로 실행합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--loop', action='store_true', help="종료하지 않고 주기적으로 반영")
+        parser.add_argument('--interval', type=float, default=2.0, help="--loop 사용 시 반영 주기(초)")
+
+    def handle(self, *args, **options):
+        if get_buffer() is None:
+            raise CommandError("ANSWER_BUFFER_BACKEND가 설정되지 않았습니다.")
+
+        while True:
+            total = 0
+            while True:
+                flushed = flush_dirty(options['batch_size'])
+                total += flushed
+                if flushed < options['batch_size']:
+                    break
+            if total or not options['loop']:
+                self.stdout.write(f"{total}개 세션의 답안을 반영했습니다.")
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz_sessions.grading_queue import get_queue, grade_sessions, pending_session_ids
+
+
+class Command(BaseCommand):
+    help = "비동기 채점 큐(GRADING_QUEUE_BACKEND)에서 세션을 꺼내 일괄 채점합니다. --loop 옵션으로 워커로 실행합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--loop', action='store_true', help="종료하지 않고 주기적으로 채점")
+        parser.add_argument('--interval', type=float, default=1.0, help="--loop 사용 시 큐가 비었을 때 대기 시간(초)")
+        parser.add_argument('--pending', action='store_true', help="채점되지 않은 제출 세션을 다시 큐에 넣음 (워커 장애 복구용)")
+
+    def handle(self, *args, **options):
+        grading_queue = get_queue()
+        if grading_queue is None:
+            raise CommandError("GRADING_QUEUE_BACKEND가 설정되지 않았습니다.")
+
+        if options['pending']:
+            session_ids = pending_session_ids()
+            grading_queue.enqueue(session_ids)
+            self.stdout.write(f"채점 대기 세션 {len(session_ids)}개를 큐에 넣었습니다.")
+
+        if not hasattr(grading_queue, 'pop'):
+            # 프로세스 내부 큐는 해당 프로세스의 워커 스레드가 처리
+            if options['pending'] and hasattr(grading_queue, 'join'):
+                grading_queue.join()
+            return
+
+        while True:
+            total = 0
+            while True:
+                batch = grading_queue.pop(options['batch_size'])
+                if not batch:
+                    break
+                try:
+                    total += grade_sessions(batch)
+                except Exception:
+                    grading_queue.enqueue(batch)
+                    raise
+            if total or not options['loop']:
+                self.stdout.write(f"{total}개 세션을 채점했습니다.")
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quizzes.models import Quiz
+from quiz_sessions.analytics import REBUILD_CHUNK_SIZE, rebuild_quiz
+
+
+class Command(BaseCommand):
+    help = "채점된 세션을 chunk 단위로 읽어 퀴즈 통계(점수 분포, 문항/선택지 집계)를 처음부터 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_ids', type=int, nargs='*', help="생략하면 모든 퀴즈")
+        parser.add_argument('--chunk-size', type=int, default=REBUILD_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        quiz_ids = options['quiz_ids'] or list(Quiz.objects.order_by('id').values_list('id', flat=True))
+        missing = set(quiz_ids) - set(Quiz.objects.filter(id__in=quiz_ids).values_list('id', flat=True))
+        if missing:
+            raise CommandError(f"퀴즈가 없습니다: {sorted(missing)}")
+
+        for quiz_id in quiz_ids:
+            count = rebuild_quiz(quiz_id, options['chunk_size'])
+            if count is None:
+                self.stdout.write(f"퀴즈 {quiz_id}: 이후 시작된 재계산이 반영하므로 건너뜀")
+            else:
+                self.stdout.write(f"퀴즈 {quiz_id}: {count}개 세션 집계")
+        self.stdout.write(self.style.SUCCESS(f"{len(quiz_ids)}개 퀴즈 통계를 다시 계산했습니다."))
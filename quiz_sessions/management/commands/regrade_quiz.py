@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quizzes.models import Quiz
+from quiz_sessions.regrade import CHUNK_SIZE, iter_regrade
+
+
+class Command(BaseCommand):
+    help = "정답 수정 후 퀴즈의 제출된 세션을 chunk 단위로 다시 채점하고 점수 변경 규모를 출력합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_id', type=int)
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="점수를 저장하지 않고 변경 규모만 계산")
+
+    def handle(self, *args, **options):
+        if not Quiz.objects.filter(id=options['quiz_id']).exists():
+            raise CommandError(f"퀴즈가 없습니다: {options['quiz_id']}")
+
+        for progress in iter_regrade(options['quiz_id'], options['chunk_size'], options['dry_run']):
+            percent = progress['processed'] / progress['total'] * 100 if progress['total'] else 100
+            self.stdout.write(
+                f"{progress['processed']}/{progress['total']} ({percent:.1f}%) 처리, {progress['changed']}개 점수 변경"
+            )
+        prefix = "[dry-run] " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}재채점 완료: {progress['processed']}개 세션 중 {progress['changed']}개 점수 변경 "
+            f"(상승 {progress['increased']}, 하락 {progress['decreased']}, 총 {progress['points_delta']:+d}점)"
+        ))
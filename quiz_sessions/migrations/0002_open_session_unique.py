@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:29
+
+import logging
+
+from django.conf import settings
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+
+def remove_duplicate_open_sessions(apps, schema_editor):
+    # 기존 API는 항상 id가 가장 작은 미제출 세션을 반환했으므로 나머지 중복 세션을 정리
+    # 중복 세션 ID로 저장된 답안은 남기는 세션에 아직 답하지 않은 (출제된) 문제에 한해 옮긴 뒤 삭제
+    UserQuizSession = apps.get_model('quiz_sessions', 'UserQuizSession')
+    duplicates = (
+        UserQuizSession.objects.filter(is_submitted=False)
+        .values('user_id', 'quiz_id')
+        .annotate(first_id=models.Min('id'), count=models.Count('id'))
+        .filter(count__gt=1)
+    )
+    for row in duplicates:
+        kept = UserQuizSession.objects.get(id=row['first_id'])
+        extra = list(
+            UserQuizSession.objects
+            .filter(user_id=row['user_id'], quiz_id=row['quiz_id'], is_submitted=False, id__gt=row['first_id'])
+            .order_by('id')
+        )
+        presented = {str(question_id) for question_id in kept.question_order}
+        merged = False
+        for session in extra:
+            for question_id, choice_id in session.answers.items():
+                if question_id in presented and question_id not in kept.answers:
+                    kept.answers[question_id] = choice_id
+                    merged = True
+        if merged:
+            kept.save(update_fields=['answers'])
+        UserQuizSession.objects.filter(id__in=[session.id for session in extra]).delete()
+        logger.warning(
+            "중복 미제출 세션 삭제 (user=%s, quiz=%s, 유지=%s, 삭제=%s)",
+            row['user_id'], row['quiz_id'], kept.id, [session.id for session in extra],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_sessions', '0001_initial'),
+        ('quizzes', '0003_remove_quiz_classroom'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_open_sessions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='userquizsession',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_submitted', False)), fields=('user', 'quiz'), name='uniq_open_session_per_user_quiz'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_sessions', '0002_open_session_unique'),
+        ('quizzes', '0003_remove_quiz_classroom'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userquizsession',
+            index=models.Index(fields=['user', 'quiz', 'is_submitted'], name='session_user_quiz_submit_idx'),
+        ),
+    ]
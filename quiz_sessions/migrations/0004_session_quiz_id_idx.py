@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_sessions', '0003_session_user_quiz_submit_idx'),
+        ('quizzes', '0004_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userquizsession',
+            index=models.Index(fields=['quiz', 'id'], name='session_quiz_id_idx'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+TABLE = 'quiz_sessions_archivedquizsession'
+
+# PostgreSQL: started_at 기준 RANGE 파티션 테이블. 파티션 키가 기본 키에 포함되어야 하므로 (id, started_at)
+# 월별 파티션은 quiz_sessions.archive.ensure_partitions 가 보관 시점에 생성한다.
+# 라이브 UserQuizSession 테이블은 파티션하지 않는다. 파티션 테이블의 UNIQUE 제약은 파티션 키(started_at)를
+# 포함해야 하는데, 그러면 uniq_open_session_per_user_quiz (사용자/퀴즈별 미제출 세션 1개, 세션 시작의 중복 방지)를
+# 유지할 수 없기 때문. 대신 오래된 세션을 이 테이블로 옮겨 라이브 테이블을 작게 유지한다.
+POSTGRES_SQL = f"""
+CREATE TABLE "{TABLE}" (
+    "id" bigint NOT NULL,
+    "question_order" jsonb NOT NULL,
+    "choice_order" jsonb NOT NULL,
+    "answers" jsonb NOT NULL,
+    "is_submitted" boolean NOT NULL,
+    "score" integer NULL,
+    "started_at" timestamp with time zone NOT NULL,
+    "submitted_at" timestamp with time zone NULL,
+    "archived_at" timestamp with time zone NOT NULL,
+    "quiz_id" bigint NOT NULL,
+    "user_id" integer NOT NULL,
+    PRIMARY KEY ("id", "started_at")
+) PARTITION BY RANGE ("started_at");
+CREATE INDEX "archived_quiz_id_idx" ON "{TABLE}" ("quiz_id", "id");
+CREATE INDEX "archived_user_quiz_idx" ON "{TABLE}" ("user_id", "quiz_id");
+"""
+
+
+def create_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SQL)
+    else:
+        schema_editor.create_model(apps.get_model('quiz_sessions', 'ArchivedQuizSession'))
+
+
+def drop_table(apps, schema_editor):
+    # 파티션도 함께 삭제됨
+    schema_editor.delete_model(apps.get_model('quiz_sessions', 'ArchivedQuizSession'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_sessions', '0005_quiz_stats'),
+        ('quizzes', '0004_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # 테이블은 DB 종류에 따라 아래 RunPython에서 생성
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ArchivedQuizSession',
+                    fields=[
+                        ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                        ('question_order', models.JSONField()),
+                        ('choice_order', models.JSONField()),
+                        ('answers', models.JSONField(default=dict)),
+                        ('is_submitted', models.BooleanField(default=True)),
+                        ('score', models.IntegerField(blank=True, null=True)),
+                        ('started_at', models.DateTimeField()),
+                        ('submitted_at', models.DateTimeField(blank=True, null=True)),
+                        ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                        ('quiz', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='quizzes.quiz')),
+                        ('user', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'indexes': [models.Index(fields=['quiz', 'id'], name='archived_quiz_id_idx'), models.Index(fields=['user', 'quiz'], name='archived_user_quiz_idx')],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_table, drop_table),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_sessions', '0006_archived_sessions'),
+        ('quizzes', '0004_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedquizsession',
+            name='order_seed',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedquizsession',
+            name='quiz_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userquizsession',
+            name='order_seed',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userquizsession',
+            name='quiz_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedquizsession',
+            name='choice_order',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedquizsession',
+            name='question_order',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='userquizsession',
+            name='choice_order',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='userquizsession',
+            name='question_order',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='QuizLayout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('question_ids', models.JSONField(help_text='전체 문제 ID (id 오름차순)')),
+                ('choice_ids', models.JSONField(help_text='{str(question_id): [choice_id, ...]} (id 오름차순)')),
+                ('count', models.PositiveIntegerField(help_text='출제 문제 수')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='layouts', to='quizzes.quiz')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('quiz', 'version'), name='uniq_layout_version_per_quiz'), models.UniqueConstraint(fields=('quiz', 'fingerprint'), name='uniq_layout_fingerprint_per_quiz')],
+            },
+        ),
+    ]
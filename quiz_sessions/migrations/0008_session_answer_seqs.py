@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_sessions', '0007_compact_session_orders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userquizsession',
+            name='answer_seqs',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
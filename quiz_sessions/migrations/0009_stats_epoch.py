@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_sessions', '0008_session_answer_seqs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizstats',
+            name='epoch',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userquizsession',
+            name='stats_epoch',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,36 +1,140 @@
 from django.db import models
 from django.contrib.auth.models import User
-from quizzes.models import Quiz
+from quizzes.models import Quiz, Question, Choice
 from django.utils import timezone
+from .grading import grade_session
 
 class UserQuizSession(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE)
-    question_order = models.JSONField()
-    choice_order = models.JSONField()
+    # 압축 모드(COMPACT_SESSION_ORDERS)의 세션은 순서 JSON 대신 퀴즈 구성 버전(QuizLayout)과 순서 시드만 저장
+    # 순서는 quiz_sessions.orders.session_orders()로 읽는다
+    question_order = models.JSONField(null=True, blank=True)
+    choice_order = models.JSONField(null=True, blank=True)
+    order_seed = models.TextField(null=True, blank=True)
+    quiz_version = models.PositiveIntegerField(null=True, blank=True)
     answers = models.JSONField(default=dict)
+    # 일괄 저장 API로 문제별 마지막으로 반영한 클라이언트 순번 {str(question_id): seq}
+    answer_seqs = models.JSONField(default=dict, blank=True)
     is_submitted = models.BooleanField(default=False)
     score = models.IntegerField(null=True, blank=True)
     started_at = models.DateTimeField(auto_now_add=True)
     submitted_at = models.DateTimeField(null=True, blank=True)
+    # 퀴즈 통계에 반영된 집계 세대 (QuizStats.epoch). null이면 아직 통계에 더해지지 않은 세션
+    stats_epoch = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # 사용자/퀴즈별로 제출되지 않은 세션은 하나만 허용
+            models.UniqueConstraint(
+                fields=['user', 'quiz'],
+                condition=models.Q(is_submitted=False),
+                name='uniq_open_session_per_user_quiz',
+            ),
+        ]
+        indexes = [
+            # 내 퀴즈 목록의 제출 여부 조회 (user, quiz_id IN (...)) 를 인덱스만으로 처리
+            models.Index(fields=['user', 'quiz', 'is_submitted'], name='session_user_quiz_submit_idx'),
+            # 관리자 세션 목록: quiz_id 필터 + id 순 keyset 페이지네이션
+            models.Index(fields=['quiz', 'id'], name='session_quiz_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.quiz.title}"
 
     def calculate_score(self):
-        from quizzes.models import Choice
-        total = 0
-        for qid, cid in self.answers.items():
-            try:
-                correct = Choice.objects.get(question_id=qid, is_correct=True)
-                if correct.id == cid:
-                    total += 1
-            except Choice.DoesNotExist:
-                continue
-        return total
-
-    def save(self, *args, **kwargs):
-        if self.is_submitted and self.score is None:
+        return grade_session(self)
+
+    def save(self, *args, grade=True, **kwargs):
+        # grade=False: 비동기 채점 모드에서 채점을 워커에 맡길 때
+        if self.is_submitted and self.score is None and grade:
             self.score = self.calculate_score()
             self.submitted_at = self.submitted_at or timezone.now()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class ArchivedQuizSession(models.Model):
+    """
+    보관된 세션 (archive_sessions 명령으로 UserQuizSession에서 옮겨진 오래된 제출 세션, 읽기 전용).
+    원본 세션 ID를 그대로 유지하며, PostgreSQL에서는 started_at 기준 월별 RANGE 파티션 테이블이다.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    # 파티션 테이블에는 FK 제약을 두지 않음 (삭제는 ORM의 CASCADE로 처리)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_constraint=False, db_index=False, related_name='+')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, db_constraint=False, db_index=False, related_name='+')
+    question_order = models.JSONField(null=True, blank=True)
+    choice_order = models.JSONField(null=True, blank=True)
+    order_seed = models.TextField(null=True, blank=True)
+    quiz_version = models.PositiveIntegerField(null=True, blank=True)
+    answers = models.JSONField(default=dict)
+    is_submitted = models.BooleanField(default=True)
+    score = models.IntegerField(null=True, blank=True)
+    started_at = models.DateTimeField()
+    submitted_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['quiz', 'id'], name='archived_quiz_id_idx'),
+            models.Index(fields=['user', 'quiz'], name='archived_user_quiz_idx'),
+        ]
+
+
+# 퀴즈 통계 누적 집계 (analytics.record_sessions로 제출/채점 시 갱신, rebuild_quiz_stats로 재계산)
+
+class QuizStats(models.Model):
+    quiz = models.OneToOneField(Quiz, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    # rebuild_quiz_stats를 시작할 때마다 증가
+    epoch = models.PositiveIntegerField(default=0)
+    submissions = models.PositiveIntegerField(default=0)
+    score_sum = models.BigIntegerField(default=0)
+    score_sq_sum = models.BigIntegerField(default=0)
+
+
+class QuizScoreBucket(models.Model):
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='score_buckets')
+    score = models.IntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['quiz', 'score'], name='uniq_score_bucket_per_quiz'),
+        ]
+
+
+class QuestionStats(models.Model):
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='question_stats')
+    presented = models.PositiveIntegerField(default=0, help_text="출제된 세션 수")
+    answered = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    # 변별도(점이연 상관계수) 계산용: 출제된 세션의 총점 합/제곱합, 정답을 맞힌 세션의 총점 합
+    score_sum = models.BigIntegerField(default=0)
+    score_sq_sum = models.BigIntegerField(default=0)
+    correct_score_sum = models.BigIntegerField(default=0)
+
+
+class ChoiceStats(models.Model):
+    choice = models.OneToOneField(Choice, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='choice_stats')
+    picks = models.PositiveIntegerField(default=0)
+
+
+class QuizLayout(models.Model):
+    """
+    압축 모드 세션의 순서를 다시 만들 때 쓰는 퀴즈 문제 구성 스냅샷 (만들어진 뒤 바뀌지 않음).
+    문제/선택지 추가·삭제나 출제 문제 수 변경으로 구성이 바뀌면 다음 버전을 만든다.
+    """
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='layouts')
+    version = models.PositiveIntegerField()
+    fingerprint = models.CharField(max_length=64)
+    question_ids = models.JSONField(help_text="전체 문제 ID (id 오름차순)")
+    choice_ids = models.JSONField(help_text="{str(question_id): [choice_id, ...]} (id 오름차순)")
+    count = models.PositiveIntegerField(help_text="출제 문제 수")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['quiz', 'version'], name='uniq_layout_version_per_quiz'),
+            models.UniqueConstraint(fields=['quiz', 'fingerprint'], name='uniq_layout_fingerprint_per_quiz'),
+        ]
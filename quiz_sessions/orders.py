@@ -0,0 +1,310 @@
+import bisect
+import hashlib
+import json
+import random
+import threading
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from quizzes import answer_keys
+from quizzes.models import Quiz, Question, Choice
+from .models import QuizLayout
+from .sampling import draw_question_ids, build_choice_order
+
+# 세션 문제/선택지 순서의 압축 저장 (COMPACT_SESSION_ORDERS)
+# 세션마다 question_order/choice_order JSON을 저장하는 대신 퀴즈 구성 스냅샷(QuizLayout)의 버전과
+# 순서 시드(order_seed) 하나만 저장하고, 채점/시험지/답안 검증에서 필요할 때 순서를 다시 만든다.
+# 시드는 혼합 기수(mixed radix) 정수로 각 자리가 "남은 문제(선택지) 중 몇 번째를 골랐는지"를 나타내므로
+# 시드 → 순서, 순서 → 시드 변환이 모두 결정적이다. 그래서 기존 JSON 세션도 그대로 변환할 수 있다.
+# QuizLayout은 바뀌지 않으므로 버전별로 프로세스 내부와 공유 캐시에 보관하고 무효화하지 않는다.
+# 같은 이유로 시드에서 만든 순서도 (퀴즈, 구성 버전, 시드)별로 프로세스 내부 LRU에 보관한다.
+# 변환은 남은 후보 목록을 복사/삭제하지 않고 이미 고른 위치만 정렬해 두고 계산하므로
+# 문제은행 크기와 무관하게 출제 문제 수(k)에 대해 O(k^2)이다.
+
+LOCAL_MAX_LAYOUTS = 1024
+DECODED_MAX_ORDERS = 10000
+CHUNK_SIZE = 1000
+# 순서를 읽는 데 필요한 세션 필드 (only()에 함께 지정)
+ORDER_FIELDS = ('quiz_id', 'question_order', 'choice_order', 'order_seed', 'quiz_version')
+
+_local = {}
+_decoded = OrderedDict()
+_lock = threading.Lock()
+
+
+def compact_enabled():
+    return getattr(settings, 'COMPACT_SESSION_ORDERS', False)
+
+
+def _timeout():
+    return getattr(settings, 'ANSWER_KEY_CACHE_TIMEOUT', 60 * 60)
+
+
+def _layout_key(quiz_id, version):
+    return f"quiz:{quiz_id}:layout:{version}"
+
+
+def _current_key(quiz_id):
+    # 퀴즈/문제/선택지가 바뀌면 내용 버전이 바뀌어 현재 구성을 다시 확인
+    return f"quiz:{quiz_id}:layout:current:{answer_keys.content_version(quiz_id)}"
+
+
+def _as_dict(layout):
+    return {
+        'version': layout.version,
+        'question_ids': layout.question_ids,
+        'choice_ids': layout.choice_ids,
+        'count': layout.count,
+    }
+
+
+def _remember(quiz_id, layout):
+    with _lock:
+        if len(_local) >= LOCAL_MAX_LAYOUTS:
+            _local.clear()
+        _local[(quiz_id, layout['version'])] = layout
+
+
+def get_layout(quiz_id, version):
+    """퀴즈 구성 스냅샷 {'version', 'question_ids', 'choice_ids', 'count'}"""
+    layout = _local.get((quiz_id, version))
+    if layout is None:
+        key = _layout_key(quiz_id, version)
+        layout = cache.get(key)
+        if layout is None:
+            layout = _as_dict(QuizLayout.objects.get(quiz_id=quiz_id, version=version))
+            cache.set(key, layout, _timeout())
+        _remember(quiz_id, layout)
+    return layout
+
+
+def _load_structure(quiz):
+    question_ids = list(Question.objects.filter(quiz_id=quiz.id).order_by('id').values_list('id', flat=True))
+    choice_ids = {str(qid): [] for qid in question_ids}
+    rows = Choice.objects.filter(question__quiz_id=quiz.id).order_by('id').values_list('question_id', 'id')
+    for qid, cid in rows:
+        if str(qid) in choice_ids:
+            choice_ids[str(qid)].append(cid)
+    return question_ids, choice_ids, min(quiz.num_questions, len(question_ids))
+
+
+def _create_layout(quiz_id, fingerprint, question_ids, choice_ids, count):
+    for _ in range(3):
+        version = (QuizLayout.objects.filter(quiz_id=quiz_id).aggregate(v=Max('version'))['v'] or 0) + 1
+        try:
+            with transaction.atomic():
+                return QuizLayout.objects.create(
+                    quiz_id=quiz_id, version=version, fingerprint=fingerprint,
+                    question_ids=question_ids, choice_ids=choice_ids, count=count,
+                )
+        except IntegrityError:
+            # 같은 구성이 동시에 만들어졌으면 그것을 사용, 다른 구성이 같은 버전을 가져갔으면 다음 버전으로 재시도
+            existing = QuizLayout.objects.filter(quiz_id=quiz_id, fingerprint=fingerprint).first()
+            if existing is not None:
+                return existing
+    raise IntegrityError(f"퀴즈 {quiz_id}의 구성 버전을 만들지 못했습니다.")
+
+
+def current_layout(quiz):
+    """퀴즈의 현재 구성 스냅샷. 처음 보는 구성이면 새 버전으로 저장"""
+    key = _current_key(quiz.id)
+    version = cache.get(key)
+    if version is not None:
+        return get_layout(quiz.id, version)
+
+    question_ids, choice_ids, count = _load_structure(quiz)
+    fingerprint = hashlib.sha256(
+        json.dumps([question_ids, choice_ids, count], separators=(',', ':')).encode()
+    ).hexdigest()
+    layout = QuizLayout.objects.filter(quiz_id=quiz.id, fingerprint=fingerprint).first()
+    if layout is None:
+        layout = _create_layout(quiz.id, fingerprint, question_ids, choice_ids, count)
+    layout = _as_dict(layout)
+    cache.set(_layout_key(quiz.id, layout['version']), layout, _timeout())
+    cache.set(key, layout['version'], _timeout())
+    _remember(quiz.id, layout)
+    return layout
+
+
+def _question_positions(layout):
+    # 문제 ID → 구성 내 위치. 구성마다 한 번만 만들어 (프로세스 내부) 스냅샷에 보관
+    positions = layout.get('question_positions')
+    if positions is None:
+        positions = layout['question_positions'] = {qid: i for i, qid in enumerate(layout['question_ids'])}
+    return positions
+
+
+def _rank(taken, position):
+    """이미 고른 위치(taken, 정렬됨)를 제외했을 때 position이 몇 번째인지. taken에 position을 추가"""
+    index = bisect.bisect_left(taken, position)
+    if index < len(taken) and taken[index] == position:
+        raise ValueError("구성과 맞지 않는 순서입니다.")
+    taken.insert(index, position)
+    return position - index
+
+
+def _unrank(taken, rank):
+    """이미 고른 위치(taken, 정렬됨)를 제외하고 rank번째 위치. taken에 추가"""
+    position = rank
+    for index, used in enumerate(taken):
+        if used > position:
+            taken.insert(index, position)
+            return position
+        position += 1
+    taken.append(position)
+    return position
+
+
+def encode(layout, question_order, choice_order):
+    """순서 → 시드. 구성에 없는 문제/선택지가 있거나 선택지 구성이 다르면 ValueError"""
+    if len(question_order) != layout['count'] or set(choice_order) != {str(qid) for qid in question_order}:
+        raise ValueError("구성과 맞지 않는 순서입니다.")
+    digits = []
+    positions = _question_positions(layout)
+    size, taken = len(layout['question_ids']), []
+    for qid in question_order:
+        if qid not in positions:
+            raise ValueError("구성과 맞지 않는 순서입니다.")
+        digits.append((_rank(taken, positions[qid]), size - len(digits)))
+    for qid in question_order:
+        choice_ids = layout['choice_ids'].get(str(qid), [])
+        if len(choice_order[str(qid)]) != len(choice_ids):
+            raise ValueError("구성과 맞지 않는 순서입니다.")
+        taken = []
+        for cid in choice_order[str(qid)]:
+            digits.append((_rank(taken, choice_ids.index(cid)), len(choice_ids) - len(taken) + 1))
+    seed = 0
+    for index, radix in reversed(digits):
+        seed = seed * radix + index
+    return seed
+
+
+def decode(layout, seed):
+    """시드 → (question_order, choice_order)"""
+    question_ids = layout['question_ids']
+    question_order, taken = [], []
+    for picked in range(layout['count']):
+        seed, index = divmod(seed, len(question_ids) - picked)
+        question_order.append(question_ids[_unrank(taken, index)])
+    choice_order = {}
+    for qid in question_order:
+        choice_ids = layout['choice_ids'].get(str(qid), [])
+        order, taken = [], []
+        for picked in range(len(choice_ids)):
+            seed, index = divmod(seed, len(choice_ids) - picked)
+            order.append(choice_ids[_unrank(taken, index)])
+        choice_order[str(qid)] = order
+    return question_order, choice_order
+
+
+def decoded_orders(quiz_id, version, order_seed):
+    """
+    (퀴즈, 구성 버전, 시드)의 순서. 프로세스 내부 LRU에 보관하며 여러 세션이 같은 객체를 공유하므로 읽기 전용
+    """
+    key = (quiz_id, version, order_seed)
+    with _lock:
+        orders = _decoded.get(key)
+        if orders is not None:
+            _decoded.move_to_end(key)
+            return orders
+    orders = decode(get_layout(quiz_id, version), int(order_seed, 16))
+    with _lock:
+        _decoded[key] = orders
+        if len(_decoded) > DECODED_MAX_ORDERS:
+            _decoded.popitem(last=False)
+    return orders
+
+
+def new_order_fields(quiz, rng=random):
+    """새 세션의 순서 필드. 압축 모드면 구성 버전과 시드만, 아니면 순서 JSON"""
+    if not compact_enabled():
+        question_order = draw_question_ids(quiz, rng)
+        return {
+            'question_order': question_order,
+            'choice_order': build_choice_order(question_order, quiz.shuffle_choices, rng),
+        }
+    layout = current_layout(quiz)
+    ids = layout['question_ids']
+    question_order = rng.sample(ids, layout['count']) if quiz.shuffle_questions else ids[:layout['count']]
+    choice_order = {}
+    for qid in question_order:
+        choice_order[str(qid)] = list(layout['choice_ids'][str(qid)])
+        if quiz.shuffle_choices:
+            rng.shuffle(choice_order[str(qid)])
+    return {
+        'order_seed': format(encode(layout, question_order, choice_order), 'x'),
+        'quiz_version': layout['version'],
+    }
+
+
+def session_orders(session):
+    """세션의 (question_order, choice_order). 압축 모드 세션은 시드로 다시 만든 순서 (읽기 전용)"""
+    if session.order_seed is None:
+        return session.question_order, session.choice_order
+    return decoded_orders(session.quiz_id, session.quiz_version, session.order_seed)
+
+
+async def asession_orders(session):
+    """session_orders의 비동기 버전. 순서와 구성 스냅샷이 모두 프로세스 캐시에 없을 때만 스레드에서 조회"""
+    if (
+        session.order_seed is not None
+        and (session.quiz_id, session.quiz_version, session.order_seed) not in _decoded
+        and (session.quiz_id, session.quiz_version) not in _local
+    ):
+        await sync_to_async(get_layout)(session.quiz_id, session.quiz_version)
+    return session_orders(session)
+
+
+def iter_convert(model, to_compact, quiz_id=None, chunk_size=CHUNK_SIZE, dry_run=False):
+    """
+    model(UserQuizSession/ArchivedQuizSession)의 세션 순서를 압축(to_compact) 또는 JSON으로 변환.
+    chunk마다 누적 진행 상황 {'total', 'processed', 'converted', 'skipped'}를 yield (대상이 없으면 한 번).
+    현재 퀴즈 구성으로 표현할 수 없는 세션(시작 후 문제/선택지가 바뀐 세션)은 JSON으로 남긴다
+    """
+    sessions = model.objects.filter(order_seed__isnull=to_compact)
+    if quiz_id is not None:
+        sessions = sessions.filter(quiz_id=quiz_id)
+    progress = {'total': sessions.count(), 'processed': 0, 'converted': 0, 'skipped': 0}
+    if not progress['total']:
+        yield dict(progress)
+        return
+
+    layouts = {}
+    last_id = 0
+    while True:
+        chunk = list(sessions.filter(id__gt=last_id).order_by('id').only('id', *ORDER_FIELDS)[:chunk_size])
+        if not chunk:
+            return
+        changed = []
+        for session in chunk:
+            if to_compact:
+                if session.quiz_id not in layouts:
+                    quiz = Quiz.objects.only('id', 'num_questions').get(id=session.quiz_id)
+                    layouts[session.quiz_id] = current_layout(quiz)
+                layout = layouts[session.quiz_id]
+                try:
+                    seed = encode(layout, session.question_order, session.choice_order)
+                except ValueError:
+                    progress['skipped'] += 1
+                    continue
+                # 되돌린 순서가 같은지 확인한 뒤에만 JSON을 비움
+                if decode(layout, seed) != (session.question_order, session.choice_order):
+                    progress['skipped'] += 1
+                    continue
+                session.order_seed, session.quiz_version = format(seed, 'x'), layout['version']
+                session.question_order = session.choice_order = None
+            else:
+                session.question_order, session.choice_order = session_orders(session)
+                session.order_seed = session.quiz_version = None
+            changed.append(session)
+        if changed and not dry_run:
+            model.objects.bulk_update(changed, ['question_order', 'choice_order', 'order_seed', 'quiz_version'])
+        progress['processed'] += len(chunk)
+        progress['converted'] += len(changed)
+        last_id = chunk[-1].id
+        yield dict(progress)
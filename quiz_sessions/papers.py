@@ -0,0 +1,75 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from quizzes import answer_keys
+from quizzes.models import Question, Choice
+from .orders import session_orders
+
+# 세션 시험지 스냅샷
+# 문제/선택지 순서는 세션 시작 시 고정되므로, 순서대로 정렬된 문제와 선택지(is_correct 제외)를
+# 한 번 만들어 캐시에 보관하고 조회 시 그대로 사용한다.
+# 키에 퀴즈 내용 버전을 포함해 관리자가 문제를 수정하면 자동으로 다시 만들어진다.
+
+
+def _timeout():
+    return getattr(settings, 'SESSION_PAPER_CACHE_TIMEOUT', 60 * 60 * 6)
+
+
+def _paper_key(session, version=None):
+    if version is None:
+        version = answer_keys.content_version(session.quiz_id)
+    return f"session:{session.id}:paper:{version}"
+
+
+def load_session_questions(session, question_ids):
+    """
+    question_ids 순서대로 정렬된 문제 목록과 {choice_id: Choice} 맵을 반환.
+    문제 수와 무관하게 문제 1회, 선택지 1회의 쿼리만 사용
+    """
+    questions = Question.objects.only('id', 'text').in_bulk(question_ids)
+    choice_order = session_orders(session)[1]
+    choice_ids = [cid for qid in question_ids for cid in choice_order.get(str(qid), [])]
+    choices = Choice.objects.only('id', 'text').in_bulk(choice_ids)
+    # 순서 보장
+    sorted_questions = [questions[qid] for qid in question_ids if qid in questions]
+    return sorted_questions, choices
+
+
+def build_paper(session):
+    question_order, choice_order = session_orders(session)
+    questions, choices = load_session_questions(session, question_order)
+    return [
+        {
+            'id': question.id,
+            'text': question.text,
+            'choices': [
+                {'id': choices[cid].id, 'text': choices[cid].text}
+                for cid in choice_order.get(str(question.id), [])
+                if cid in choices
+            ],
+        }
+        for question in questions
+    ]
+
+
+def store_paper(session):
+    paper = build_paper(session)
+    cache.set(_paper_key(session), paper, _timeout())
+    return paper
+
+
+def get_paper(session):
+    paper = cache.get(_paper_key(session))
+    if paper is None:
+        paper = store_paper(session)
+    return paper
+
+
+async def aget_paper(session):
+    """get_paper의 비동기 버전. 캐시에 없으면 시험지를 만드는 DB 조회만 스레드에서 실행"""
+    version = await answer_keys.acontent_version(session.quiz_id)
+    paper = await cache.aget(_paper_key(session, version))
+    if paper is None:
+        paper = await sync_to_async(store_paper)(session)
+    return paper
@@ -0,0 +1,96 @@
+import logging
+import queue
+import threading
+
+from django.db import connections
+
+from quizzes import answer_keys
+from . import analytics
+from .grading import score_answers
+from .models import UserQuizSession, ArchivedQuizSession
+from .orders import ORDER_FIELDS, session_orders
+
+# 정답 수정 후 재채점
+# 퀴즈의 제출된 세션(보관된 세션 포함)을 id 순 keyset으로 chunk_size개씩 읽어 메모리에서 채점하고, 점수가 바뀐 세션만 bulk_update 한다.
+# 정답표는 DB에서 한 번만 읽고, 세션 전체를 한꺼번에 메모리에 올리지 않으므로 응시 수와 무관하게 메모리 사용량이 일정하다.
+# 관리자 API는 start_job()으로 요청과 분리된 작업 스레드에서 재채점하고 진행 상황만 받아 스트리밍하므로,
+# 클라이언트 연결이 끊겨도 재채점과 통계 재계산은 끝까지 실행된다.
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+REGRADE_FIELDS = ['id', 'answers', 'score', *ORDER_FIELDS]
+
+
+def iter_regrade(quiz_id, chunk_size=CHUNK_SIZE, dry_run=False):
+    """
+    chunk마다 누적 진행 상황을 yield (제출된 세션이 없으면 한 번).
+    {'total', 'processed', 'changed', 'increased', 'decreased', 'points_delta'}
+    dry_run이면 점수를 저장하지 않고 변경 규모만 계산
+    """
+    querysets = [
+        model.objects.filter(quiz_id=quiz_id, is_submitted=True) for model in (UserQuizSession, ArchivedQuizSession)
+    ]
+    answer_key = answer_keys.load_from_db(quiz_id)
+    if not dry_run:
+        # 시그널을 거치지 않고 정답이 수정된 경우에도 이후 채점이 최신 정답표를 쓰도록 캐시 무효화
+        answer_keys.invalidate(quiz_id)
+
+    progress = {
+        'total': sum(sessions.count() for sessions in querysets), 'processed': 0, 'changed': 0,
+        'increased': 0, 'decreased': 0, 'points_delta': 0,
+    }
+    try:
+        for sessions in querysets:
+            last_id = 0
+            while True:
+                chunk = list(sessions.filter(id__gt=last_id).order_by('id').only(*REGRADE_FIELDS)[:chunk_size])
+                if not chunk:
+                    break
+                changed = []
+                for session in chunk:
+                    score = score_answers(session.answers, answer_key, session_orders(session)[0])
+                    if score == session.score:
+                        continue
+                    # 아직 채점되지 않은(score가 null인) 세션은 증감 집계에서 제외
+                    if session.score is not None:
+                        progress['increased' if score > session.score else 'decreased'] += 1
+                        progress['points_delta'] += score - session.score
+                    session.score = score
+                    changed.append(session)
+                if changed and not dry_run:
+                    sessions.model.objects.bulk_update(changed, ['score'])
+                progress['processed'] += len(chunk)
+                progress['changed'] += len(changed)
+                last_id = chunk[-1].id
+                yield dict(progress)
+        if not progress['processed']:
+            yield dict(progress)
+    finally:
+        # 점수가 바뀌었으면 퀴즈 통계도 다시 계산 (중간에 중단되어 반영된 chunk까지만 바뀐 경우 포함)
+        if progress['changed'] and not dry_run:
+            analytics.rebuild_quiz(quiz_id)
+
+
+def _run_job(updates, quiz_id, chunk_size, dry_run):
+    progress = {}
+    try:
+        for progress in iter_regrade(quiz_id, chunk_size, dry_run):
+            updates.put(progress)
+        updates.put({**progress, 'done': True})
+    except Exception:
+        logger.exception("퀴즈 %s 재채점 실패", quiz_id)
+        updates.put({**progress, 'done': True, 'error': '재채점 중 오류가 발생했습니다.'})
+    finally:
+        connections.close_all()
+
+
+def start_job(quiz_id, chunk_size=CHUNK_SIZE, dry_run=False):
+    """
+    재채점을 작업 스레드에서 시작하고 진행 상황을 받을 큐를 반환.
+    chunk마다 iter_regrade의 진행 상황이, 마지막에는 done: true(실패 시 error 포함)가 들어온다
+    """
+    updates = queue.Queue()
+    threading.Thread(target=_run_job, args=(updates, quiz_id, chunk_size, dry_run), daemon=True).start()
+    return updates
+
@@ -0,0 +1,49 @@
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+
+from quizzes import answer_keys
+from quizzes.models import Question, Choice
+
+# 세션 시작 시 문제 추출
+# 모델 인스턴스를 만들지 않고 문제 ID만으로 추출하고, 추출된 문제의 선택지 ID는 한 번의 쿼리로 조회한다.
+
+
+def _index_key(quiz_id):
+    return f"quiz:{quiz_id}:question_ids:{answer_keys.content_version(quiz_id)}"
+
+
+def question_id_index(quiz_id, use_cache=None):
+    """퀴즈의 전체 문제 ID 목록 (id 오름차순). 설정 시 퀴즈 내용 버전별로 캐시"""
+    if use_cache is None:
+        use_cache = getattr(settings, 'QUESTION_ID_INDEX_CACHE', True)
+    if not use_cache:
+        return list(Question.objects.filter(quiz_id=quiz_id).order_by('id').values_list('id', flat=True))
+
+    key = _index_key(quiz_id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = list(Question.objects.filter(quiz_id=quiz_id).order_by('id').values_list('id', flat=True))
+        cache.set(key, ids, getattr(settings, 'ANSWER_KEY_CACHE_TIMEOUT', 60 * 60))
+    return ids
+
+
+def draw_question_ids(quiz, rng=random, use_cache=None):
+    ids = question_id_index(quiz.id, use_cache=use_cache)
+    count = min(quiz.num_questions, len(ids))
+    if quiz.shuffle_questions:
+        return rng.sample(ids, count)
+    return ids[:count]
+
+
+def build_choice_order(question_ids, shuffle, rng=random):
+    """{str(question_id): [choice_id, ...]} 를 한 번의 쿼리로 생성"""
+    choice_order = {str(qid): [] for qid in question_ids}
+    rows = Choice.objects.filter(question_id__in=question_ids).order_by('id').values_list('question_id', 'id')
+    for qid, cid in rows:
+        choice_order[str(qid)].append(cid)
+    if shuffle:
+        for ids in choice_order.values():
+            rng.shuffle(ids)
+    return choice_order
@@ -1,33 +1,33 @@
+from drf_yasg.utils import swagger_serializer_method
 from rest_framework import serializers
-from .models import UserQuizSession
-from quizzes.models import Question, Choice, Quiz
+from .models import UserQuizSession, ArchivedQuizSession
+from .papers import get_paper
+from quizzes.models import Choice, Quiz
 
 
 class UserQuizSessionSerializer(serializers.ModelSerializer):
+    # 관리자 목록에서 행마다 큰 question_order/choice_order JSON을 내려주지 않도록 제외
     class Meta:
         model = UserQuizSession
-        fields = ['id', 'user', 'quiz', 'question_order', 'choice_order', 'answers', 'is_submitted', 'score', 'started_at', 'submitted_at']
-        read_only_fields = ['user', 'quiz', 'question_order', 'choice_order', 'score', 'started_at', 'submitted_at']
+        fields = ['id', 'user', 'quiz', 'answers', 'is_submitted', 'score', 'started_at', 'submitted_at']
+        read_only_fields = ['user', 'quiz', 'score', 'started_at', 'submitted_at']
+
+class ArchivedQuizSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedQuizSession
+        fields = UserQuizSessionSerializer.Meta.fields
+        read_only_fields = fields
 
 class ChoiceDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Choice
         fields = ['id', 'text']
 
-class QuestionDetailSerializer(serializers.ModelSerializer):
-    choices = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Question
-        fields = ['id', 'text', 'choices']
-
-    def get_choices(self, obj):
-        session = self.context.get('session')
-        choice_ids = session.choice_order.get(str(obj.id), [])
-        choice_qs = list(Choice.objects.filter(id__in=choice_ids))
-        # 순서 보장
-        sorted_choices = sorted(choice_qs, key=lambda c: choice_ids.index(c.id))
-        return ChoiceDetailSerializer(sorted_choices, many=True).data
+class QuestionDetailSerializer(serializers.Serializer):
+    # 시험지 스냅샷(papers.build_paper)의 문제 항목 스키마. 선택지는 세션의 선택지 순서대로 들어 있음
+    id = serializers.IntegerField()
+    text = serializers.CharField()
+    choices = ChoiceDetailSerializer(many=True)
 
 class UserQuizSessionDetailSerializer(serializers.ModelSerializer):
     questions = serializers.SerializerMethodField()
@@ -36,13 +36,11 @@ class UserQuizSessionDetailSerializer(serializers.ModelSerializer):
         model = UserQuizSession
         fields = ['id', 'quiz', 'is_submitted', 'score', 'started_at', 'submitted_at', 'answers', 'questions']
 
+    @swagger_serializer_method(serializer_or_field=QuestionDetailSerializer(many=True))
     def get_questions(self, obj):
-        from quizzes.models import Question
-        question_ids = obj.question_order
-        question_qs = list(Question.objects.filter(id__in=question_ids))
-        # 순서 보장
-        sorted_questions = sorted(question_qs, key=lambda q: question_ids.index(q.id))
-        return QuestionDetailSerializer(sorted_questions, many=True, context={'session': obj}).data
+        # 세션 시작 시 만들어 둔 시험지 스냅샷을 그대로 사용 (비동기 뷰는 미리 조회해 context로 전달)
+        paper = self.context.get('paper')
+        return paper if paper is not None else get_paper(obj)
 
 
 class SaveAnswerSerializer(serializers.Serializer):
@@ -50,6 +48,25 @@ class SaveAnswerSerializer(serializers.Serializer):
     choice_id = serializers.IntegerField()
 
 
+class SaveAnswerItemSerializer(serializers.Serializer):
+    question_id = serializers.IntegerField()
+    choice_id = serializers.IntegerField()
+    seq = serializers.IntegerField(
+        required=False, min_value=0,
+        help_text="클라이언트 순번. 같은 문제의 답안이 여러 개면 가장 큰 순번이 반영되고, "
+                  "이전 요청에서 더 큰 순번이 이미 반영된 문제는 건너뜀",
+    )
+
+
+class SaveAnswerBatchSerializer(serializers.Serializer):
+    answers = SaveAnswerItemSerializer(many=True, allow_empty=False, max_length=500)
+
+
+class RegradeSerializer(serializers.Serializer):
+    dry_run = serializers.BooleanField(default=False, help_text="점수를 저장하지 않고 변경 규모만 계산")
+    chunk_size = serializers.IntegerField(default=1000, min_value=100, max_value=10000)
+
+
 class QuizStatusSerializer(serializers.ModelSerializer):
     is_submitted = serializers.SerializerMethodField()
 
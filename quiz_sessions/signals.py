@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from quizzes.models import Quiz
+from . import status_cache
+from .models import UserQuizSession
+
+
+@receiver([post_save, post_delete], sender=Quiz)
+def invalidate_quiz_list(sender, instance, **kwargs):
+    status_cache.invalidate_quiz_list()
+
+
+@receiver(post_save, sender=UserQuizSession)
+def invalidate_user_status_on_save(sender, instance, created, update_fields=None, **kwargs):
+    # 세션 생성, 제출 상태 변경 시에만 무효화 (답안 저장은 해당 없음)
+    if created or update_fields is None or 'is_submitted' in update_fields:
+        status_cache.invalidate_user(instance.user_id)
+
+
+@receiver(post_delete, sender=UserQuizSession)
+def invalidate_user_status_on_delete(sender, instance, **kwargs):
+    status_cache.invalidate_user(instance.user_id)
@@ -0,0 +1,109 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from quizzes.models import Quiz
+from .models import UserQuizSession, ArchivedQuizSession
+
+# 내 퀴즈 목록(my_list) 캐시
+# - 학년별 퀴즈 목록: 학년마다 한 번만 캐시. 퀴즈가 추가/수정/삭제되면 목록 버전을 새로 발급
+# - 사용자별 제출 여부: 사용자 버전 + 퀴즈마다 한 키로 캐시. 세션이 생성/제출되면 사용자 버전을 새로 발급
+#   (맵 전체를 읽고 합쳐 다시 쓰지 않으므로, 조회 중에 무효화가 끼어들어도 새 버전에는 이전 값이 남지 않음)
+# 모든 항목은 MY_LIST_CACHE_TIMEOUT 안에 만료되므로 무효화가 누락되어도 오래된 값은 그 시간까지만 보인다.
+
+QUIZ_LIST_VERSION_KEY = 'my_list:quiz_list:version'
+
+
+def _timeout():
+    return getattr(settings, 'MY_LIST_CACHE_TIMEOUT', 60)
+
+
+def _quiz_list_version():
+    version = cache.get(QUIZ_LIST_VERSION_KEY)
+    if version is None:
+        cache.add(QUIZ_LIST_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(QUIZ_LIST_VERSION_KEY)
+    return version
+
+
+def _grade_key(grade_id):
+    return f"my_list:grade:{grade_id}:{_quiz_list_version()}"
+
+
+def _user_version_key(user_id):
+    return f"my_list:user:{user_id}:version"
+
+
+def _user_version(user_id):
+    key = _user_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, _timeout())
+        version = cache.get(key)
+    return version
+
+
+def _submitted_key(user_id, version, quiz_id):
+    return f"my_list:user:{user_id}:{version}:submitted:{quiz_id}"
+
+
+def get_grade_quizzes(grade_id):
+    """학년(및 학년 미지정) 퀴즈 목록을 최신순으로 반환"""
+    key = _grade_key(grade_id)
+    quizzes = cache.get(key)
+    if quizzes is None:
+        quizzes = list(
+            Quiz.objects
+            .filter(Q(grade__isnull=True) | Q(grade_id=grade_id))
+            .order_by('-created_at')
+            .values('id', 'title', 'description')
+        )
+        cache.set(key, quizzes, _timeout())
+    return quizzes
+
+
+def get_submission_map(user_id, quiz_ids):
+    """
+    {quiz_id: 제출 여부}. 요청한 quiz_ids 중 캐시에 없는 퀴즈만 조회해 퀴즈별 키로 캐시한다.
+    같은 퀴즈에 세션이 여러 개면 제출된 세션이 하나라도 있으면 True (보관된 세션 포함)
+    """
+    version = _user_version(user_id)
+    keys = {quiz_id: _submitted_key(user_id, version, quiz_id) for quiz_id in quiz_ids}
+    cached = cache.get_many(keys.values())
+    session_map = {quiz_id: cached[key] for quiz_id, key in keys.items() if key in cached}
+    missing = [quiz_id for quiz_id in quiz_ids if quiz_id not in session_map]
+    if missing:
+        submitted = dict(
+            UserQuizSession.objects
+            .filter(user_id=user_id, quiz_id__in=missing)
+            .values_list('quiz_id')
+            .annotate(submitted=Count('id', filter=Q(is_submitted=True)))
+            .order_by()
+        )
+        unsubmitted = [quiz_id for quiz_id in missing if not submitted.get(quiz_id)]
+        if unsubmitted:
+            # 보관된 세션은 모두 제출된 세션
+            for quiz_id in (
+                ArchivedQuizSession.objects
+                .filter(user_id=user_id, quiz_id__in=unsubmitted)
+                .values_list('quiz_id', flat=True).distinct()
+            ):
+                submitted[quiz_id] = 1
+        loaded = {quiz_id: submitted.get(quiz_id, 0) > 0 for quiz_id in missing}
+        cache.set_many({keys[quiz_id]: value for quiz_id, value in loaded.items()}, _timeout())
+        session_map.update(loaded)
+    return session_map
+
+
+def invalidate_quiz_list():
+    cache.set(QUIZ_LIST_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate_user(user_id):
+    key = _user_version_key(user_id)
+    cache.set(key, uuid.uuid4().hex, _timeout())
+    # 커밋 전에 다른 요청이 새 버전으로 이전 값을 캐시할 수 있으므로 커밋 후 한 번 더 발급
+    transaction.on_commit(lambda: cache.set(key, uuid.uuid4().hex, _timeout()))
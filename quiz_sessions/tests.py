@@ -1,13 +1,41 @@
+import csv
+import importlib
+import io
+import json
+import random
+import threading
+import time
+from unittest import mock
+
 from django.contrib.auth.models import User
-from rest_framework.test import APITestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import AsyncRequestFactory, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 from core.models import Grade
 from users.models import UserProfile
 from quizzes.models import Quiz, Question, Choice
-from quiz_sessions.models import UserQuizSession
+from quiz_sessions.models import UserQuizSession, ArchivedQuizSession, QuizLayout, QuizStats, QuizScoreBucket, QuestionStats, ChoiceStats
+from quiz_sessions import analytics, answer_buffer, grading_queue, orders, regrade, status_cache
+from quiz_sessions import urls as session_urls
+from quiz_sessions.async_views import (
+    AsyncStartQuizSessionView, AsyncSubmitQuizSessionView, AsyncSaveAnswerView, AsyncUserQuizSessionDetailView,
+)
+from quiz_sessions.answers import save_answers
+from quiz_sessions.grading import grade_session
+from quiz_sessions.sampling import draw_question_ids, build_choice_order
+from quiz_sessions.serializers import QuestionDetailSerializer
+from quiz_sessions.views import StartQuizSessionView
 
 
 class QuizSessionAPITestCase(APITestCase):
     def setUp(self):
+        cache.clear()
         self.grade = Grade.objects.create(name="1학년")
         self.admin = User.objects.create_superuser(username="admin", password="adminpass")
         self.user = User.objects.create_user(username="student", password="userpass")
@@ -78,6 +106,51 @@ class QuizSessionAPITestCase(APITestCase):
         res = self.client.post(f"/api/sessions/sessions/{session_id}/submit/")
         self.assertEqual(res.status_code, 200)
         self.assertEqual(res.data["score"], 2)
+        self.assertIsNotNone(res.data["submitted_at"])
+
+        res = self.client.get(f"/api/sessions/sessions/{session_id}/result/")
+        self.assertEqual((res.data["status"], res.data["score"]), ("graded", 2))
+
+    def submit_wrong_then_fix_answer_key(self, usernames):
+        session_ids = []
+        for username in usernames:
+            user = User.objects.create_user(username=username, password="userpass")
+            UserProfile.objects.create(user=user, grade=self.grade)
+            self.login_as(username, "userpass")
+            session_id = self.start_quiz()
+            question_id = UserQuizSession.objects.get(id=session_id).question_order[0]
+            wrong = Choice.objects.filter(question_id=question_id, text="1").get()
+            self.client.patch(f"/api/sessions/sessions/{session_id}/answers/", {
+                "question_id": question_id, "choice_id": wrong.id
+            }, format="json")
+            self.client.post(f"/api/sessions/sessions/{session_id}/submit/")
+            session_ids.append(session_id)
+        self.assertEqual(self.scores(session_ids), {0})
+
+        # 시그널을 거치지 않고 정답을 "1"로 수정
+        question_id = UserQuizSession.objects.get(id=session_ids[0]).question_order[0]
+        Choice.objects.filter(question_id=question_id).update(is_correct=False)
+        Choice.objects.filter(question_id=question_id, text="1").update(is_correct=True)
+        return session_ids
+
+    def scores(self, session_ids):
+        return set(UserQuizSession.objects.filter(id__in=session_ids).values_list("score", flat=True))
+
+    def test_regrade_command_after_answer_key_fix(self):
+        session_ids = self.submit_wrong_then_fix_answer_key(["student1", "student2", "student3"])
+
+        out = io.StringIO()
+        call_command("regrade_quiz", self.quiz.id, "--chunk-size", "2", "--dry-run", stdout=out)
+        self.assertIn("3개 세션 중 3개 점수 변경 (상승 3, 하락 0, 총 +3점)", out.getvalue())
+        self.assertEqual(self.scores(session_ids), {0})
+
+        out = io.StringIO()
+        call_command("regrade_quiz", self.quiz.id, "--chunk-size", "2", stdout=out)
+        self.assertIn("2/3 (66.7%)", out.getvalue())
+        self.assertIn("3개 세션 중 3개 점수 변경", out.getvalue())
+        self.assertEqual(self.scores(session_ids), {1})
+        # 재채점 후 퀴즈 통계도 다시 계산됨
+        self.assertEqual(QuizStats.objects.get(quiz=self.quiz).score_sum, 3)
 
     def test_get_session_detail(self):
         session_id = self.start_quiz()
@@ -103,3 +176,1372 @@ class QuizSessionAPITestCase(APITestCase):
         res = self.client.get(f"/api/sessions/admin/{self.quiz.id}/sessions/")
         self.assertEqual(res.status_code, 200)
         self.assertIn("results", res.data)
+
+    def test_submit_with_same_idempotency_key_replays_original_response(self):
+        session_id = self.start_quiz()
+        url = f"/api/sessions/sessions/{session_id}/submit/"
+        first = self.client.post(url, HTTP_IDEMPOTENCY_KEY="submit-1")
+        second = self.client.post(url, HTTP_IDEMPOTENCY_KEY="submit-1")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        # 키 없이 다시 제출하면 기존과 같이 400
+        self.assertEqual(self.client.post(url).status_code, 400)
+
+    def test_start_with_same_idempotency_key_does_not_redo_work(self):
+        first = self.client.post(f"/api/sessions/{self.quiz.id}/start/", HTTP_IDEMPOTENCY_KEY="start-1")
+        self.assertEqual(first.status_code, 201)
+        # 인증 사용자는 principal 캐시에서 읽으므로 쿼리 없음
+        with self.assertNumQueries(0):
+            second = self.client.post(f"/api/sessions/{self.quiz.id}/start/", HTTP_IDEMPOTENCY_KEY="start-1")
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.data, first.data)
+
+    # 만료 시각을 앞당기기 위해 locmem 캐시의 시계를 바꾸므로 캐시 백엔드를 고정
+    @override_settings(
+        IDEMPOTENCY_PENDING_TIMEOUT=30,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    )
+    def test_idempotency_key_is_released_after_worker_dies(self):
+        url = f"/api/sessions/{self.quiz.id}/start/"
+        # 응답을 저장하거나 처리 중 표시를 지우기 전에 워커가 종료됨
+        with mock.patch.object(StartQuizSessionView, "create_session", side_effect=SystemExit):
+            with self.assertRaises(SystemExit):
+                self.client.post(url, HTTP_IDEMPOTENCY_KEY="start-1")
+        self.assertEqual(self.client.post(url, HTTP_IDEMPOTENCY_KEY="start-1").status_code, 409)
+
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=time.time() + 31):
+            res = self.client.post(url, HTTP_IDEMPOTENCY_KEY="start-1")
+        self.assertEqual(res.status_code, 201)
+
+    def save_answer(self, session_id, question_id, choice_id):
+        return self.client.patch(f"/api/sessions/sessions/{session_id}/answers/", {
+            "question_id": question_id, "choice_id": choice_id
+        }, format="json")
+
+    def test_save_does_not_read_or_rewrite_whole_answers(self):
+        session_id = self.start_quiz()
+        session = UserQuizSession.objects.get(id=session_id)
+        qid = session.question_order[0]
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.save_answer(session_id, qid, session.choice_order[str(qid)][0])
+        self.assertEqual(res.status_code, 200)
+        selects = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT") and "quiz_sessions" in q["sql"]]
+        self.assertEqual(len(selects), 1)
+        self.assertNotIn('"answers"', selects[0])
+
+    def test_concurrent_saves_do_not_lose_answers(self):
+        session_id = self.start_quiz()
+        session = UserQuizSession.objects.get(id=session_id)
+        first_qid, second_qid = session.question_order
+        # 두 탭에서 같은 시점의 세션을 기준으로 저장해도 두 답안 모두 유지
+        save_answers(session_id, {str(first_qid): session.choice_order[str(first_qid)][0]})
+        save_answers(session_id, {str(second_qid): session.choice_order[str(second_qid)][1]})
+        session.refresh_from_db()
+        self.assertEqual(session.answers, {
+            str(first_qid): session.choice_order[str(first_qid)][0],
+            str(second_qid): session.choice_order[str(second_qid)][1],
+        })
+
+    def test_save_rejects_answers_outside_session_paper(self):
+        session_id = self.start_quiz()
+        session = UserQuizSession.objects.get(id=session_id)
+        first_qid, second_qid = session.question_order
+        res = self.save_answer(session_id, 999999, session.choice_order[str(first_qid)][0])
+        self.assertEqual(res.status_code, 400)
+        res = self.save_answer(session_id, first_qid, session.choice_order[str(second_qid)][0])
+        self.assertEqual(res.status_code, 400)
+        session.refresh_from_db()
+        self.assertEqual(session.answers, {})
+
+    def test_batch_save_applies_latest_answer_per_question(self):
+        session_id = self.start_quiz()
+        session = UserQuizSession.objects.get(id=session_id)
+        first_qid, second_qid = session.question_order
+        first_choices = session.choice_order[str(first_qid)]
+        second_choices = session.choice_order[str(second_qid)]
+        res = self.client.post(f"/api/sessions/sessions/{session_id}/answers/batch/", {"answers": [
+            {"question_id": first_qid, "choice_id": first_choices[1], "seq": 2},
+            {"question_id": first_qid, "choice_id": first_choices[0], "seq": 1},
+            {"question_id": second_qid, "choice_id": second_choices[2], "seq": 3},
+            {"question_id": second_qid, "choice_id": first_choices[0], "seq": 4},
+        ]}, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [r["status"] for r in res.data["results"]],
+            ["saved", "superseded", "saved", "invalid"],
+        )
+        res = self.client.get(f"/api/sessions/sessions/{session_id}/")
+        self.assertEqual(res.data["answers"], {str(first_qid): first_choices[1], str(second_qid): second_choices[2]})
+
+    def test_batch_save_skips_answers_older_than_saved_seq(self):
+        session_id = self.start_quiz()
+        session = UserQuizSession.objects.get(id=session_id)
+        first_qid, second_qid = session.question_order
+        first_choices = session.choice_order[str(first_qid)]
+        second_choices = session.choice_order[str(second_qid)]
+        url = f"/api/sessions/sessions/{session_id}/answers/batch/"
+        # 나중에 보낸 batch 2가 먼저 도착
+        res = self.client.post(url, {"answers": [
+            {"question_id": first_qid, "choice_id": first_choices[1], "seq": 2},
+        ]}, format="json")
+        self.assertEqual([r["status"] for r in res.data["results"]], ["saved"])
+
+        res = self.client.post(url, {"answers": [
+            {"question_id": first_qid, "choice_id": first_choices[0], "seq": 1},
+            {"question_id": second_qid, "choice_id": second_choices[0], "seq": 1},
+        ]}, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([r["status"] for r in res.data["results"]], ["superseded", "saved"])
+        res = self.client.get(f"/api/sessions/sessions/{session_id}/")
+        self.assertEqual(res.data["answers"], {str(first_qid): first_choices[1], str(second_qid): second_choices[0]})
+
+    def test_batch_save_rejected_after_submit(self):
+        session_id = self.start_quiz()
+        self.client.post(f"/api/sessions/sessions/{session_id}/submit/")
+        res = self.client.post(f"/api/sessions/sessions/{session_id}/answers/batch/", {"answers": [
+            {"question_id": 1, "choice_id": 1},
+        ]}, format="json")
+        self.assertEqual(res.status_code, 400)
+
+class GradingEngineTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.grade = Grade.objects.create(name="1학년")
+        self.admin = User.objects.create_superuser(username="admin", password="adminpass")
+        self.user = User.objects.create_user(username="student", password="userpass")
+        UserProfile.objects.create(user=self.user, grade=self.grade)
+
+    def make_session(self, num_questions):
+        quiz = Quiz.objects.create(
+            title=f"{num_questions}문제 퀴즈",
+            num_questions=num_questions,
+            shuffle_questions=False,
+            shuffle_choices=False,
+            grade=self.grade,
+            created_by=self.admin
+        )
+        question_order, choice_order, answers = [], {}, {}
+        for i in range(num_questions):
+            question = Question.objects.create(quiz=quiz, text=f"문제 {i}")
+            choices = Choice.objects.bulk_create([
+                Choice(question=question, text="오답1", is_correct=False),
+                Choice(question=question, text="정답", is_correct=True),
+                Choice(question=question, text="오답2", is_correct=False),
+            ])
+            question_order.append(question.id)
+            choice_order[str(question.id)] = [c.id for c in choices]
+            answers[str(question.id)] = choices[1].id
+        return UserQuizSession.objects.create(
+            user=self.user, quiz=quiz,
+            question_order=question_order, choice_order=choice_order, answers=answers,
+        )
+
+    def submit_query_count(self, session):
+        token = self.client.post("/api/users/login/", {
+            "username": "student", "password": "userpass"
+        }, format="json").data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        # 인증 사용자 캐시를 채워 두고 제출 자체의 쿼리만 측정
+        self.client.get(f"/api/sessions/sessions/{session.id}/result/")
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(f"/api/sessions/sessions/{session.id}/submit/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["score"], len(session.question_order))
+        return len(ctx.captured_queries)
+
+    def test_grade_session_uses_single_query(self):
+        session = self.make_session(20)
+        with self.assertNumQueries(1):
+            score = grade_session(session)
+        self.assertEqual(score, 20)
+        # 정답표가 캐시된 이후에는 DB 조회 없이 채점
+        with self.assertNumQueries(0):
+            self.assertEqual(grade_session(session), 20)
+
+    def test_answers_outside_session_are_ignored(self):
+        session = self.make_session(2)
+        other = self.make_session(1)
+        other_qid = other.question_order[0]
+        session.answers[str(other_qid)] = other.choice_order[str(other_qid)][1]
+        session.answers["not-a-number"] = 1
+        self.assertEqual(grade_session(session), 2)
+
+    def test_calculate_score_matches_grading_engine(self):
+        session = self.make_session(3)
+        first_qid = str(session.question_order[0])
+        session.answers[first_qid] = session.choice_order[first_qid][0]
+        self.assertEqual(session.calculate_score(), 2)
+
+    def test_submit_query_count_does_not_grow_with_answers(self):
+        small = self.submit_query_count(self.make_session(2))
+        large = self.submit_query_count(self.make_session(30))
+        self.assertEqual(small, large)
+
+
+class SessionDetailQueryCountTestCase(APITestCase):
+    def setUp(self):
+        self.grade = Grade.objects.create(name="1학년")
+        self.admin = User.objects.create_superuser(username="admin", password="adminpass")
+        self.user = User.objects.create_user(username="student", password="userpass")
+        UserProfile.objects.create(user=self.user, grade=self.grade)
+        token = self.client.post("/api/users/login/", {
+            "username": "student", "password": "userpass"
+        }, format="json").data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def start_session(self, num_questions):
+        with self.captureOnCommitCallbacks(execute=True):
+            quiz = Quiz.objects.create(
+                title=f"{num_questions}문제 퀴즈",
+                num_questions=num_questions,
+                shuffle_questions=True,
+                shuffle_choices=True,
+                grade=self.grade,
+                created_by=self.admin
+            )
+            for i in range(num_questions):
+                question = Question.objects.create(quiz=quiz, text=f"문제 {i}")
+                Choice.objects.bulk_create([
+                    Choice(question=question, text=f"{i}-{j}", is_correct=j == 0) for j in range(4)
+                ])
+        res = self.client.post(f"/api/sessions/{quiz.id}/start/")
+        return UserQuizSession.objects.get(id=res.data["session_id"])
+
+    def get_query_count(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return res, len(ctx.captured_queries)
+
+    def test_detail_query_count_is_constant_and_order_preserved(self):
+        counts = []
+        for num_questions in (2, 25):
+            session = self.start_session(num_questions)
+            res, count = self.get_query_count(f"/api/sessions/sessions/{session.id}/")
+            counts.append(count)
+            self.assertEqual([q["id"] for q in res.data["questions"]], session.question_order)
+            for question in res.data["questions"]:
+                self.assertEqual(
+                    [c["id"] for c in question["choices"]],
+                    session.choice_order[str(question["id"])],
+                )
+        self.assertEqual(counts[0], counts[1])
+
+    def test_paginated_questions_query_count_is_constant(self):
+        counts = []
+        for num_questions in (2, 25):
+            session = self.start_session(num_questions)
+            res, count = self.get_query_count(f"/api/sessions/sessions/{session.id}/questions/?page_size=20")
+            counts.append(count)
+            self.assertEqual(res.data["count"], num_questions)
+            self.assertEqual(
+                [q["id"] for q in res.data["results"]],
+                session.question_order[:20],
+            )
+        self.assertEqual(counts[0], counts[1])
+
+    def test_reads_are_served_from_paper_snapshot(self):
+        session = self.start_session(5)
+        url = f"/api/sessions/sessions/{session.id}/"
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url)
+        tables = " ".join(q["sql"] for q in ctx.captured_queries)
+        self.assertNotIn("quizzes_question", tables)
+        self.assertNotIn("quizzes_choice", tables)
+        self.assertNotIn("is_correct", res.data["questions"][0]["choices"][0])
+        # 문서화된 스키마(QuestionDetailSerializer)와 스냅샷 모양이 같음
+        self.assertEqual(QuestionDetailSerializer(res.data["questions"], many=True).data, res.data["questions"])
+
+        # 답안 등 변경되는 필드는 스냅샷 위에 최신 값으로 반영
+        qid = session.question_order[0]
+        cid = session.choice_order[str(qid)][0]
+        self.client.patch(f"/api/sessions/sessions/{session.id}/answers/", {
+            "question_id": qid, "choice_id": cid
+        }, format="json")
+        self.assertEqual(self.client.get(url).data["answers"], {str(qid): cid})
+
+    def test_question_edit_rebuilds_paper(self):
+        session = self.start_session(2)
+        question = Question.objects.get(id=session.question_order[0])
+        question.text = "수정된 문제"
+        with self.captureOnCommitCallbacks(execute=True):
+            question.save()
+        res = self.client.get(f"/api/sessions/sessions/{session.id}/questions/")
+        self.assertEqual(res.data["results"][0]["text"], "수정된 문제")
+
+
+class QuestionSamplingTestCase(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="adminpass")
+
+    def make_quiz(self, bank_size, num_questions, shuffle):
+        quiz = Quiz.objects.create(
+            title="추출 퀴즈", num_questions=num_questions,
+            shuffle_questions=shuffle, shuffle_choices=shuffle, created_by=self.admin
+        )
+        questions = Question.objects.bulk_create([Question(quiz=quiz, text=str(i)) for i in range(bank_size)])
+        Choice.objects.bulk_create([
+            Choice(question=q, text=str(j), is_correct=j == 0) for q in questions for j in range(3)
+        ])
+        return quiz, [q.id for q in questions]
+
+    def test_draw_without_shuffle_keeps_bank_order(self):
+        quiz, ids = self.make_quiz(10, 4, shuffle=False)
+        question_order = draw_question_ids(quiz)
+        self.assertEqual(question_order, ids[:4])
+        choice_order = build_choice_order(question_order, shuffle=False)
+        for qid in question_order:
+            self.assertEqual(
+                choice_order[str(qid)],
+                list(Choice.objects.filter(question_id=qid).order_by("id").values_list("id", flat=True)),
+            )
+
+    def test_draw_with_shuffle_samples_distinct_questions(self):
+        quiz, ids = self.make_quiz(50, 20, shuffle=True)
+        question_order = draw_question_ids(quiz, rng=random.Random(1))
+        self.assertEqual(len(set(question_order)), 20)
+        self.assertTrue(set(question_order) <= set(ids))
+
+    def test_sampling_query_count_does_not_depend_on_bank_size(self):
+        for bank_size in (5, 200):
+            quiz, _ = self.make_quiz(bank_size, 5, shuffle=True)
+            with self.assertNumQueries(2):
+                question_order = draw_question_ids(quiz, use_cache=False)
+                build_choice_order(question_order, shuffle=True)
+            # ID 목록이 캐시된 이후에는 선택지 조회 1회
+            draw_question_ids(quiz)
+            with self.assertNumQueries(1):
+                question_order = draw_question_ids(quiz)
+                build_choice_order(question_order, shuffle=True)
+
+
+class ConcurrentSessionStartTestCase(TransactionTestCase):
+    def setUp(self):
+        self.grade = Grade.objects.create(name="1학년")
+        admin = User.objects.create_superuser(username="admin", password="adminpass")
+        self.user = User.objects.create_user(username="student", password="userpass")
+        UserProfile.objects.create(user=self.user, grade=self.grade)
+        self.quiz = Quiz.objects.create(
+            title="동시 시작", num_questions=1, grade=self.grade, created_by=admin
+        )
+        question = Question.objects.create(quiz=self.quiz, text="1+1=?")
+        Choice.objects.bulk_create([
+            Choice(question=question, text=str(i), is_correct=i == 2) for i in range(1, 4)
+        ])
+
+    def test_losing_start_returns_existing_session(self):
+        first, created = StartQuizSessionView.create_session(self.user, self.quiz)
+        # 미제출 세션 확인을 동시에 통과한 두 번째 요청: 유일 제약 위반 후 먼저 만든 세션을 반환
+        second, created_again = StartQuizSessionView.create_session(self.user, self.quiz)
+        self.assertEqual((created, created_again), (True, False))
+        self.assertEqual(second.id, first.id)
+        self.assertEqual(UserQuizSession.objects.filter(user=self.user, quiz=self.quiz).count(), 1)
+
+    # SQLite 테스트 DB(shared-cache 메모리 DB)는 스레드 간 동시 쓰기 시 테이블 잠금 오류가 나므로 PostgreSQL에서만 실행
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_concurrent_starts_create_single_open_session(self):
+        num_threads = 8
+        barrier = threading.Barrier(num_threads)
+        results, errors = [], []
+
+        def start():
+            client = APIClient()
+            client.force_authenticate(self.user)
+            barrier.wait()
+            try:
+                res = client.post(f"/api/sessions/{self.quiz.id}/start/")
+                results.append((res.status_code, res.data["session_id"]))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=start) for _ in range(num_threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), num_threads)
+        self.assertEqual(len({session_id for _, session_id in results}), 1)
+        self.assertEqual([code for code, _ in results].count(201), 1)
+        self.assertEqual(UserQuizSession.objects.filter(user=self.user, quiz=self.quiz).count(), 1)
+
+
+@override_settings(ANSWER_BUFFER_BACKEND="quiz_sessions.answer_buffer.InMemoryAnswerBuffer")
+class AnswerBufferTestCase(QuizSessionAPITestCase):
+    # 기본 API 테스트도 버퍼 모드에서 모두 함께 실행됨
+    def setUp(self):
+        answer_buffer._buffers.clear()
+        super().setUp()
+
+    def save_all_correct(self, session_id):
+        session = UserQuizSession.objects.get(id=session_id)
+        for qid in session.question_order:
+            correct = Question.objects.get(id=qid).choices.get(is_correct=True)
+            res = self.client.patch(f"/api/sessions/sessions/{session_id}/answers/", {
+                "question_id": qid, "choice_id": correct.id
+            }, format="json")
+            self.assertEqual(res.status_code, 200)
+        return session
+
+    def test_buffered_answers_are_not_written_until_flush(self):
+        session_id = self.start_quiz()
+        session = self.save_all_correct(session_id)
+        session.refresh_from_db()
+        self.assertEqual(session.answers, {})
+        # 상세 조회에는 버퍼의 답안도 보임
+        res = self.client.get(f"/api/sessions/sessions/{session_id}/")
+        self.assertEqual(len(res.data["answers"]), 2)
+
+        # 버퍼의 답안은 flush가 커밋된 뒤에 지워짐
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(answer_buffer.flush_dirty(), 1)
+        session.refresh_from_db()
+        self.assertEqual(len(session.answers), 2)
+        self.assertEqual(answer_buffer.flush_dirty(), 0)
+
+    def test_failed_flush_keeps_buffered_answers(self):
+        session_id = self.start_quiz()
+        self.save_all_correct(session_id)
+        with mock.patch.object(UserQuizSession.objects, "bulk_update", side_effect=RuntimeError("DB 오류")):
+            with self.assertRaises(RuntimeError):
+                answer_buffer.flush_dirty()
+        self.assertEqual(len(answer_buffer.get_buffer().peek(session_id)), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(answer_buffer.flush_dirty(), 1)
+        self.assertEqual(answer_buffer.get_buffer().peek(session_id), {})
+
+    def test_submit_sees_every_acknowledged_answer(self):
+        session_id = self.start_quiz()
+        self.save_all_correct(session_id)
+        res = self.client.post(f"/api/sessions/sessions/{session_id}/submit/")
+        self.assertEqual(res.data["score"], 2)
+        self.assertEqual(len(UserQuizSession.objects.get(id=session_id).answers), 2)
+
+        # 제출 이후의 답안 저장은 거부
+        res = self.client.patch(f"/api/sessions/sessions/{session_id}/answers/", {
+            "question_id": 1, "choice_id": 1
+        }, format="json")
+        self.assertEqual(res.status_code, 400)
+
+    def test_failed_submit_keeps_buffered_answers(self):
+        session_id = self.start_quiz()
+        self.save_all_correct(session_id)
+        url = f"/api/sessions/sessions/{session_id}/submit/"
+        with mock.patch("quiz_sessions.views.grade_session", side_effect=RuntimeError("채점 오류")):
+            with self.assertRaises(RuntimeError):
+                self.client.post(url)
+        self.assertEqual(len(answer_buffer.get_buffer().peek(session_id)), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(url)
+        self.assertEqual(res.data["score"], 2)
+        self.assertEqual(answer_buffer.get_buffer().peek(session_id), {})
+
+    def test_flush_merges_with_existing_answers(self):
+        session_id = self.start_quiz()
+        session = UserQuizSession.objects.get(id=session_id)
+        first_qid, second_qid = session.question_order
+        UserQuizSession.objects.filter(id=session_id).update(answers={str(first_qid): 1})
+        answer_buffer.get_buffer().put(session_id, {str(second_qid): 2})
+        answer_buffer.flush([session_id])
+        session.refresh_from_db()
+        self.assertEqual(session.answers, {str(first_qid): 1, str(second_qid): 2})
+
+
+class AdminSessionListExportTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username="admin", password="adminpass")
+        self.quiz = Quiz.objects.create(title="내보내기", num_questions=1, created_by=self.admin)
+        student = User.objects.create_user(username="student", password="userpass")
+        self.sessions = UserQuizSession.objects.bulk_create([
+            UserQuizSession(
+                user=student, quiz=self.quiz, question_order=[1], choice_order={"1": [1, 2, 3]},
+                answers={"1": 2}, is_submitted=True, score=i % 2,
+            )
+            for i in range(25)
+        ])
+        token = self.client.post("/api/users/login/", {
+            "username": "admin", "password": "adminpass"
+        }, format="json").data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_cursor_pagination_walks_all_sessions(self):
+        url = f"/api/sessions/admin/{self.quiz.id}/sessions/?page_size=10"
+        ids = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, 200)
+            self.assertNotIn("question_order", res.data["results"][0])
+            ids.extend(r["id"] for r in res.data["results"])
+            url = res.data["next"]
+        self.assertEqual(ids, sorted(s.id for s in self.sessions))
+
+    def test_export_streams_ndjson_and_csv(self):
+        url = f"/api/sessions/admin/{self.quiz.id}/sessions/export/"
+        res = self.client.get(url)
+        self.assertTrue(res.streaming)
+        rows = [json.loads(line) for line in b"".join(res.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[0]["answers"], {"1": 2})
+
+        res = self.client.get(url + "?file_format=csv")
+        rows = list(csv.DictReader(io.StringIO(b"".join(res.streaming_content).decode())))
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(sum(int(r["score"]) for r in rows), 12)
+
+    def test_export_requires_admin(self):
+        self.client.credentials()
+        self.assertEqual(self.client.get(f"/api/sessions/admin/{self.quiz.id}/sessions/export/").status_code, 401)
+
+
+class MyQuizStatusCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.grade = Grade.objects.create(name="1학년")
+        self.admin = User.objects.create_superuser(username="admin", password="adminpass")
+        self.quiz = Quiz.objects.create(title="목록 퀴즈", num_questions=1, grade=self.grade, created_by=self.admin)
+        question = Question.objects.create(quiz=self.quiz, text="1+1=?")
+        Choice.objects.bulk_create([
+            Choice(question=question, text=str(i), is_correct=i == 2) for i in range(1, 4)
+        ])
+        for username in ("alice", "bob"):
+            user = User.objects.create_user(username=username, password="userpass")
+            UserProfile.objects.create(user=user, grade=self.grade)
+
+    def login_as(self, username):
+        token = self.client.post("/api/users/login/", {
+            "username": username, "password": "userpass"
+        }, format="json").data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def my_flags(self):
+        res = self.client.get("/api/sessions/my_list/")
+        self.assertEqual(res.status_code, 200)
+        return {q["id"]: q["is_submitted"] for q in res.data["results"]}
+
+    def test_flags_are_per_user_and_follow_submit(self):
+        self.login_as("alice")
+        self.assertEqual(self.my_flags(), {self.quiz.id: False})
+        session_id = self.client.post(f"/api/sessions/{self.quiz.id}/start/").data["session_id"]
+        self.client.post(f"/api/sessions/sessions/{session_id}/submit/")
+        self.assertEqual(self.my_flags(), {self.quiz.id: True})
+
+        self.login_as("bob")
+        self.assertEqual(self.my_flags(), {self.quiz.id: False})
+
+    def test_new_quiz_appears_without_waiting_for_expiry(self):
+        self.login_as("alice")
+        self.my_flags()
+        new_quiz = Quiz.objects.create(title="새 퀴즈", num_questions=1, grade=self.grade, created_by=self.admin)
+        self.assertIn(new_quiz.id, self.my_flags())
+
+    # 만료 시각을 앞당기기 위해 locmem 캐시의 시계를 바꾸므로 캐시 백엔드를 고정
+    @override_settings(
+        MY_LIST_CACHE_TIMEOUT=30,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    )
+    def test_staleness_is_bounded_by_timeout(self):
+        self.login_as("alice")
+        self.my_flags()
+        # 시그널을 거치지 않는 변경은 캐시 만료 전까지만 이전 값이 보임
+        UserQuizSession.objects.bulk_create([UserQuizSession(
+            user=User.objects.get(username="alice"), quiz=self.quiz,
+            question_order=[], choice_order={}, is_submitted=True, score=0,
+        )])
+        self.assertEqual(self.my_flags(), {self.quiz.id: False})
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=time.time() + 31):
+            self.assertEqual(self.my_flags(), {self.quiz.id: True})
+
+    def test_invalidation_during_lookup_is_not_overwritten(self):
+        self.login_as("alice")
+        alice = User.objects.get(username="alice")
+        set_many = cache.set_many
+
+        def submit_then_set_many(*args, **kwargs):
+            # DB 조회와 캐시 쓰기 사이에 다른 요청이 제출하고 무효화
+            UserQuizSession.objects.bulk_create([UserQuizSession(
+                user=alice, quiz=self.quiz, question_order=[], choice_order={}, is_submitted=True, score=0,
+            )])
+            status_cache.invalidate_user(alice.id)
+            return set_many(*args, **kwargs)
+
+        with mock.patch.object(status_cache.cache, "set_many", side_effect=submit_then_set_many):
+            self.assertEqual(self.my_flags(), {self.quiz.id: False})
+        self.assertEqual(self.my_flags(), {self.quiz.id: True})
+
+    def test_any_submitted_attempt_wins(self):
+        self.login_as("alice")
+        session_id = self.client.post(f"/api/sessions/{self.quiz.id}/start/").data["session_id"]
+        self.client.post(f"/api/sessions/sessions/{session_id}/submit/")
+        # 제출 후 새로 시작한 미제출 세션이 있어도 제출 여부는 True
+        self.client.post(f"/api/sessions/{self.quiz.id}/start/")
+        self.assertEqual(UserQuizSession.objects.filter(quiz=self.quiz).count(), 2)
+        self.assertEqual(self.my_flags(), {self.quiz.id: True})
+
+    def test_submission_query_is_limited_to_current_page(self):
+        quizzes = [
+            Quiz.objects.create(title=f"퀴즈 {i}", num_questions=1, grade=self.grade, created_by=self.admin)
+            for i in range(3)
+        ]
+        self.login_as("alice")
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get("/api/sessions/my_list/?page_size=2")
+        self.assertEqual([q["id"] for q in res.data["results"]], [quizzes[2].id, quizzes[1].id])
+        session_sql = [q["sql"] for q in ctx.captured_queries if "quiz_sessions_userquizsession" in q["sql"]]
+        self.assertEqual(len(session_sql), 1)
+        self.assertNotIn('"answers"', session_sql[0])
+        self.assertNotIn(str(self.quiz.id), session_sql[0].split(" IN ")[1].split(")")[0])
+
+
+def sequential_scans(sql):
+    """쿼리 실행 계획에서 순차 스캔(인덱스 없이 테이블 전체를 읽는) 테이블 목록"""
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            nodes, scans = [plan[0]["Plan"]], []
+            while nodes:
+                node = nodes.pop()
+                if node["Node Type"] == "Seq Scan":
+                    scans.append(node["Relation Name"])
+                nodes.extend(node.get("Plans", []))
+            return scans
+        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        # SQLite: "SCAN 테이블"은 전체 스캔, "SEARCH ... USING INDEX" / "SCAN ... USING INDEX"는 인덱스 사용
+        return [
+            row[-1].split()[1] for row in cursor.fetchall()
+            if row[-1].startswith("SCAN ") and "USING" not in row[-1]
+        ]
+
+
+class HotQueryPlanTestCase(APITestCase):
+    """시작/답안 저장/제출/내 목록/관리자 목록에서 실행되는 조회 쿼리가 모두 인덱스를 타는지 EXPLAIN으로 확인"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username="admin", password="adminpass")
+        grades = [Grade.objects.create(name=f"{i}학년") for i in range(1, 4)]
+        self.grade = grades[0]
+        self.user = User.objects.create_user(username="student", password="userpass")
+        UserProfile.objects.create(user=self.user, grade=self.grade)
+        others = User.objects.bulk_create([User(username=f"user{i}") for i in range(30)])
+
+        quizzes = Quiz.objects.bulk_create([
+            Quiz(title=f"퀴즈 {i}", num_questions=5, grade=grades[i % 3], created_by=self.admin)
+            for i in range(30)
+        ])
+        self.quiz = quizzes[0]
+        questions = Question.objects.bulk_create([
+            Question(quiz=quiz, text=f"문제 {j}") for quiz in quizzes for j in range(10)
+        ])
+        Choice.objects.bulk_create([
+            Choice(question=q, text=str(k), is_correct=k == 0) for q in questions for k in range(4)
+        ])
+        UserQuizSession.objects.bulk_create([
+            UserQuizSession(
+                user=user, quiz=quiz, question_order=[], choice_order={},
+                is_submitted=True, score=0,
+            )
+            for user in others for quiz in quizzes
+        ])
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+                # 작은 테스트 데이터에서는 인덱스가 있어도 순차 스캔이 더 싸게 계산되므로,
+                # 순차 스캔을 최후의 수단으로 돌려 "쓸 수 있는 인덱스가 없는" 경우만 드러나게 함
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def login_as(self, username, password):
+        token = self.client.post("/api/users/login/", {
+            "username": username, "password": password
+        }, format="json").data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def assert_no_sequential_scans(self, captured_queries):
+        checked = 0
+        for query in captured_queries:
+            sql = query["sql"]
+            if not sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                continue
+            checked += 1
+            with self.subTest(sql=sql):
+                self.assertEqual(sequential_scans(sql), [])
+        self.assertGreater(checked, 0)
+
+    def test_student_flow_uses_indexes(self):
+        self.login_as("student", "userpass")
+        with CaptureQueriesContext(connection) as ctx:
+            session_id = self.client.post(f"/api/sessions/{self.quiz.id}/start/").data["session_id"]
+            session = UserQuizSession.objects.get(id=session_id)
+            question_id = session.question_order[0]
+            self.client.patch(f"/api/sessions/sessions/{session_id}/answers/", {
+                "question_id": question_id, "choice_id": session.choice_order[str(question_id)][0]
+            }, format="json")
+            res = self.client.post(f"/api/sessions/sessions/{session_id}/submit/")
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(self.client.get("/api/sessions/my_list/").status_code, 200)
+        self.assert_no_sequential_scans(ctx.captured_queries)
+
+    def test_admin_session_list_uses_indexes(self):
+        self.login_as("admin", "adminpass")
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(f"/api/sessions/admin/{self.quiz.id}/sessions/?page_size=10")
+            self.assertEqual(res.status_code, 200)
+            self.client.get(res.data["next"])
+        self.assert_no_sequential_scans(ctx.captured_queries)
+
+    def test_one_correct_choice_per_question(self):
+        question = Question.objects.filter(quiz=self.quiz).first()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Choice.objects.create(question=question, text="두 번째 정답", is_correct=True)
+
+
+# 재채점 API는 작업 스레드에서 실행되므로 커밋된 데이터가 보이는 TransactionTestCase로 실행
+class RegradeJobTestCase(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        grade = Grade.objects.create(name="1학년")
+        self.admin = User.objects.create_superuser(username="admin", password="adminpass")
+        self.quiz = Quiz.objects.create(title="재채점", num_questions=1, grade=grade, created_by=self.admin)
+        question = Question.objects.create(quiz=self.quiz, text="1+1=?")
+        wrong, right, _ = Choice.objects.bulk_create([
+            Choice(question=question, text=str(i), is_correct=i == 2) for i in range(1, 4)
+        ])
+        self.session_ids = []
+        for i in range(3):
+            user = User.objects.create_user(username=f"student{i}", password="userpass")
+            self.session_ids.append(UserQuizSession.objects.create(
+                user=user, quiz=self.quiz, question_order=[question.id],
+                choice_order={str(question.id): [wrong.id, right.id]},
+                answers={str(question.id): wrong.id}, is_submitted=True, score=0,
+            ).id)
+        # 시그널을 거치지 않고 정답을 "1"로 수정
+        Choice.objects.filter(question=question).update(is_correct=False)
+        Choice.objects.filter(id=wrong.id).update(is_correct=True)
+        self.url = f"/api/sessions/admin/{self.quiz.id}/regrade/"
+        self.client = APIClient()
+
+    def scores(self):
+        return set(UserQuizSession.objects.filter(id__in=self.session_ids).values_list("score", flat=True))
+
+    def test_regrade_api_streams_progress(self):
+        self.client.force_authenticate(User.objects.get(username="student0"))
+        self.assertEqual(self.client.post(self.url).status_code, 403)
+
+        self.client.force_authenticate(self.admin)
+        res = self.client.post(self.url, {"chunk_size": 100}, format="json")
+        self.assertEqual(res.status_code, 200)
+        lines = [json.loads(line) for line in b"".join(res.streaming_content).decode().splitlines()]
+        self.assertTrue(lines[-1]["done"])
+        self.assertEqual(
+            {k: lines[-1][k] for k in ("total", "processed", "changed", "points_delta")},
+            {"total": 3, "processed": 3, "changed": 3, "points_delta": 3},
+        )
+        self.assertEqual(self.scores(), {1})
+        self.assertEqual(QuizStats.objects.get(quiz=self.quiz).score_sum, 3)
+        self.assertEqual(self.client.post("/api/sessions/admin/999999/regrade/").status_code, 404)
+
+    def test_regrade_finishes_when_stream_is_abandoned(self):
+        self.client.force_authenticate(self.admin)
+        jobs = []
+
+        def start_job(*args, **kwargs):
+            jobs.append(regrade.start_job(*args, **kwargs))
+            return jobs[-1]
+
+        with mock.patch("quiz_sessions.views.start_regrade_job", side_effect=start_job):
+            res = self.client.post(self.url, {"chunk_size": 100}, format="json")
+        # 진행 상황을 읽지 않고 연결을 끊음
+        res.close()
+
+        while not jobs[0].get(timeout=10).get("done"):
+            pass
+        self.assertEqual(self.scores(), {1})
+        self.assertEqual(QuizStats.objects.get(quiz=self.quiz).score_sum, 3)
+
+    def test_interrupted_regrade_rebuilds_stats_for_applied_chunks(self):
+        progress = regrade.iter_regrade(self.quiz.id, chunk_size=1)
+        self.assertEqual(next(progress)["changed"], 1)
+        progress.close()
+        self.assertEqual(sorted(s or 0 for s in self.scores()), [0, 1])
+        self.assertEqual(QuizStats.objects.get(quiz=self.quiz).score_sum, 1)
+
+
+@override_settings(GRADING_QUEUE_BACKEND="quiz_sessions.grading_queue.ThreadPoolGradingQueue")
+class AsyncGradingTestCase(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.grade = Grade.objects.create(name="1학년")
+        admin = User.objects.create_superuser(username="admin", password="adminpass")
+        self.quiz = Quiz.objects.create(
+            title="비동기 채점", num_questions=2, shuffle_questions=False, shuffle_choices=False,
+            grade=self.grade, created_by=admin,
+        )
+        for text in ("1+1=?", "3-1=?"):
+            question = Question.objects.create(quiz=self.quiz, text=text)
+            Choice.objects.bulk_create([
+                Choice(question=question, text=str(i), is_correct=i == 2) for i in range(1, 4)
+            ])
+        self.correct = dict(Choice.objects.filter(is_correct=True).values_list("question_id", "id"))
+
+    def client_for(self, username):
+        user = User.objects.create_user(username=username, password="userpass")
+        UserProfile.objects.create(user=user, grade=self.grade)
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def start_and_answer(self, client, num_correct):
+        session_id = client.post(f"/api/sessions/{self.quiz.id}/start/").data["session_id"]
+        for question_id in UserQuizSession.objects.get(id=session_id).question_order[:num_correct]:
+            client.patch(f"/api/sessions/sessions/{session_id}/answers/", {
+                "question_id": question_id, "choice_id": self.correct[question_id]
+            }, format="json")
+        return session_id
+
+    def test_submit_defers_grading_to_workers(self):
+        clients = [self.client_for(f"student{i}") for i in range(5)]
+        session_ids = [self.start_and_answer(client, i % 3) for i, client in enumerate(clients)]
+
+        queue = grading_queue.get_queue()
+        # 제출 요청과 워커의 쓰기가 겹치지 않도록 (SQLite 잠금) 큐에 넣을 ID를 모았다가 한 번에 넣음
+        with mock.patch.object(queue, "enqueue") as enqueue:
+            for client, session_id in zip(clients, session_ids):
+                res = client.post(f"/api/sessions/sessions/{session_id}/submit/")
+                self.assertEqual(res.status_code, 202)
+                self.assertIsNone(res.data["score"])
+                self.assertIsNotNone(res.data["submitted_at"])
+        queued = [session_id for call in enqueue.call_args_list for session_id in call.args[0]]
+        self.assertEqual(queued, session_ids)
+        self.assertEqual(clients[0].get(f"/api/sessions/sessions/{session_ids[0]}/result/").data["status"], "grading")
+
+        queue.enqueue(queued)
+        queue.join()
+        for i, (client, session_id) in enumerate(zip(clients, session_ids)):
+            res = client.get(f"/api/sessions/sessions/{session_id}/result/")
+            self.assertEqual((res.data["status"], res.data["score"]), ("graded", i % 3))
+
+    def test_workers_grade_queued_sessions_in_batches(self):
+        clients = [self.client_for(f"student{i}") for i in range(6)]
+        session_ids = [self.start_and_answer(client, i % 3) for i, client in enumerate(clients)]
+        UserQuizSession.objects.filter(id__in=session_ids).update(is_submitted=True)
+
+        with mock.patch.object(grading_queue, "grade_sessions", wraps=grading_queue.grade_sessions) as grade:
+            queue = grading_queue.get_queue()
+            queue.enqueue(session_ids)
+            queue.join()
+        self.assertEqual(sum(len(call.args[0]) for call in grade.call_args_list), 6)
+        self.assertEqual(
+            dict(UserQuizSession.objects.filter(id__in=session_ids).values_list("id", "score")),
+            {session_id: i % 3 for i, session_id in enumerate(session_ids)},
+        )
+        stats = QuizStats.objects.get(quiz=self.quiz)
+        self.assertEqual((stats.submissions, stats.score_sum), (6, 6))
+
+    def test_grade_worker_requeues_pending_sessions(self):
+        client = self.client_for("student")
+        session_id = self.start_and_answer(client, 2)
+        # 워커가 처리하지 못한 채 남은 제출 세션
+        UserQuizSession.objects.filter(id=session_id).update(is_submitted=True)
+        self.assertEqual(client.get(f"/api/sessions/sessions/{session_id}/result/").data["status"], "grading")
+
+        out = io.StringIO()
+        call_command("grade_worker", "--pending", stdout=out)
+        self.assertIn("1개", out.getvalue())
+        self.assertEqual(UserQuizSession.objects.get(id=session_id).score, 2)
+
+
+class QuizStatsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.grade = Grade.objects.create(name="1학년")
+        self.admin = User.objects.create_superuser(username="admin", password="adminpass")
+        self.quiz = Quiz.objects.create(
+            title="통계 퀴즈", num_questions=2, shuffle_questions=False, shuffle_choices=False,
+            grade=self.grade, created_by=self.admin,
+        )
+        self.choices = {}
+        for text in ("1+1=?", "3-1=?"):
+            question = Question.objects.create(quiz=self.quiz, text=text)
+            self.choices[text] = {
+                c.text: c.id for c in Choice.objects.bulk_create([
+                    Choice(question=question, text=str(i), is_correct=i == 2) for i in range(1, 4)
+                ])
+            }
+        self.q1, self.q2 = Question.objects.filter(quiz=self.quiz).order_by("id").values_list("id", flat=True)
+
+    def submit_as(self, username, picks):
+        user = User.objects.create_user(username=username, password="userpass")
+        UserProfile.objects.create(user=user, grade=self.grade)
+        self.client.force_authenticate(user)
+        session_id = self.client.post(f"/api/sessions/{self.quiz.id}/start/").data["session_id"]
+        for question_id, (text, choice) in zip((self.q1, self.q2), picks):
+            if choice is not None:
+                self.client.patch(f"/api/sessions/sessions/{session_id}/answers/", {
+                    "question_id": question_id, "choice_id": self.choices[text][choice]
+                }, format="json")
+        # 통계는 제출 트랜잭션이 커밋된 뒤 반영됨
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(f"/api/sessions/sessions/{session_id}/submit/")
+
+    def submit_all(self):
+        self.submit_as("s1", [("1+1=?", "2"), ("3-1=?", "2")])
+        self.submit_as("s2", [("1+1=?", "2"), ("3-1=?", "1")])
+        self.submit_as("s3", [("1+1=?", "3"), ("3-1=?", "2")])
+        self.submit_as("s4", [("1+1=?", None), ("3-1=?", None)])
+        self.client.force_authenticate(self.admin)
+
+    def report(self):
+        res = self.client.get(f"/api/sessions/admin/{self.quiz.id}/stats/")
+        self.assertEqual(res.status_code, 200)
+        return res.data
+
+    def test_incremental_stats(self):
+        self.submit_all()
+        with CaptureQueriesContext(connection) as ctx:
+            report = self.report()
+        # answers JSON을 스캔하지 않고 집계 테이블만 조회
+        self.assertFalse(any("quiz_sessions_userquizsession" in q["sql"] for q in ctx.captured_queries))
+
+        self.assertEqual((report["submissions"], report["mean"], report["variance"]), (4, 1.0, 0.5))
+        self.assertEqual(report["histogram"], [
+            {"score": 0, "count": 1}, {"score": 1, "count": 2}, {"score": 2, "count": 1},
+        ])
+        q1 = report["questions"][0]
+        self.assertEqual(
+            (q1["presented"], q1["answered"], q1["correct"], q1["difficulty"], q1["discrimination"]),
+            (4, 3, 2, 0.5, 0.7071),
+        )
+        self.assertEqual({c["text"]: c["picks"] for c in q1["choices"]}, {"1": 0, "2": 2, "3": 1})
+
+    def test_rebuild_matches_incremental_stats(self):
+        self.submit_all()
+        expected = self.report()
+        for model in (QuizScoreBucket, QuestionStats, ChoiceStats, QuizStats):
+            model.objects.all().delete()
+        self.assertEqual(self.report()["submissions"], 0)
+
+        out = io.StringIO()
+        call_command("rebuild_quiz_stats", self.quiz.id, "--chunk-size", "3", stdout=out)
+        self.assertIn("4개 세션 집계", out.getvalue())
+        self.assertEqual(self.report(), expected)
+
+    def submit_pending(self, username, picks):
+        # 제출은 커밋되었지만 커밋 후 집계는 아직 실행되지 않은 상태
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.submit_as(username, picks)
+        return callbacks
+
+    def test_rebuild_does_not_double_count_pending_submit(self):
+        self.submit_as("s1", [("1+1=?", "2"), ("3-1=?", "2")])
+        self.submit_as("s2", [("1+1=?", "2"), ("3-1=?", "1")])
+        self.submit_as("s3", [("1+1=?", "3"), ("3-1=?", "2")])
+        callbacks = self.submit_pending("s4", [("1+1=?", None), ("3-1=?", None)])
+
+        # 재계산이 먼저 세션을 집계했으므로 이후 실행된 커밋 후 집계는 건너뜀
+        self.assertEqual(analytics.rebuild_quiz(self.quiz.id), 4)
+        for callback in callbacks:
+            callback()
+        self.client.force_authenticate(self.admin)
+        expected = self.report()
+        self.assertEqual((expected["submissions"], expected["mean"]), (4, 1.0))
+        analytics.rebuild_quiz(self.quiz.id)
+        self.assertEqual(self.report(), expected)
+
+    def test_submit_recorded_during_rebuild_is_kept(self):
+        self.submit_as("s1", [("1+1=?", "2"), ("3-1=?", "2")])
+        self.submit_as("s2", [("1+1=?", "2"), ("3-1=?", "1")])
+        self.submit_as("s3", [("1+1=?", "3"), ("3-1=?", "2")])
+        callbacks = self.submit_pending("s4", [("1+1=?", None), ("3-1=?", None)])
+        aggregate_sessions = analytics._aggregate_sessions
+
+        def record_then_aggregate(*args):
+            # 재계산이 세션을 읽기 전에 커밋 후 집계가 실행됨
+            for callback in callbacks:
+                callback()
+            return aggregate_sessions(*args)
+
+        with mock.patch.object(analytics, "_aggregate_sessions", side_effect=record_then_aggregate):
+            self.assertEqual(analytics.rebuild_quiz(self.quiz.id, chunk_size=2), 4)
+        self.client.force_authenticate(self.admin)
+        report = self.report()
+        self.assertEqual((report["submissions"], report["mean"]), (4, 1.0))
+        self.assertEqual(report["questions"][0]["presented"], 4)
+
+    def test_stats_failure_does_not_fail_submit(self):
+        with mock.patch.object(analytics, "record_sessions", side_effect=RuntimeError("집계 실패")):
+            with self.assertLogs(level="ERROR"):
+                res = self.submit_as("s1", [("1+1=?", "2"), ("3-1=?", "2")])
+        # 집계는 제출 트랜잭션 밖에서 실행되므로 제출/채점은 그대로 커밋됨
+        self.assertEqual((res.status_code, res.data["score"]), (200, 2))
+        self.assertTrue(UserQuizSession.objects.get(id=res.data["session_id"]).is_submitted)
+        self.assertFalse(QuizStats.objects.filter(quiz=self.quiz).exists())
+
+    def test_stats_requires_admin(self):
+        self.submit_all()
+        self.client.force_authenticate(User.objects.get(username="s1"))
+        self.assertEqual(self.client.get(f"/api/sessions/admin/{self.quiz.id}/stats/").status_code, 403)
+
+
+class AsyncExamViewTestCase(APITestCase):
+    """ASGI(ASYNC_VIEWS=True)에서 사용하는 응시 경로 비동기 뷰"""
+
+    def setUp(self):
+        cache.clear()
+        self.grade = Grade.objects.create(name="1학년")
+        admin = User.objects.create_superuser(username="admin", password="adminpass")
+        self.user = User.objects.create_user(username="student", password="userpass")
+        UserProfile.objects.create(user=self.user, grade=self.grade)
+        self.quiz = Quiz.objects.create(
+            title="비동기 퀴즈", num_questions=2, shuffle_questions=False, shuffle_choices=False,
+            grade=self.grade, created_by=admin,
+        )
+        self.correct = []
+        for text in ("1+1=?", "3-1=?"):
+            question = Question.objects.create(quiz=self.quiz, text=text)
+            choices = Choice.objects.bulk_create([
+                Choice(question=question, text=str(i), is_correct=i == 2) for i in range(1, 4)
+            ])
+            self.correct.append((question.id, choices[1].id))
+        self.factory = AsyncRequestFactory()
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def call(self, view, method, path, data=None, token=None, headers=None, **kwargs):
+        headers = dict(headers or {})
+        if token is not False:
+            headers["Authorization"] = f"Bearer {token or self.token}"
+        if method == "get":
+            request = self.factory.get(path, headers=headers)
+        else:
+            request = getattr(self.factory, method)(
+                path, data=json.dumps(data or {}), content_type="application/json", headers=headers
+            )
+        return await view.as_view()(request, **kwargs)
+
+    async def start(self):
+        return await self.call(
+            AsyncStartQuizSessionView, "post", f"/api/sessions/{self.quiz.id}/start/", quiz_id=self.quiz.id
+        )
+
+    def test_async_views_setting_selects_exam_views(self):
+        def view_class(path):
+            importlib.reload(session_urls)
+            clear_url_caches()
+            return resolve(path, urlconf=session_urls).func.view_class
+
+        path = f"/{self.quiz.id}/start/"
+        try:
+            with override_settings(ASYNC_VIEWS=True):
+                self.assertIs(view_class(path), AsyncStartQuizSessionView)
+        finally:
+            self.assertIs(view_class(path), StartQuizSessionView)
+
+    async def test_exam_flow(self):
+        self.assertTrue(AsyncSaveAnswerView.view_is_async)
+
+        res = await self.start()
+        self.assertEqual(res.status_code, 201)
+        session_id = res.data["session_id"]
+        res = await self.start()
+        self.assertEqual((res.status_code, res.data["session_id"]), (200, session_id))
+
+        path = f"/api/sessions/sessions/{session_id}/"
+        for question_id, choice_id in self.correct:
+            res = await self.call(
+                AsyncSaveAnswerView, "patch", path + "answers/",
+                {"question_id": question_id, "choice_id": choice_id}, session_id=session_id,
+            )
+            self.assertEqual(res.data, {"status": "saved"})
+
+        res = await self.call(AsyncUserQuizSessionDetailView, "get", path, pk=session_id)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["answers"], {str(q): c for q, c in self.correct})
+        self.assertEqual([q["id"] for q in res.data["questions"]], [q for q, _ in self.correct])
+
+        headers = {"Idempotency-Key": "submit-1"}
+        res = await self.call(AsyncSubmitQuizSessionView, "post", path + "submit/", headers=headers, session_id=session_id)
+        self.assertEqual((res.status_code, res.data["score"]), (200, 2))
+        replay = await self.call(AsyncSubmitQuizSessionView, "post", path + "submit/", headers=headers, session_id=session_id)
+        self.assertEqual((replay.status_code, replay["Idempotent-Replayed"]), (200, "true"))
+        res = await self.call(AsyncSubmitQuizSessionView, "post", path + "submit/", session_id=session_id)
+        self.assertEqual(res.status_code, 400)
+
+        session = await UserQuizSession.objects.aget(id=session_id)
+        self.assertEqual((session.is_submitted, session.score), (True, 2))
+
+    async def test_auth_and_validation(self):
+        res = await self.start()
+        session_id = res.data["session_id"]
+        path = f"/api/sessions/sessions/{session_id}/"
+
+        res = await self.call(AsyncUserQuizSessionDetailView, "get", path, token=False, pk=session_id)
+        self.assertEqual(res.status_code, 401)
+
+        other = await User.objects.acreate(username="other")
+        res = await self.call(
+            AsyncUserQuizSessionDetailView, "get", path, token=str(AccessToken.for_user(other)), pk=session_id
+        )
+        self.assertEqual(res.status_code, 404)
+
+        question_id, _ = self.correct[0]
+        res = await self.call(
+            AsyncSaveAnswerView, "patch", path + "answers/",
+            {"question_id": question_id, "choice_id": self.correct[1][1]}, session_id=session_id,
+        )
+        self.assertEqual(res.data, {"detail": "문제에 속하지 않은 선택지입니다."})
+        res = await self.call(AsyncSaveAnswerView, "patch", path + "answers/", {"question_id": question_id}, session_id=session_id)
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("choice_id", res.data)
+
+
+class ArchiveSessionsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.grade = Grade.objects.create(name="1학년")
+        self.admin = User.objects.create_superuser(username="admin", password="adminpass")
+        self.quiz = Quiz.objects.create(title="보관 퀴즈", num_questions=1, grade=self.grade, created_by=self.admin)
+        question = Question.objects.create(quiz=self.quiz, text="1+1=?")
+        choices = Choice.objects.bulk_create([
+            Choice(question=question, text=str(i), is_correct=i == 2) for i in range(1, 4)
+        ])
+        self.users = []
+        for username in ("old1", "old2", "old3", "recent"):
+            user = User.objects.create_user(username=username, password="userpass")
+            UserProfile.objects.create(user=user, grade=self.grade)
+            self.users.append(user)
+
+        def session(user, started_at, **fields):
+            created = UserQuizSession.objects.create(
+                user=user, quiz=self.quiz, question_order=[question.id],
+                choice_order={str(question.id): [c.id for c in choices]}, answers={str(question.id): choices[1].id},
+                **fields,
+            )
+            # started_at은 auto_now_add라 생성 후 변경
+            UserQuizSession.objects.filter(id=created.id).update(started_at=started_at)
+            return created.id
+
+        self.old_ids = [
+            session(self.users[0], "2024-01-15T09:00:00+09:00", is_submitted=True),
+            session(self.users[1], "2024-01-31T23:30:00+00:00", is_submitted=True),
+            session(self.users[2], "2024-03-01T00:00:00+00:00", is_submitted=True),
+        ]
+        self.kept_ids = [
+            # 채점 전 / 미제출 / 최근 세션은 보관하지 않음
+            session(self.users[0], "2024-01-15T00:00:00+00:00", is_submitted=True, score=None),
+            session(self.users[1], "2024-01-15T00:00:00+00:00"),
+            session(self.users[3], timezone.now(), is_submitted=True),
+        ]
+        UserQuizSession.objects.filter(id=self.kept_ids[0]).update(score=None)
+
+    def archive(self, *args):
+        out = io.StringIO()
+        call_command("archive_sessions", "--before", "2025-01-01", *args, stdout=out)
+        return out.getvalue()
+
+    def test_moves_old_graded_sessions_in_chunks(self):
+        before = {s.id: s for s in UserQuizSession.objects.filter(id__in=self.old_ids)}
+        self.assertIn("보관 대상 세션 3개", self.archive("--dry-run"))
+        self.assertFalse(ArchivedQuizSession.objects.exists())
+
+        self.archive("--chunk-size", "2")
+        self.assertEqual(sorted(UserQuizSession.objects.values_list("id", flat=True)), sorted(self.kept_ids))
+        archived = {s.id: s for s in ArchivedQuizSession.objects.all()}
+        self.assertEqual(sorted(archived), sorted(self.old_ids))
+        for session_id, live in before.items():
+            for field in ("user_id", "quiz_id", "question_order", "choice_order", "answers",
+                          "is_submitted", "score", "started_at", "submitted_at"):
+                self.assertEqual(getattr(archived[session_id], field), getattr(live, field), field)
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = %s::regclass ORDER BY 1",
+                    [ArchivedQuizSession._meta.db_table],
+                )
+                partitions = [row[0] for row in cursor.fetchall()]
+            # 월 경계는 UTC 기준
+            self.assertEqual(partitions, [
+                "quiz_sessions_archivedquizsession_p2024_01", "quiz_sessions_archivedquizsession_p2024_03",
+            ])
+
+        # 다시 실행해도 옮길 세션이 없음
+        self.assertIn("0개 중 0개", self.archive())
+
+    def test_archived_sessions_stay_readable(self):
+        self.archive()
+        self.client.force_authenticate(self.admin)
+        url = f"/api/sessions/admin/{self.quiz.id}/sessions/"
+        live = self.client.get(url)
+        self.assertEqual([r["id"] for r in live.data["results"]], sorted(self.kept_ids))
+        archived = self.client.get(url + "?archived=true")
+        self.assertEqual([r["id"] for r in archived.data["results"]], sorted(self.old_ids))
+        self.assertEqual(set(archived.data["results"][0]), set(live.data["results"][0]))
+
+        # 보관된 세션만 있는 사용자도 제출한 퀴즈로 표시
+        self.client.force_authenticate(self.users[2])
+        res = self.client.get("/api/sessions/my_list/")
+        self.assertEqual({q["id"]: q["is_submitted"] for q in res.data["results"]}, {self.quiz.id: True})
+
+    def test_rebuild_stats_includes_archived_sessions(self):
+        self.archive()
+        self.assertEqual(analytics.rebuild_quiz(self.quiz.id), 4)
+        self.assertEqual(QuizStats.objects.get(quiz=self.quiz).submissions, 4)
+
+        # FK 제약이 없어도 퀴즈 삭제 시 함께 삭제
+        self.quiz.delete()
+        self.assertFalse(ArchivedQuizSession.objects.exists())
+
+    def test_regrade_and_export_include_archived_sessions(self):
+        self.archive()
+        # 시그널을 거치지 않고 정답을 "1"로 수정
+        Choice.objects.filter(question__quiz=self.quiz).update(is_correct=False)
+        Choice.objects.filter(question__quiz=self.quiz, text="1").update(is_correct=True)
+
+        progress = list(regrade.iter_regrade(self.quiz.id, chunk_size=2))
+        self.assertEqual({k: progress[-1][k] for k in ("total", "processed", "changed")},
+                         {"total": 5, "processed": 5, "changed": 5})
+        self.assertEqual(set(ArchivedQuizSession.objects.values_list("score", flat=True)), {0})
+        stats = QuizStats.objects.get(quiz=self.quiz)
+        self.assertEqual((stats.submissions, stats.score_sum), (5, 0))
+
+        self.client.force_authenticate(self.admin)
+        res = self.client.get(f"/api/sessions/admin/{self.quiz.id}/sessions/export/")
+        rows = [json.loads(line) for line in b"".join(res.streaming_content).decode().splitlines()]
+        self.assertEqual([row["id"] for row in rows], sorted(self.old_ids) + sorted(self.kept_ids))
+
+
+class CompactSessionOrdersTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        orders._local.clear()
+        orders._decoded.clear()
+        self.grade = Grade.objects.create(name="1학년")
+        self.admin = User.objects.create_superuser(username="admin", password="adminpass")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiz = Quiz.objects.create(
+                title="압축 퀴즈", num_questions=4, shuffle_questions=True, shuffle_choices=True,
+                grade=self.grade, created_by=self.admin,
+            )
+            for i in range(6):
+                question = Question.objects.create(quiz=self.quiz, text=f"문제 {i}")
+                Choice.objects.bulk_create([
+                    Choice(question=question, text=str(j), is_correct=j == 2) for j in range(1, 5)
+                ])
+        self.users = []
+        for i in range(8):
+            user = User.objects.create_user(username=f"student{i}", password="userpass")
+            UserProfile.objects.create(user=user, grade=self.grade)
+            self.users.append(user)
+
+    def stored_orders(self):
+        return {
+            session_id: (question_order, choice_order)
+            for session_id, question_order, choice_order in
+            UserQuizSession.objects.values_list("id", "question_order", "choice_order")
+        }
+
+    def convert(self, to):
+        call_command("convert_session_orders", "--to", to, "--chunk-size", "3", stdout=io.StringIO())
+        # 다른 프로세스에서 읽는 경우처럼 구성 스냅샷을 DB에서 다시 읽음
+        cache.clear()
+        orders._local.clear()
+        orders._decoded.clear()
+
+    def test_converted_sessions_regenerate_identical_orders(self):
+        for user in self.users:
+            StartQuizSessionView.create_session(user, self.quiz)
+        before = self.stored_orders()
+        self.assertGreater(len({tuple(q) for q, _ in before.values()}), 1)
+
+        self.convert("compact")
+        self.assertFalse(UserQuizSession.objects.filter(question_order__isnull=False).exists())
+        self.assertEqual(QuizLayout.objects.filter(quiz=self.quiz).count(), 1)
+        for session in UserQuizSession.objects.all():
+            self.assertEqual(orders.session_orders(session), before[session.id])
+
+        self.convert("json")
+        self.assertFalse(UserQuizSession.objects.filter(order_seed__isnull=False).exists())
+        self.assertEqual(self.stored_orders(), before)
+
+    def test_sessions_that_no_longer_match_the_quiz_stay_json(self):
+        random.seed(3)
+        changed, _ = StartQuizSessionView.create_session(self.users[0], self.quiz)
+        kept, _ = StartQuizSessionView.create_session(self.users[1], self.quiz)
+        # 출제된 문제에 선택지가 추가된 세션은 현재 구성으로 표현할 수 없음
+        added_to = next(qid for qid in changed.question_order if qid not in kept.question_order)
+        Choice.objects.create(question_id=added_to, text="5")
+        self.convert("compact")
+        self.assertEqual(list(UserQuizSession.objects.filter(order_seed__isnull=True).values_list("id", flat=True)), [changed.id])
+        self.assertEqual(orders.session_orders(UserQuizSession.objects.get(id=kept.id)),
+                         (kept.question_order, kept.choice_order))
+
+    @override_settings(COMPACT_SESSION_ORDERS=True)
+    def test_compact_session_exam_flow(self):
+        self.client.force_authenticate(self.users[0])
+        session_id = self.client.post(f"/api/sessions/{self.quiz.id}/start/").data["session_id"]
+        session = UserQuizSession.objects.get(id=session_id)
+        self.assertIsNone(session.question_order)
+        self.assertIsNone(session.choice_order)
+        self.assertEqual(session.quiz_version, 1)
+        question_order, choice_order = orders.session_orders(session)
+
+        res = self.client.get(f"/api/sessions/sessions/{session_id}/")
+        self.assertEqual([q["id"] for q in res.data["questions"]], question_order)
+        for question in res.data["questions"]:
+            self.assertEqual([c["id"] for c in question["choices"]], choice_order[str(question["id"])])
+
+        unused = next(qid for qid in Question.objects.filter(quiz=self.quiz).values_list("id", flat=True)
+                      if qid not in question_order)
+        res = self.client.patch(f"/api/sessions/sessions/{session_id}/answers/", {
+            "question_id": unused, "choice_id": Choice.objects.filter(question_id=unused).first().id
+        }, format="json")
+        self.assertEqual(res.status_code, 400)
+        for qid in question_order:
+            correct = Choice.objects.get(question_id=qid, is_correct=True).id
+            self.client.patch(f"/api/sessions/sessions/{session_id}/answers/", {
+                "question_id": qid, "choice_id": correct
+            }, format="json")
+        res = self.client.post(f"/api/sessions/sessions/{session_id}/submit/")
+        self.assertEqual(res.data["score"], 4)
+
+    @override_settings(COMPACT_SESSION_ORDERS=True)
+    def test_quiz_changes_create_new_layout_version(self):
+        first, _ = StartQuizSessionView.create_session(self.users[0], self.quiz)
+        before = orders.session_orders(first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            question = Question.objects.create(quiz=self.quiz, text="새 문제")
+            Choice.objects.create(question=question, text="1", is_correct=True)
+        second, _ = StartQuizSessionView.create_session(self.users[1], self.quiz)
+        self.assertEqual(second.quiz_version, 2)
+
+        # 이미 시작한 세션은 이전 구성 스냅샷으로 같은 순서를 유지
+        cache.clear()
+        orders._local.clear()
+        orders._decoded.clear()
+        self.assertEqual(orders.session_orders(UserQuizSession.objects.get(id=first.id)), before)
+
+    @override_settings(COMPACT_SESSION_ORDERS=True)
+    def test_decoded_orders_are_shared_across_session_instances(self):
+        session, _ = StartQuizSessionView.create_session(self.users[0], self.quiz)
+        orders._decoded.clear()
+        with mock.patch.object(orders, "decode", wraps=orders.decode) as decode:
+            first = orders.session_orders(UserQuizSession.objects.get(id=session.id))
+            second = orders.session_orders(UserQuizSession.objects.get(id=session.id))
+        self.assertEqual(decode.call_count, 1)
+        self.assertIs(first, second)
+
+        with mock.patch.object(orders, "DECODED_MAX_ORDERS", 1):
+            other, _ = StartQuizSessionView.create_session(self.users[1], self.quiz)
+            orders.session_orders(other)
+        self.assertEqual(list(orders._decoded), [(self.quiz.id, other.quiz_version, other.order_seed)])
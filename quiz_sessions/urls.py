@@ -1,21 +1,45 @@
 # quiz_sessions/urls.py
+from django.conf import settings
 from django.urls import path
 from .views import (
     StartQuizSessionView,
     SubmitQuizSessionView,
+    QuizSessionResultView,
     SaveAnswerView,
+    SaveAnswerBatchView,
     UserQuizSessionDetailView,
     MyQuizStatusListView,
     AdminQuizSessionListView,
+    AdminQuizSessionExportView,
+    AdminQuizRegradeView,
+    AdminQuizStatsView,
     PaginatedSessionQuestionView,
 )
 
+from .async_views import (
+    AsyncStartQuizSessionView,
+    AsyncSubmitQuizSessionView,
+    AsyncSaveAnswerView,
+    AsyncUserQuizSessionDetailView,
+)
+
+# ASGI 배포(ASYNC_VIEWS): 응시 경로는 이벤트 루프에서 실행되는 비동기 뷰로 처리
+start_view = AsyncStartQuizSessionView if settings.ASYNC_VIEWS else StartQuizSessionView
+submit_view = AsyncSubmitQuizSessionView if settings.ASYNC_VIEWS else SubmitQuizSessionView
+save_answer_view = AsyncSaveAnswerView if settings.ASYNC_VIEWS else SaveAnswerView
+session_detail_view = AsyncUserQuizSessionDetailView if settings.ASYNC_VIEWS else UserQuizSessionDetailView
+
 urlpatterns = [
-    path('<int:quiz_id>/start/', StartQuizSessionView.as_view(), name='quiz-start'),
-    path('sessions/<int:session_id>/submit/', SubmitQuizSessionView.as_view(), name='quiz-submit'),
-    path('sessions/<int:session_id>/answers/', SaveAnswerView.as_view(), name='quiz-answer-save'),
-    path('sessions/<int:pk>/', UserQuizSessionDetailView.as_view(), name='quiz-session-detail'),
+    path('<int:quiz_id>/start/', start_view.as_view(), name='quiz-start'),
+    path('sessions/<int:session_id>/submit/', submit_view.as_view(), name='quiz-submit'),
+    path('sessions/<int:session_id>/result/', QuizSessionResultView.as_view(), name='quiz-session-result'),
+    path('sessions/<int:session_id>/answers/', save_answer_view.as_view(), name='quiz-answer-save'),
+    path('sessions/<int:session_id>/answers/batch/', SaveAnswerBatchView.as_view(), name='quiz-answer-batch-save'),
+    path('sessions/<int:pk>/', session_detail_view.as_view(), name='quiz-session-detail'),
     path('sessions/<int:session_id>/questions/', PaginatedSessionQuestionView.as_view(), name='quiz-session-paged-questions'),
     path('my_list/', MyQuizStatusListView.as_view(), name='my-quiz-status'),
     path('admin/<int:quiz_id>/sessions/', AdminQuizSessionListView.as_view(), name='admin-quiz-sessions'),
+    path('admin/<int:quiz_id>/sessions/export/', AdminQuizSessionExportView.as_view(), name='admin-quiz-sessions-export'),
+    path('admin/<int:quiz_id>/stats/', AdminQuizStatsView.as_view(), name='admin-quiz-stats'),
+    path('admin/<int:quiz_id>/regrade/', AdminQuizRegradeView.as_view(), name='admin-quiz-regrade'),
 ]
@@ -1,23 +1,37 @@
+import json
+
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework import permissions, status, generics
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework_extensions.cache.mixins import CacheResponseMixin
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db import models
+from django.db import transaction, IntegrityError
 from django.db.models import Q
-from quizzes.models import Quiz, Question
-from .models import UserQuizSession
+from django.utils import timezone
+from core.db_routing import ReplicaReadMixin
+from quizzes.models import Quiz
+from . import analytics, exports, idempotency, orders, status_cache
+from .models import UserQuizSession, ArchivedQuizSession
+from .answer_buffer import get_buffer as get_answer_buffer
+from .answers import ANSWER_CHECK_FIELDS, validate_answer, save_answers, save_latest_answers
+from .grading import grade_session
+from .grading_queue import get_queue as get_grading_queue
+from .papers import get_paper, store_paper
+from .regrade import start_job as start_regrade_job
 from .serializers import (
     UserQuizSessionSerializer,
+    ArchivedQuizSessionSerializer,
     UserQuizSessionDetailSerializer,
     QuestionDetailSerializer,
     SaveAnswerSerializer,
-    QuizStatusSerializer, SubmitAnswerSerializer
+    SaveAnswerBatchSerializer,
+    QuizStatusSerializer, SubmitAnswerSerializer,
+    RegradeSerializer,
 )
-import random
 
 
 class Pagination(PageNumberPagination):
@@ -34,17 +48,20 @@ class StartQuizSessionView(APIView):
         operation_description="사용자가 퀴즈 응시를 시작합니다. 세션이 생성되고, 문제/선택지가 랜덤으로 배치됩니다.",
         responses={
             201: openapi.Response(description="세션 생성", examples={"application/json": {"session_id": 1}}),
-            400: "학년 정보 없음 또는 접근 불가"
-        }
+            400: "학년 정보 없음 또는 접근 불가",
+            409: "같은 Idempotency-Key 요청 처리 중"
+        },
+        manual_parameters=[idempotency.header_parameter]
     )
+    @idempotency.idempotent
     def post(self, request, quiz_id):
         user = request.user
         profile = getattr(user, 'profile', None)
 
-        if not profile or not profile.grade:
+        if not profile or not profile.grade_id:
             return Response({"detail": "학년 정보가 없습니다."}, status=status.HTTP_400_BAD_REQUEST)
 
-        if not Quiz.objects.filter(Q(grade__isnull=True) | Q(grade=profile.grade), id=quiz_id).exists():
+        if not Quiz.objects.filter(Q(grade__isnull=True) | Q(grade_id=profile.grade_id), id=quiz_id).exists():
             return Response({"detail": "학년에 맞는 퀴즈가 아닙니다."}, status=status.HTTP_400_BAD_REQUEST)
 
         quiz = get_object_or_404(Quiz, id=quiz_id)
@@ -53,26 +70,27 @@ class StartQuizSessionView(APIView):
         if existing:
             return Response({'session_id': existing.id}, status=status.HTTP_200_OK)
 
-        questions = list(quiz.questions.all())
-        if quiz.shuffle_questions:
-            random.shuffle(questions)
-        questions = questions[:quiz.num_questions]
-        question_order = [q.id for q in questions]
-
-        choice_order = {}
-        for question in questions:
-            choices = list(question.choices.all())
-            if quiz.shuffle_choices:
-                random.shuffle(choices)
-            choice_order[question.id] = [c.id for c in choices]
-
-        session = UserQuizSession.objects.create(
-            user=user,
-            quiz=quiz,
-            question_order=question_order,
-            choice_order=choice_order,
+        session, created = self.create_session(user, quiz)
+        return Response(
+            {'session_id': session.id}, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
         )
-        return Response({'session_id': session.id}, status=status.HTTP_201_CREATED)
+
+    @staticmethod
+    def create_session(user, quiz):
+        """문제를 추출해 세션을 만들고 시험지를 캐시. (세션, 새로 만들었는지)를 반환"""
+        order_fields = orders.new_order_fields(quiz)
+
+        try:
+            with transaction.atomic():
+                session = UserQuizSession.objects.create(user=user, quiz=quiz, **order_fields)
+        except IntegrityError:
+            # 동시에 들어온 다른 요청이 먼저 세션을 만든 경우 (미제출 세션 유일 제약)
+            existing = UserQuizSession.objects.filter(user=user, quiz=quiz, is_submitted=False).first()
+            if existing is None:
+                raise
+            return existing, False
+        store_paper(session)
+        return session, True
 
 
 class SubmitQuizSessionView(APIView):
@@ -81,38 +99,104 @@ class SubmitQuizSessionView(APIView):
     @swagger_auto_schema(
         request_body=SubmitAnswerSerializer,
         operation_summary="퀴즈 제출",
-        operation_description="퀴즈 제출 후 자동 채점 및 결과 저장",
+        operation_description=(
+            "퀴즈 제출 후 자동 채점 및 결과 저장. "
+            "비동기 채점 모드(GRADING_QUEUE_BACKEND)에서는 202와 함께 score가 null로 반환되며, 결과 API로 점수를 조회합니다."
+        ),
         responses={
             200: openapi.Response(description="제출 완료", examples={
                 "application/json": {"session_id": 1, "score": 5, "submitted_at": "2024-01-01T12:00:00Z"}
             }),
-            400: "이미 제출된 세션"
-        }
+            202: openapi.Response(description="제출 완료, 채점 대기", examples={
+                "application/json": {"session_id": 1, "score": None, "submitted_at": "2024-01-01T12:00:00Z"}
+            }),
+            400: "이미 제출된 세션",
+            409: "같은 Idempotency-Key 요청 처리 중"
+        },
+        manual_parameters=[idempotency.header_parameter]
     )
+    @idempotency.idempotent
     def post(self, request, session_id):
-        session = get_object_or_404(UserQuizSession, id=session_id, user=request.user)
-        if session.is_submitted:
-            return Response({'detail': '이미 제출된 세션입니다.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        correct = 0
-        for q_id_str, selected_cid in session.answers.items():
-            try:
-                question = Question.objects.get(id=int(q_id_str))
-                correct_choice = question.choices.filter(is_correct=True).first()
-                if correct_choice and correct_choice.id == selected_cid:
-                    correct += 1
-            except Question.DoesNotExist:
-                continue
-
-        session.score = correct
-        session.is_submitted = True
-        session.save(update_fields=["score", "is_submitted", "submitted_at"])
+        return self.submit(request, session_id)
+
+    @staticmethod
+    def submit(request, session_id):
+        buffer = get_answer_buffer()
+        grading_queue = get_grading_queue()
+        buffered = None
+        try:
+            with transaction.atomic():
+                session = get_object_or_404(
+                    UserQuizSession.objects.select_for_update(), id=session_id, user=request.user
+                )
+                if session.is_submitted:
+                    return Response({'detail': '이미 제출된 세션입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+                # 답안 버퍼를 닫고 아직 DB에 반영되지 않은 답안을 함께 채점
+                if buffer is not None:
+                    buffered = buffer.close(session.id)
+                    session.answers.update(buffered)
+                    # 제출이 커밋된 뒤에만 버퍼에서 지움
+                    transaction.on_commit(lambda: buffer.discard(session.id, buffered), robust=True)
+
+                if grading_queue is None:
+                    session.score = grade_session(session)
+                else:
+                    # 채점은 워커에 맡기고 커밋된 뒤에 큐에 넣음
+                    transaction.on_commit(lambda: grading_queue.enqueue([session.id]))
+                session.is_submitted = True
+                session.submitted_at = timezone.now()
+                update_fields = ["score", "is_submitted", "submitted_at"]
+                if buffered:
+                    update_fields.append("answers")
+                session.save(update_fields=update_fields, grade=grading_queue is None)
+                if grading_queue is None:
+                    # 통계는 커밋 후 반영 (제출 트랜잭션에서 퀴즈 통계 행 잠금을 기다리지 않음)
+                    analytics.record_after_commit([session])
+        except Exception:
+            if buffered is not None:
+                buffer.reopen(session.id)
+            raise
 
         return Response({
             'session_id': session.id,
             'score': session.score,
             'submitted_at': session.submitted_at
-        }, status=status.HTTP_200_OK)
+        }, status=status.HTTP_200_OK if grading_queue is None else status.HTTP_202_ACCEPTED)
+
+
+class QuizSessionResultView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="퀴즈 채점 결과",
+        operation_description="제출한 세션의 점수를 조회합니다. 비동기 채점 중이면 status가 grading이고 score는 null입니다.",
+        responses={
+            200: openapi.Response(description="채점 결과", examples={
+                "application/json": {
+                    "session_id": 1, "status": "graded", "score": 5, "submitted_at": "2024-01-01T12:00:00Z"
+                }
+            }),
+            404: "세션 없음"
+        }
+    )
+    def get(self, request, session_id):
+        session = get_object_or_404(
+            UserQuizSession.objects.only('id', 'is_submitted', 'score', 'submitted_at'),
+            id=session_id, user=request.user,
+        )
+        if not session.is_submitted:
+            result_status = 'in_progress'
+        elif session.score is None:
+            result_status = 'grading'
+        else:
+            result_status = 'graded'
+        return Response({
+            'session_id': session.id,
+            'status': result_status,
+            'score': session.score,
+            'submitted_at': session.submitted_at,
+        })
 
 
 class SaveAnswerView(APIView):
@@ -131,21 +215,101 @@ class SaveAnswerView(APIView):
         serializer = SaveAnswerSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        session = get_object_or_404(UserQuizSession, id=session_id, user=request.user)
+        question_id = serializer.validated_data['question_id']
+        choice_id = serializer.validated_data['choice_id']
+
+        session = get_object_or_404(
+            UserQuizSession.objects.only(*ANSWER_CHECK_FIELDS), id=session_id, user=request.user
+        )
         if session.is_submitted:
             return Response({'detail': '이미 제출된 세션입니다.'}, status=400)
+        error = validate_answer(session, question_id, choice_id)
+        if error:
+            return Response({'detail': error}, status=400)
+
+        answer = {str(question_id): choice_id}
+        buffer = get_answer_buffer()
+        if buffer is not None:
+            # 버퍼 모드: 답안은 버퍼에 기록 (DB 반영은 flush/제출 시점)
+            saved = buffer.put(session.id, answer)
+        else:
+            saved = save_answers(session.id, answer)
+        if not saved:
+            return Response({'detail': '이미 제출된 세션입니다.'}, status=400)
+        return Response({'status': 'saved'}, status=200)
 
-        question_id = str(request.data.get('question_id'))
-        choice_id = request.data.get('choice_id')
 
-        if question_id and choice_id:
-            session.answers[question_id] = choice_id
-            session.save(update_fields=['answers'])
-            return Response({'status': 'saved'}, status=200)
-        return Response({'detail': '입력 오류'}, status=400)
+class SaveAnswerBatchView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=SaveAnswerBatchSerializer,
+        operation_summary="퀴즈 답안 일괄 저장",
+        operation_description="여러 답안을 한 번에 저장합니다. 항목별 처리 결과(saved/superseded/invalid)를 반환합니다. "
+                              "seq가 있으면 이전 요청에서 같은 문제에 더 큰 seq가 반영된 항목은 superseded로 건너뜁니다.",
+        responses={
+            200: openapi.Response(description="저장 완료", examples={"application/json": {
+                "status": "saved",
+                "results": [{"question_id": 1, "choice_id": 5, "seq": 3, "status": "saved"}]
+            }}),
+            400: "입력 오류 또는 제출된 세션"
+        }
+    )
+    def post(self, request, session_id):
+        serializer = SaveAnswerBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
 
+        session = get_object_or_404(
+            UserQuizSession.objects.only(*ANSWER_CHECK_FIELDS), id=session_id, user=request.user
+        )
+        if session.is_submitted:
+            return Response({'detail': '이미 제출된 세션입니다.'}, status=400)
 
-class UserQuizSessionDetailView(generics.RetrieveAPIView):
+        items = serializer.validated_data['answers']
+        results = [dict(item, status='saved') for item in items]
+        # 같은 문제는 순번(없으면 요청 내 순서)이 가장 늦은 답안만 반영
+        latest = {}
+        for index, item in enumerate(items):
+            error = validate_answer(session, item['question_id'], item['choice_id'])
+            if error:
+                results[index].update(status='invalid', detail=error)
+                continue
+            order = (item.get('seq', -1), index)
+            previous = latest.get(item['question_id'])
+            if previous is not None and previous[0] > order:
+                results[index]['status'] = 'superseded'
+                continue
+            if previous is not None:
+                results[previous[1]]['status'] = 'superseded'
+            latest[item['question_id']] = (order, index)
+
+        answers = {str(qid): items[index]['choice_id'] for qid, (_, index) in latest.items()}
+        # 순번이 있는 답안은 이전 요청에서 반영된 순번과도 비교 (요청이 순서가 바뀌어 도착한 경우)
+        seqs = {
+            str(qid): items[index]['seq'] for qid, (_, index) in latest.items() if 'seq' in items[index]
+        }
+        if answers:
+            buffer = get_answer_buffer()
+            stale = set()
+            if seqs:
+                if buffer is not None:
+                    saved, stale = buffer.put_latest(session.id, answers, seqs)
+                else:
+                    saved, stale = save_latest_answers(session.id, answers, seqs)
+            elif buffer is not None:
+                saved = buffer.put(session.id, answers)
+            else:
+                saved = save_answers(session.id, answers)
+            if not saved:
+                return Response({'detail': '이미 제출된 세션입니다.'}, status=400)
+            for qid in stale:
+                results[latest[int(qid)][1]].update(
+                    status='superseded', detail='더 늦은 순번의 답안이 이미 저장되어 있습니다.'
+                )
+        return Response({'status': 'saved', 'results': results}, status=200)
+
+
+class UserQuizSessionDetailView(ReplicaReadMixin, generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = UserQuizSessionDetailSerializer
 
@@ -166,53 +330,166 @@ class UserQuizSessionDetailView(generics.RetrieveAPIView):
             return UserQuizSession.objects.none()
         return UserQuizSession.objects.filter(user=self.request.user)
 
+    def get_object(self):
+        session = super().get_object()
+        # 버퍼에만 있고 아직 DB에 반영되지 않은 답안도 함께 보여줌
+        buffer = get_answer_buffer()
+        if buffer is not None and not session.is_submitted:
+            session.answers.update(buffer.peek(session.id))
+        return session
+
 
-class MyQuizStatusListView(CacheResponseMixin, generics.ListAPIView):
+class MyQuizStatusListView(ReplicaReadMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = QuizStatusSerializer
     pagination_class = Pagination
+    # 목록은 status_cache에서 조회하며, queryset은 스키마 생성용
+    queryset = Quiz.objects.none()
 
     @swagger_auto_schema(operation_summary="내 퀴즈 목록", responses={200: QuizStatusSerializer(many=True)})
-    def get_queryset(self):
-        user = self.request.user
-        profile = getattr(user, 'profile', None)
-
-        if not profile or not profile.grade:
-            return Quiz.objects.none()
-
-        return Quiz.objects.filter(
-            models.Q(grade__isnull=True) |
-            models.Q(grade=profile.grade)
-        ).order_by('-created_at')
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        if getattr(self, 'swagger_fake_view', False):
-            return context
-        user = self.request.user
-        session_map = {
-            s.quiz_id: s.is_submitted
-            for s in UserQuizSession.objects.filter(user=user)
-        }
-        context['session_map'] = session_map
-        return context
+    def list(self, request, *args, **kwargs):
+        profile = getattr(request.user, 'profile', None)
+        if not profile or not profile.grade_id:
+            quizzes = []
+        else:
+            # 학년별 퀴즈 목록과 사용자별 제출 여부를 각각 캐시해서 조합
+            quizzes = status_cache.get_grade_quizzes(profile.grade_id)
+        page = self.paginate_queryset(quizzes)
+        # 현재 페이지의 퀴즈에 대해서만 제출 여부를 조회
+        session_map = status_cache.get_submission_map(request.user.id, [quiz['id'] for quiz in page])
+        results = [dict(quiz, is_submitted=session_map.get(quiz['id'], False)) for quiz in page]
+        return self.get_paginated_response(results)
+
+
+class SessionCursorPagination(CursorPagination):
+    # OFFSET 없이 id 기준 keyset으로 조회해 뒤쪽 페이지도 일정한 속도
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = 'id'
 
 
-class AdminQuizSessionListView(CacheResponseMixin, generics.ListAPIView):
+class AdminQuizSessionListView(ReplicaReadMixin, CacheResponseMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAdminUser]
     serializer_class = UserQuizSessionSerializer
-    pagination_class = Pagination
+    pagination_class = SessionCursorPagination
 
-    @swagger_auto_schema(operation_summary="퀴즈별 응시 세션 조회 (관리자)", responses={200: UserQuizSessionSerializer(many=True)})
+    @swagger_auto_schema(
+        operation_summary="퀴즈별 응시 세션 조회 (관리자)",
+        manual_parameters=[
+            openapi.Parameter(
+                'archived', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN,
+                description="true이면 보관된(archive_sessions) 세션을 조회 (읽기 전용)",
+            ),
+        ],
+        responses={200: UserQuizSessionSerializer(many=True)},
+    )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
+    def is_archived(self):
+        return self.request.query_params.get('archived', '').lower() in ('true', '1')
+
+    def get_serializer_class(self):
+        return ArchivedQuizSessionSerializer if self.is_archived() else UserQuizSessionSerializer
+
     def get_queryset(self):
         quiz_id = self.kwargs['quiz_id']
-        return UserQuizSession.objects.filter(quiz_id=quiz_id).order_by("id")
+        model = ArchivedQuizSession if self.is_archived() else UserQuizSession
+        return model.objects.filter(quiz_id=quiz_id).only(*UserQuizSessionSerializer.Meta.fields).order_by("id")
+
+
+class AdminQuizSessionExportView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="퀴즈별 응시 세션 내보내기 (관리자)",
+        operation_description="퀴즈의 전체 응시 세션을 NDJSON 또는 CSV로 스트리밍합니다.",
+        manual_parameters=[
+            openapi.Parameter('file_format', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=exports.FORMATS),
+        ],
+    )
+    def get(self, request, quiz_id):
+        file_format = request.query_params.get('file_format', 'ndjson')
+        if file_format not in exports.FORMATS:
+            return Response({'detail': '지원하지 않는 파일 형식입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if file_format == 'csv':
+            response = StreamingHttpResponse(exports.iter_csv(quiz_id), content_type='text/csv; charset=utf-8')
+        else:
+            response = StreamingHttpResponse(exports.iter_ndjson(quiz_id), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="quiz-{quiz_id}-sessions.{file_format}"'
+        return response
+
+
+class AdminQuizRegradeView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        request_body=RegradeSerializer,
+        operation_summary="퀴즈 재채점 (관리자)",
+        operation_description=(
+            "정답 수정 후 퀴즈의 제출된 세션을 모두 다시 채점합니다. "
+            "재채점은 요청과 분리된 작업으로 실행되어 연결이 끊겨도 끝까지 진행됩니다. "
+            "chunk마다 누적 진행 상황을 NDJSON 한 줄로 스트리밍하며, 마지막 줄은 done: true 입니다 (실패 시 error 포함)."
+        ),
+        responses={
+            200: openapi.Response(description="진행 상황 (NDJSON)", examples={"application/x-ndjson": {
+                "total": 3, "processed": 3, "changed": 2, "increased": 1, "decreased": 1, "points_delta": 0,
+                "done": True
+            }}),
+            404: "퀴즈 없음"
+        }
+    )
+    def post(self, request, quiz_id):
+        get_object_or_404(Quiz.objects.only('id'), id=quiz_id)
+        serializer = RegradeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        updates = start_regrade_job(quiz_id, **serializer.validated_data)
+
+        def stream():
+            # 스트림이 중단되어도 작업 스레드의 재채점은 계속됨
+            while True:
+                progress = updates.get()
+                yield json.dumps(progress) + "\n"
+                if progress.get('done'):
+                    return
+
+        return StreamingHttpResponse(stream(), content_type='application/x-ndjson')
 
 
-class PaginatedSessionQuestionView(generics.ListAPIView):
+class AdminQuizStatsView(ReplicaReadMixin, APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="퀴즈 통계 (관리자)",
+        operation_description=(
+            "제출/채점 시 누적된 집계로 점수 분포(히스토그램, 평균, 분산)와 "
+            "문항별 난이도(정답률), 변별도(점이연 상관계수), 선택지별 응답 수를 반환합니다."
+        ),
+        responses={
+            200: openapi.Response(description="퀴즈 통계", examples={"application/json": {
+                "quiz_id": 1, "submissions": 2, "mean": 1.5, "variance": 0.25, "stddev": 0.5,
+                "histogram": [{"score": 1, "count": 1}, {"score": 2, "count": 1}],
+                "questions": [{
+                    "question_id": 1, "text": "1+1=?", "presented": 2, "answered": 2, "correct": 1,
+                    "difficulty": 0.5, "discrimination": 1.0,
+                    "choices": [{"choice_id": 1, "text": "2", "is_correct": True, "picks": 1, "pick_rate": 0.5}]
+                }]
+            }}),
+            404: "퀴즈 없음"
+        }
+    )
+    def get(self, request, quiz_id):
+        get_object_or_404(Quiz.objects.only('id'), id=quiz_id)
+        return Response(analytics.quiz_report(quiz_id))
+
+
+class PaginatedSessionQuestionView(ReplicaReadMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = QuestionDetailSerializer
     pagination_class = Pagination
@@ -221,17 +498,10 @@ class PaginatedSessionQuestionView(generics.ListAPIView):
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
-    def get_queryset(self):
-        session_id = self.kwargs['session_id']
-        session = get_object_or_404(UserQuizSession, id=session_id, user=self.request.user)
-        self.session = session
-        question_ids = session.question_order
-        question_qs = list(Question.objects.filter(id__in=question_ids))
-        return sorted(question_qs, key=lambda q: question_ids.index(q.id))
-
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        if getattr(self, 'swagger_fake_view', False):
-            return context
-        context['session'] = self.session
-        return context
+    def list(self, request, *args, **kwargs):
+        # 세션 시작 시 만들어 둔 시험지 스냅샷을 페이지 단위로 잘라서 반환
+        page = self.paginate_queryset(get_paper(self.get_session()))
+        return self.get_paginated_response(page)
+
+    def get_session(self):
+        return get_object_or_404(UserQuizSession, id=self.kwargs['session_id'], user=self.request.user)
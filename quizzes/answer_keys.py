@@ -0,0 +1,102 @@
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Choice
+
+# 퀴즈별 정답표 {question_id: 정답 choice_id} 캐시.
+# Redis(CACHES['default'])에 버전 토큰과 정답표를 두고, 프로세스 내부에도 (버전, 정답표)를 보관한다.
+# 퀴즈/문제/선택지가 바뀌면 버전 토큰을 새로 발급해 두 계층을 모두 무효화한다.
+
+LOCAL_MAX_QUIZZES = 1024
+
+_local = {}
+_lock = threading.Lock()
+_stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def _timeout():
+    return getattr(settings, 'ANSWER_KEY_CACHE_TIMEOUT', 60 * 60)
+
+
+def _version_key(quiz_id):
+    return f"quiz:{quiz_id}:answer_key:version"
+
+
+def _data_key(quiz_id, version):
+    return f"quiz:{quiz_id}:answer_key:{version}"
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+def content_version(quiz_id):
+    """퀴즈 내용(문제/선택지)이 바뀔 때마다 새로 발급되는 버전 토큰"""
+    version = cache.get(_version_key(quiz_id))
+    if version is None:
+        # 버전이 만료/유실된 경우 새 토큰을 발급 (동시 발급 시 먼저 들어간 값을 사용)
+        cache.add(_version_key(quiz_id), uuid.uuid4().hex, _timeout())
+        version = cache.get(_version_key(quiz_id))
+    return version
+
+
+async def acontent_version(quiz_id):
+    """content_version의 비동기 버전"""
+    version = await cache.aget(_version_key(quiz_id))
+    if version is None:
+        await cache.aadd(_version_key(quiz_id), uuid.uuid4().hex, _timeout())
+        version = await cache.aget(_version_key(quiz_id))
+    return version
+
+
+def load_from_db(quiz_id):
+    # 문제당 정답은 uniq_correct_choice_per_question 제약으로 하나만 존재
+    rows = (
+        Choice.objects
+        .filter(question__quiz_id=quiz_id, is_correct=True)
+        .values_list('question_id', 'id')
+    )
+    return dict(rows)
+
+
+def get_answer_key(quiz_id):
+    version = content_version(quiz_id)
+
+    local = _local.get(quiz_id)
+    if local is not None and local[0] == version:
+        _count('local_hits')
+        return local[1]
+
+    answer_key = cache.get(_data_key(quiz_id, version))
+    if answer_key is not None:
+        _count('shared_hits')
+    else:
+        _count('misses')
+        answer_key = load_from_db(quiz_id)
+        cache.set(_data_key(quiz_id, version), answer_key, _timeout())
+
+    if len(_local) >= LOCAL_MAX_QUIZZES:
+        _local.clear()
+    _local[quiz_id] = (version, answer_key)
+    return answer_key
+
+
+def invalidate(quiz_id):
+    cache.set(_version_key(quiz_id), uuid.uuid4().hex, _timeout())
+    _local.pop(quiz_id, None)
+    _count('invalidations')
+
+
+def stats():
+    with _lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    with _lock:
+        for name in _stats:
+            _stats[name] = 0
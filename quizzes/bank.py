@@ -0,0 +1,173 @@
+import csv
+import json
+
+from .models import Question, Choice
+from .serializers import QuestionSerializer, bulk_create_questions
+
+# 문제은행 가져오기/내보내기 (NDJSON, CSV)
+#
+# NDJSON: 한 줄에 문제 하나
+#   {"text": "1+1=?", "choices": [{"text": "2", "is_correct": true}, ...]}
+#   내보내기의 첫 줄은 {"quiz": {...}} 헤더이며 가져오기 시 무시됨
+# CSV: 한 줄에 선택지 하나. 같은 question_id(없으면 question_text)가 연속된 행이 한 문제
+#   question_id,question_text,choice_id,choice_text,is_correct
+
+FORMATS = ['ndjson', 'csv']
+CSV_HEADER = ['question_id', 'question_text', 'choice_id', 'choice_text', 'is_correct']
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y', 'o'}
+
+
+def guess_format(filename, default='ndjson'):
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return default
+
+
+class FileDecodeError(ValueError):
+    """UTF-8이 아닌 업로드 파일 (CP949/Latin-1 등으로 저장된 CSV)"""
+
+    def __init__(self, line_no):
+        super().__init__("UTF-8로 읽을 수 없는 파일입니다. UTF-8 인코딩으로 저장한 뒤 다시 업로드하세요.")
+        self.line_no = line_no
+
+
+def _text_lines(uploaded_file):
+    # 업로드 파일을 통째로 읽지 않고 줄 단위로 디코딩 (UTF-8 멀티바이트 문자에는 줄바꿈 바이트가 없음)
+    for line_no, line in enumerate(uploaded_file, start=1):
+        try:
+            yield line.decode('utf-8-sig' if line_no == 1 else 'utf-8')
+        except UnicodeDecodeError:
+            raise FileDecodeError(line_no) from None
+
+
+def iter_ndjson_rows(uploaded_file):
+    """(줄 번호, 문제 dict 또는 None, 파싱 오류) 를 순서대로 반환"""
+    for line_no, line in enumerate(_text_lines(uploaded_file), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"JSON 형식 오류: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "각 줄은 JSON 객체여야 합니다."
+            continue
+        if 'quiz' in row and 'text' not in row:
+            continue
+        yield line_no, {'text': row.get('text'), 'choices': row.get('choices')}, None
+
+
+def iter_csv_rows(uploaded_file):
+    reader = csv.DictReader(_text_lines(uploaded_file))
+    current_key, current, start_line = None, None, None
+    for row in reader:
+        line_no = reader.line_num
+        key = (row.get('question_id') or '').strip() or row.get('question_text')
+        if current is None or key != current_key:
+            if current is not None:
+                yield start_line, current, None
+            current_key, start_line = key, line_no
+            current = {'text': row.get('question_text'), 'choices': []}
+        current['choices'].append({
+            'text': row.get('choice_text'),
+            'is_correct': (row.get('is_correct') or '').strip().lower() in TRUE_VALUES,
+        })
+    if current is not None:
+        yield start_line, current, None
+
+
+def import_questions(quiz, uploaded_file, file_format, chunk_size=500, max_errors=100):
+    """
+    업로드 파일의 문제를 chunk_size 단위로 검증/저장.
+    검증은 QuestionSerializer(validate_choices 포함) 규칙을 그대로 사용.
+    반환: (저장된 문제 수, 오류 수, [{'line': n, 'errors': ...}, ...] 최대 max_errors개)
+    """
+    rows = iter_csv_rows(uploaded_file) if file_format == 'csv' else iter_ndjson_rows(uploaded_file)
+    imported, error_count, errors = 0, 0, []
+    chunk = []
+
+    def record_error(line_no, detail):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < max_errors:
+            errors.append({'line': line_no, 'errors': detail})
+
+    try:
+        for line_no, data, parse_error in rows:
+            if parse_error:
+                record_error(line_no, parse_error)
+                continue
+            serializer = QuestionSerializer(data=data)
+            if not serializer.is_valid():
+                record_error(line_no, serializer.errors)
+                continue
+            chunk.append(serializer.validated_data)
+            if len(chunk) >= chunk_size:
+                imported += len(bulk_create_questions(quiz, chunk))
+                chunk = []
+    except FileDecodeError as e:
+        # 파일 단위 오류: 이후 줄은 읽을 수 없으므로 행 오류와 같은 형식으로 하나만 기록하고 중단
+        record_error(e.line_no, str(e))
+        return imported, error_count, errors
+    if chunk:
+        imported += len(bulk_create_questions(quiz, chunk))
+    return imported, error_count, errors
+
+
+def iter_question_chunks(quiz, chunk_size=500):
+    """id 기준 keyset 방식으로 (문제, [선택지...]) 목록을 chunk 단위로 반환"""
+    last_id = 0
+    while True:
+        questions = list(
+            Question.objects.filter(quiz=quiz, id__gt=last_id).order_by('id')[:chunk_size]
+        )
+        if not questions:
+            return
+        choices_by_question = {}
+        for choice in Choice.objects.filter(question__in=questions).order_by('id'):
+            choices_by_question.setdefault(choice.question_id, []).append(choice)
+        yield [(q, choices_by_question.get(q.id, [])) for q in questions]
+        last_id = questions[-1].id
+
+
+def iter_ndjson_export(quiz, chunk_size=500):
+    yield json.dumps({'quiz': {
+        'id': quiz.id,
+        'title': quiz.title,
+        'description': quiz.description,
+        'num_questions': quiz.num_questions,
+        'shuffle_questions': quiz.shuffle_questions,
+        'shuffle_choices': quiz.shuffle_choices,
+        'grade': quiz.grade_id,
+    }}, ensure_ascii=False) + '\n'
+    for chunk in iter_question_chunks(quiz, chunk_size):
+        yield ''.join(
+            json.dumps({
+                'id': question.id,
+                'text': question.text,
+                'choices': [
+                    {'id': c.id, 'text': c.text, 'is_correct': c.is_correct} for c in choices
+                ],
+            }, ensure_ascii=False) + '\n'
+            for question, choices in chunk
+        )
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def iter_csv_export(quiz, chunk_size=500):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for chunk in iter_question_chunks(quiz, chunk_size):
+        yield ''.join(
+            writer.writerow([question.id, question.text, c.id, c.text, 'true' if c.is_correct else 'false'])
+            for question, choices in chunk
+            for c in choices
+        )
@@ -0,0 +1,86 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from quizzes.models import Quiz, Question, Choice
+from quizzes.serializers import QuizSerializer
+
+
+class _Rollback(Exception):
+    pass
+
+
+def build_payload(num_questions, num_choices):
+    return {
+        'title': f"벤치마크 {num_questions}문제",
+        'description': '',
+        'num_questions': num_questions,
+        'questions': [
+            {
+                'text': f"문제 {i}",
+                'choices': [
+                    {'text': f"선택지 {j}", 'is_correct': j == 0}
+                    for j in range(num_choices)
+                ],
+            }
+            for i in range(num_questions)
+        ],
+    }
+
+
+def create_row_by_row(payload, user):
+    # 기존 QuizSerializer.create 방식 (행마다 INSERT) - 비교용
+    data = dict(payload)
+    questions_data = data.pop('questions')
+    quiz = Quiz.objects.create(created_by=user, **data)
+    for q in questions_data:
+        question = Question.objects.create(quiz=quiz, text=q['text'])
+        for c in q['choices']:
+            Choice.objects.create(question=question, **c)
+
+
+def create_bulk(payload, user):
+    serializer = QuizSerializer(data=payload)
+    serializer.is_valid(raise_exception=True)
+    serializer.save(created_by=user)
+
+
+class Command(BaseCommand):
+    help = "퀴즈 생성(QuizSerializer.create)의 INSERT 수와 소요 시간을 측정합니다. 모든 데이터는 롤백됩니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, nargs='+', default=[10, 100, 500, 2000])
+        parser.add_argument('--choices', type=int, default=5)
+        parser.add_argument('--compare', action='store_true', help="행 단위 INSERT 방식과 비교")
+
+    def handle(self, *args, **options):
+        strategies = [('bulk', create_bulk)]
+        if options['compare']:
+            strategies.append(('row_by_row', create_row_by_row))
+
+        self.stdout.write(f"{'strategy':<12}{'questions':>10}{'choices':>9}{'inserts':>9}{'queries':>9}{'ms':>10}")
+        for num_questions in options['questions']:
+            payload = build_payload(num_questions, options['choices'])
+            for name, create in strategies:
+                inserts, queries, elapsed = self.measure(create, payload)
+                self.stdout.write(
+                    f"{name:<12}{num_questions:>10}{options['choices']:>9}{inserts:>9}{queries:>9}{elapsed * 1000:>10.1f}"
+                )
+
+    def measure(self, create, payload):
+        try:
+            with transaction.atomic():
+                user = User.objects.create(username='__bench_quiz_authoring__')
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    create(payload, user)
+                    elapsed = time.perf_counter() - started
+                raise _Rollback
+        except _Rollback:
+            pass
+        queries = ctx.captured_queries
+        inserts = sum(1 for q in queries if q['sql'].lstrip().upper().startswith('INSERT'))
+        return inserts, len(queries), elapsed
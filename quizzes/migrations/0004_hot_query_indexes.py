@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def keep_single_correct_choice(apps, schema_editor):
+    # 채점은 정답이 여러 개면 id가 가장 작은 선택지를 정답으로 사용했으므로 나머지는 오답으로 정리
+    Choice = apps.get_model('quizzes', 'Choice')
+    duplicates = (
+        Choice.objects.filter(is_correct=True)
+        .values('question_id')
+        .annotate(first_id=models.Min('id'), count=models.Count('id'))
+        .filter(count__gt=1)
+    )
+    for row in duplicates:
+        Choice.objects.filter(
+            question_id=row['question_id'], is_correct=True, id__gt=row['first_id']
+        ).update(is_correct=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_delete_classroom'),
+        ('quizzes', '0003_remove_quiz_classroom'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_single_correct_choice, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['grade', '-created_at'], name='quiz_grade_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='choice',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_correct', True)), fields=('question',), name='uniq_correct_choice_per_question'),
+        ),
+    ]
@@ -13,6 +13,12 @@ class Quiz(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_quizzes')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # 내 퀴즈 목록: 학년별 최신순 조회
+            models.Index(fields=['grade', '-created_at'], name='quiz_grade_created_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -28,5 +34,15 @@ class Choice(models.Model):
     text = models.CharField(max_length=255)
     is_correct = models.BooleanField(default=False)
 
+    class Meta:
+        constraints = [
+            # 문제당 정답은 하나. 채점 시 정답표 조회(question_id, is_correct=True)에도 사용되는 부분 인덱스
+            models.UniqueConstraint(
+                fields=['question'],
+                condition=models.Q(is_correct=True),
+                name='uniq_correct_choice_per_question',
+            ),
+        ]
+
     def __str__(self):
-        return self.text
\ No newline at end of file
+        return self.text
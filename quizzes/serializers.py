@@ -1,13 +1,33 @@
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from . import answer_keys
 from .models import Quiz, Question, Choice
 
+
+def bulk_create_questions(quiz, questions_data):
+    """검증된 문제/선택지 데이터를 문제 1회, 선택지 1회의 bulk INSERT로 저장"""
+    questions = Question.objects.bulk_create([
+        Question(quiz=quiz, text=q['text']) for q in questions_data
+    ])
+    Choice.objects.bulk_create([
+        Choice(question=question, text=c['text'], is_correct=c.get('is_correct', False))
+        for question, q in zip(questions, questions_data)
+        for c in q['choices']
+    ])
+    return questions
+
+
 class ChoiceSerializer(serializers.ModelSerializer):
+    # 수정(PUT) 시 기존 선택지를 식별하기 위해 id를 입력으로도 받음
+    id = serializers.IntegerField(required=False)
+
     class Meta:
         model = Choice
         fields = ['id', 'text', 'is_correct']
 
 class QuestionSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
     choices = ChoiceSerializer(many=True)
 
     class Meta:
@@ -30,18 +50,91 @@ class QuizSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'description', 'num_questions', 'shuffle_questions', 'shuffle_choices', 'created_by', 'created_at', 'questions', 'grade']
         read_only_fields = ['created_by', 'created_at']
 
+    @transaction.atomic
     def create(self, validated_data):
         questions_data = validated_data.pop('questions', [])
         quiz = Quiz.objects.create(**validated_data)
-        for q in questions_data:
-            choices_data = q.pop('choices')
-            question = Question.objects.create(quiz=quiz, **q)
-            for c in choices_data:
-                Choice.objects.create(question=question, **c)
+        bulk_create_questions(quiz, questions_data)
+        transaction.on_commit(lambda: answer_keys.invalidate(quiz.id))
         return quiz
 
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        questions_data = validated_data.pop('questions', None)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save()
+        # questions를 보내지 않은 경우(부분 수정 등) 문제는 그대로 유지
+        if questions_data is not None:
+            self._apply_question_diff(instance, questions_data)
+            transaction.on_commit(lambda: answer_keys.invalidate(instance.id))
+        return instance
+
+    def _apply_question_diff(self, quiz, questions_data):
+        existing_questions = {q.id: q for q in quiz.questions.all()}
+        existing_choices = {}
+        for c in Choice.objects.filter(question__quiz=quiz):
+            existing_choices.setdefault(c.question_id, {})[c.id] = c
+
+        new_questions = []
+        questions_to_update = []
+        choices_to_create = []
+        choices_to_update = []
+        kept_choice_ids = set()
+        demoted_choice_ids = []
+        for q in questions_data:
+            question = existing_questions.get(q.get('id')) if q.get('id') is not None else None
+            if q.get('id') is not None and question is None:
+                raise ValidationError({'questions': f"퀴즈에 속하지 않은 문제입니다: {q['id']}"})
+            if question is None:
+                new_questions.append(q)
+                continue
+
+            question.text = q['text']
+            questions_to_update.append(question)
+            current = existing_choices.get(question.id, {})
+            for c in q['choices']:
+                choice = current.get(c.get('id')) if c.get('id') is not None else None
+                if c.get('id') is not None and choice is None:
+                    raise ValidationError({'questions': f"문제에 속하지 않은 선택지입니다: {c['id']}"})
+                if choice is None:
+                    choices_to_create.append(
+                        Choice(question=question, text=c['text'], is_correct=c.get('is_correct', False))
+                    )
+                    continue
+                if choice.is_correct and not c.get('is_correct', False):
+                    demoted_choice_ids.append(choice.id)
+                choice.text = c['text']
+                choice.is_correct = c.get('is_correct', False)
+                choices_to_update.append(choice)
+                kept_choice_ids.add(choice.id)
+
+        kept_question_ids = {q.id for q in questions_to_update}
+        removed_question_ids = existing_questions.keys() - kept_question_ids
+        removed_choice_ids = {
+            cid
+            for qid, choices in existing_choices.items() if qid in kept_question_ids
+            for cid in choices if cid not in kept_choice_ids
+        }
+
+        if removed_choice_ids:
+            Choice.objects.filter(id__in=removed_choice_ids).delete()
+        if removed_question_ids:
+            Question.objects.filter(id__in=removed_question_ids).delete()
+        Question.objects.bulk_update(questions_to_update, ['text'])
+        # 문제당 정답 1개 제약은 행 단위로 검사되므로, 정답이 바뀌는 경우 기존 정답을 먼저 해제
+        if demoted_choice_ids:
+            Choice.objects.filter(id__in=demoted_choice_ids).update(is_correct=False)
+        Choice.objects.bulk_update(choices_to_update, ['text', 'is_correct'])
+        Choice.objects.bulk_create(choices_to_create)
+        bulk_create_questions(quiz, new_questions)
+
 
 class QuizListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Quiz
-        fields = ['id', 'title', 'description', 'num_questions', 'shuffle_questions', 'shuffle_choices', 'created_by', 'created_at', 'grade']
\ No newline at end of file
+        fields = ['id', 'title', 'description', 'num_questions', 'shuffle_questions', 'shuffle_choices', 'created_by', 'created_at', 'grade']
+
+class QuizBankImportSerializer(serializers.Serializer):
+    file = serializers.FileField(help_text="NDJSON(.ndjson/.jsonl) 또는 CSV 파일")
+    file_format = serializers.ChoiceField(choices=['ndjson', 'csv'], required=False, help_text="생략 시 파일 확장자로 판단")
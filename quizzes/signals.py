@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import answer_keys
+from .models import Quiz, Question, Choice
+
+# 정답표/내용 버전 무효화는 커밋 후에 실행한다.
+# 커밋 전에 버전을 바꾸면 다른 요청이 아직 보이는 이전 정답으로 캐시를 다시 채우고 다음 변경까지 유지되기 때문.
+# 한 트랜잭션에서 바뀐 퀴즈를 모아 커밋 후 퀴즈마다 한 번씩 무효화한다 (선택지 일괄 삭제 시 행마다 조회하지 않음).
+
+
+class PendingInvalidation:
+    """트랜잭션 하나에서 무효화할 퀴즈/문제 ID를 모아 on_commit에서 실행"""
+
+    def __init__(self):
+        self.quiz_ids = set()
+        self.question_ids = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        if self.question_ids:
+            self.quiz_ids.update(
+                Question.objects.filter(id__in=self.question_ids).values_list('quiz_id', flat=True)
+            )
+        for quiz_id in self.quiz_ids:
+            answer_keys.invalidate(quiz_id)
+
+
+def _pending(using=None):
+    connection = transaction.get_connection(using)
+    if connection.in_atomic_block:
+        # 같은 트랜잭션에 이미 등록된 항목이 있으면 재사용 (롤백된 savepoint의 항목은 Django가 목록에서 제거)
+        for _, func, _ in connection.run_on_commit:
+            if isinstance(func, PendingInvalidation) and not func.done:
+                return func, False
+    return PendingInvalidation(), True
+
+
+def schedule_invalidation(quiz_id=None, question_id=None, using=None):
+    pending, created = _pending(using)
+    if quiz_id is not None:
+        pending.quiz_ids.add(quiz_id)
+    if question_id is not None:
+        pending.question_ids.add(question_id)
+    if created:
+        # 트랜잭션 밖이면 바로 실행
+        transaction.on_commit(pending, using=using)
+
+
+@receiver([post_save, post_delete], sender=Quiz)
+def invalidate_quiz_answer_key(sender, instance, using=None, **kwargs):
+    schedule_invalidation(quiz_id=instance.id, using=using)
+
+
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_question_answer_key(sender, instance, using=None, **kwargs):
+    schedule_invalidation(quiz_id=instance.quiz_id, using=using)
+
+
+@receiver([post_save, post_delete], sender=Choice)
+def invalidate_choice_answer_key(sender, instance, using=None, **kwargs):
+    # 퀴즈/문제와 함께 cascade 삭제되는 경우는 상위 객체의 시그널에서 무효화됨
+    if isinstance(kwargs.get('origin'), (Quiz, Question)):
+        return
+    # 문제 → 퀴즈 조회는 커밋 후 트랜잭션 단위로 한 번만
+    schedule_invalidation(question_id=instance.question_id, using=using)
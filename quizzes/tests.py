@@ -1,6 +1,15 @@
+import csv
+import io
+import json
+
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
-from quizzes.models import Quiz
+from quizzes import answer_keys
+from quizzes.models import Quiz, Question, Choice
 from core.models import Grade
 
 
@@ -124,3 +133,239 @@ class QuizAdminViewSetTest(APITestCase):
         # Delete
         res = self.client.delete("/api/quizzes/admin/quizzes/1/")
         self.assertEqual(res.status_code, 403)
+
+
+class AnswerKeyCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        answer_keys._local.clear()
+        self.admin = User.objects.create_user(username="admin", password="adminpass", is_staff=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiz = Quiz.objects.create(title="정답표 퀴즈", num_questions=1, created_by=self.admin)
+            self.question = Question.objects.create(quiz=self.quiz, text="1+1=?")
+            self.wrong = Choice.objects.create(question=self.question, text="1", is_correct=False)
+            self.right = Choice.objects.create(question=self.question, text="2", is_correct=True)
+        answer_keys.reset_stats()
+
+    def test_answer_key_is_served_from_cache(self):
+        self.assertEqual(answer_keys.get_answer_key(self.quiz.id), {self.question.id: self.right.id})
+        with self.assertNumQueries(0):
+            self.assertEqual(answer_keys.get_answer_key(self.quiz.id), {self.question.id: self.right.id})
+        stats = answer_keys.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["local_hits"], 1)
+
+    def test_shared_cache_is_used_when_local_entry_missing(self):
+        answer_keys.get_answer_key(self.quiz.id)
+        answer_keys._local.clear()
+        with self.assertNumQueries(0):
+            answer_keys.get_answer_key(self.quiz.id)
+        self.assertEqual(answer_keys.stats()["shared_hits"], 1)
+
+    def test_choice_edit_invalidates_answer_key(self):
+        answer_keys.get_answer_key(self.quiz.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.right.is_correct = False
+            self.right.save()
+            self.wrong.is_correct = True
+            self.wrong.save()
+        self.assertEqual(answer_keys.get_answer_key(self.quiz.id), {self.question.id: self.wrong.id})
+
+    def test_question_delete_invalidates_answer_key(self):
+        answer_keys.get_answer_key(self.quiz.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.delete()
+        self.assertEqual(answer_keys.get_answer_key(self.quiz.id), {})
+
+    def test_invalidation_waits_for_commit(self):
+        answer_keys.get_answer_key(self.quiz.id)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.right.is_correct = False
+            self.right.save()
+            self.wrong.is_correct = True
+            self.wrong.save()
+            # 커밋 전에는 이전 정답표를 유지해 다른 요청이 이전 값으로 캐시를 다시 채우지 않음
+            self.assertEqual(answer_keys.get_answer_key(self.quiz.id), {self.question.id: self.right.id})
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertEqual(answer_keys.get_answer_key(self.quiz.id), {self.question.id: self.wrong.id})
+
+    def test_bulk_choice_delete_looks_up_quiz_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            question = Question.objects.create(quiz=self.quiz, text="2+2=?")
+        Choice.objects.bulk_create([Choice(question=question, text=str(i)) for i in range(20)])
+        with self.captureOnCommitCallbacks() as callbacks:
+            with CaptureQueriesContext(connection) as ctx:
+                Choice.objects.filter(question=question).delete()
+        self.assertFalse([q for q in ctx.captured_queries if "quizzes_question" in q["sql"]])
+        with self.assertNumQueries(1):
+            callbacks[0]()
+
+
+class QuizNestedWriteTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="adminpass", is_staff=True, is_superuser=True)
+        res = self.client.post("/api/users/login/", {"username": "admin", "password": "adminpass"}, format="json")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {res.data['access']}")
+
+    def make_payload(self, num_questions):
+        return {
+            "title": "대량 퀴즈",
+            "description": "",
+            "num_questions": num_questions,
+            "questions": [
+                {
+                    "text": f"문제 {i}",
+                    "choices": [
+                        {"text": "A", "is_correct": True},
+                        {"text": "B", "is_correct": False},
+                        {"text": "C", "is_correct": False},
+                    ],
+                }
+                for i in range(num_questions)
+            ],
+        }
+
+    def test_create_uses_constant_number_of_inserts(self):
+        counts = []
+        for num_questions in (2, 20):
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post("/api/quizzes/admin/quizzes/", self.make_payload(num_questions), format="json")
+            self.assertEqual(res.status_code, 201)
+            self.assertEqual(Question.objects.filter(quiz_id=res.data["id"]).count(), num_questions)
+            self.assertEqual(Choice.objects.filter(question__quiz_id=res.data["id"]).count(), num_questions * 3)
+            counts.append(sum(1 for q in ctx.captured_queries if q["sql"].startswith("INSERT")))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_update_applies_nested_diff(self):
+        res = self.client.post("/api/quizzes/admin/quizzes/", self.make_payload(2), format="json")
+        quiz_id = res.data["id"]
+        kept, removed = res.data["questions"]
+        kept_choices = kept["choices"]
+
+        payload = self.make_payload(0)
+        payload["num_questions"] = 2
+        payload["questions"] = [
+            {
+                "id": kept["id"],
+                "text": "수정된 문제",
+                "choices": [
+                    {"id": kept_choices[0]["id"], "text": "A", "is_correct": False},
+                    {"id": kept_choices[1]["id"], "text": "B2", "is_correct": True},
+                    {"text": "D", "is_correct": False},
+                ],
+            },
+            {
+                "text": "새 문제",
+                "choices": [
+                    {"text": "X", "is_correct": True},
+                    {"text": "Y", "is_correct": False},
+                    {"text": "Z", "is_correct": False},
+                ],
+            },
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.put(f"/api/quizzes/admin/quizzes/{quiz_id}/", payload, format="json")
+        self.assertEqual(res.status_code, 200)
+
+        self.assertFalse(Question.objects.filter(id=removed["id"]).exists())
+        self.assertFalse(Choice.objects.filter(id=kept_choices[2]["id"]).exists())
+        self.assertEqual(Question.objects.get(id=kept["id"]).text, "수정된 문제")
+        self.assertEqual(
+            sorted(Choice.objects.filter(question_id=kept["id"]).values_list("text", flat=True)),
+            ["A", "B2", "D"],
+        )
+        self.assertEqual(Question.objects.filter(quiz_id=quiz_id).count(), 2)
+        self.assertEqual(answer_keys.get_answer_key(quiz_id)[kept["id"]], kept_choices[1]["id"])
+
+    def test_update_rejects_foreign_question_id(self):
+        first = self.client.post("/api/quizzes/admin/quizzes/", self.make_payload(1), format="json").data
+        second = self.client.post("/api/quizzes/admin/quizzes/", self.make_payload(1), format="json").data
+        payload = self.make_payload(1)
+        payload["questions"][0]["id"] = first["questions"][0]["id"]
+        res = self.client.put(f"/api/quizzes/admin/quizzes/{second['id']}/", payload, format="json")
+        self.assertEqual(res.status_code, 400)
+        self.assertTrue(Question.objects.filter(id=second["questions"][0]["id"]).exists())
+
+
+class QuizBankImportExportTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="adminpass", is_staff=True, is_superuser=True)
+        self.quiz = Quiz.objects.create(title="문제은행", num_questions=1, created_by=self.admin)
+        res = self.client.post("/api/users/login/", {"username": "admin", "password": "adminpass"}, format="json")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {res.data['access']}")
+
+    def upload(self, name, content, encoding="utf-8"):
+        return self.client.post(
+            f"/api/quizzes/admin/quizzes/{self.quiz.id}/import/",
+            {"file": SimpleUploadedFile(name, content.encode(encoding))},
+            format="multipart",
+        )
+
+    def ndjson_line(self, text, correct_count=1):
+        return json.dumps({
+            "text": text,
+            "choices": [{"text": str(i), "is_correct": i < correct_count} for i in range(3)],
+        }) + "\n"
+
+    def test_import_ndjson(self):
+        res = self.upload("bank.ndjson", "".join(self.ndjson_line(f"문제 {i}") for i in range(5)))
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data["imported"], 5)
+        self.assertEqual(Choice.objects.filter(question__quiz=self.quiz).count(), 15)
+
+    def test_import_reports_row_errors_and_saves_nothing(self):
+        content = self.ndjson_line("정상") + "{broken\n" + self.ndjson_line("정답 2개", correct_count=2)
+        res = self.upload("bank.ndjson", content)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data["error_count"], 2)
+        self.assertEqual([e["line"] for e in res.data["errors"]], [2, 3])
+        self.assertFalse(Question.objects.filter(quiz=self.quiz).exists())
+
+    def test_import_csv(self):
+        content = (
+            "question_id,question_text,choice_id,choice_text,is_correct\n"
+            ",1+1=?,,1,false\n,1+1=?,,2,true\n,1+1=?,,3,false\n"
+            ",2+2=?,,4,true\n,2+2=?,,5,false\n,2+2=?,,6,false\n"
+        )
+        res = self.upload("bank.csv", content)
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data["imported"], 2)
+        self.assertEqual(Choice.objects.get(question__text="1+1=?", is_correct=True).text, "2")
+
+    def test_import_non_utf8_file_returns_validation_error(self):
+        content = (
+            "question_id,question_text,choice_id,choice_text,is_correct\n"
+            ",1+1=?,,1,false\n,1+1=?,,2,true\n"
+            ",한글 문제,,가,true\n,한글 문제,,나,false\n"
+        )
+        res = self.upload("bank.csv", content, encoding="cp949")
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data["error_count"], 1)
+        self.assertEqual(res.data["errors"][0]["line"], 4)
+        self.assertIn("UTF-8", res.data["errors"][0]["errors"])
+        self.assertFalse(Question.objects.filter(quiz=self.quiz).exists())
+
+    def test_import_csv_with_bom(self):
+        content = (
+            "question_id,question_text,choice_id,choice_text,is_correct\n"
+            ",1+1=?,,1,false\n,1+1=?,,2,true\n,1+1=?,,3,false\n"
+        )
+        res = self.upload("bank.csv", content, encoding="utf-8-sig")
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data["imported"], 1)
+
+    def test_export_streams_ndjson_and_csv(self):
+        self.upload("bank.ndjson", "".join(self.ndjson_line(f"문제 {i}") for i in range(3)))
+
+        res = self.client.get(f"/api/quizzes/admin/quizzes/{self.quiz.id}/export/")
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.streaming)
+        lines = [json.loads(line) for line in b"".join(res.streaming_content).decode().splitlines()]
+        self.assertEqual(lines[0]["quiz"]["id"], self.quiz.id)
+        self.assertEqual([q["text"] for q in lines[1:]], ["문제 0", "문제 1", "문제 2"])
+
+        res = self.client.get(f"/api/quizzes/admin/quizzes/{self.quiz.id}/export/?file_format=csv")
+        rows = list(csv.DictReader(io.StringIO(b"".join(res.streaming_content).decode())))
+        self.assertEqual(len(rows), 9)
+        self.assertEqual(sum(r["is_correct"] == "true" for r in rows), 3)
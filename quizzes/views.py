@@ -1,8 +1,16 @@
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from core.db_routing import ReplicaReadMixin
+from . import answer_keys, bank
 from .models import Quiz
-from .serializers import QuizSerializer, QuizListSerializer
+from .serializers import QuizSerializer, QuizListSerializer, QuizBankImportSerializer
 
 
 class IsAdminUser(permissions.BasePermission):
@@ -16,7 +24,7 @@ class Pagination(PageNumberPagination):
     max_page_size = 100
 
 
-class QuizAdminViewSet(viewsets.ModelViewSet):
+class QuizAdminViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Quiz.objects.all()
     serializer_class = QuizSerializer
     permission_classes = [IsAdminUser]
@@ -50,3 +58,51 @@ class QuizAdminViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    @swagger_auto_schema(
+        operation_summary="문제은행 가져오기 (관리자)",
+        operation_description="NDJSON(.ndjson/.jsonl) 또는 CSV 파일의 문제를 퀴즈에 추가합니다. "
+                              "한 행이라도 오류가 있으면 아무것도 저장하지 않고 행별 오류를 반환합니다.",
+        request_body=QuizBankImportSerializer,
+        responses={
+            201: openapi.Response(description="가져오기 완료", examples={"application/json": {"imported": 500}}),
+            400: "파일 없음, UTF-8이 아닌 파일 또는 행별 검증 오류",
+        }
+    )
+    @action(detail=True, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_bank(self, request, pk=None):
+        quiz = self.get_object()
+        serializer = QuizBankImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        uploaded = serializer.validated_data['file']
+        file_format = serializer.validated_data.get('file_format') or bank.guess_format(uploaded.name)
+
+        with transaction.atomic():
+            imported, error_count, errors = bank.import_questions(quiz, uploaded, file_format)
+            if error_count:
+                transaction.set_rollback(True)
+                return Response(
+                    {'imported': 0, 'error_count': error_count, 'errors': errors},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            transaction.on_commit(lambda: answer_keys.invalidate(quiz.id))
+        return Response({'imported': imported}, status=status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(
+        operation_summary="문제은행 내보내기 (관리자)",
+        manual_parameters=[
+            openapi.Parameter('file_format', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=bank.FORMATS),
+        ],
+    )
+    @action(detail=True, methods=['get'], url_path='export')
+    def export_bank(self, request, pk=None):
+        quiz = self.get_object()
+        file_format = request.query_params.get('file_format', 'ndjson')
+        if file_format not in bank.FORMATS:
+            return Response({'detail': '지원하지 않는 파일 형식입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if file_format == 'csv':
+            response = StreamingHttpResponse(bank.iter_csv_export(quiz), content_type='text/csv; charset=utf-8')
+        else:
+            response = StreamingHttpResponse(bank.iter_ndjson_export(quiz), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="quiz-{quiz.id}.{file_format}"'
+        return response
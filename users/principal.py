@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import UserProfile
+
+# 인증된 사용자(principal) 캐시
+# JWT 인증 때마다 User와 프로필(학년)을 DB에서 읽지 않도록 사용자 필드(비밀번호 제외)와
+# 프로필 ID/학년 ID를 AUTH_PRINCIPAL_CACHE_TIMEOUT 동안 캐시한다. User/UserProfile이 저장/삭제되면 signals에서 삭제한다.
+# QuerySet.update()나 학년 삭제(SET_NULL)처럼 시그널이 없는 변경은 만료 시간 안에 반영된다.
+
+USER_FIELDS = [f.attname for f in User._meta.concrete_fields if f.attname != 'password']
+PROFILE_FIELDS = [f.attname for f in UserProfile._meta.concrete_fields]
+
+
+def _timeout():
+    return getattr(settings, 'AUTH_PRINCIPAL_CACHE_TIMEOUT', 60)
+
+
+def _key(user_id):
+    return f"auth:principal:{user_id}"
+
+
+def _set_profile(user, profile):
+    # user.profile 접근 시 쿼리하지 않도록 관계 캐시를 채움 (None이면 프로필 없음)
+    User.profile.related.set_cached_value(user, profile)
+    if profile is not None:
+        UserProfile.user.field.set_cached_value(profile, user)
+
+
+def _build(data):
+    db = User.objects.db
+    # 비밀번호는 지연 필드로 남음 (접근하면 DB에서 읽음, save()는 읽은 필드만 저장)
+    user = User.from_db(db, list(data['user']), list(data['user'].values()))
+    profile = None
+    if data['profile'] is not None:
+        profile = UserProfile.from_db(db, list(data['profile']), list(data['profile'].values()))
+    _set_profile(user, profile)
+    return user
+
+
+def load(user_id):
+    """프로필이 채워진 사용자. 캐시에 없으면 한 번의 쿼리로 읽어 캐시. 없는 사용자면 None"""
+    data = cache.get(_key(user_id))
+    if data is not None:
+        return _build(data)
+
+    user = User.objects.select_related('profile').filter(id=user_id).first()
+    if user is None:
+        return None
+    profile = getattr(user, 'profile', None)
+    cache.set(_key(user_id), {
+        'user': {field: getattr(user, field) for field in USER_FIELDS},
+        'profile': {field: getattr(profile, field) for field in PROFILE_FIELDS} if profile else None,
+    }, _timeout())
+    _set_profile(user, profile)
+    return user
+
+
+async def aget_profile(user):
+    """user.profile (없으면 None). 인증 시 함께 읽어 둔 경우 쿼리 없음"""
+    if User.profile.related.is_cached(user):
+        return getattr(user, 'profile', None)
+    return await UserProfile.objects.filter(user_id=user.id).afirst()
+
+
+def invalidate(user_id):
+    cache.delete(_key(user_id))
+    # 커밋 전에 다른 요청이 이전 값을 다시 캐시할 수 있으므로 커밋 후 한 번 더 삭제
+    transaction.on_commit(lambda: cache.delete(_key(user_id)))
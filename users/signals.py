@@ -0,0 +1,16 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import principal
+from .models import UserProfile
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_principal_on_user_change(sender, instance, **kwargs):
+    principal.invalidate(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_principal_on_profile_change(sender, instance, **kwargs):
+    principal.invalidate(instance.user_id)
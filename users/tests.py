@@ -1,3 +1,6 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from django.contrib.auth.models import User
@@ -64,3 +67,48 @@ class AuthFlowTestCase(APITestCase):
         response = self.client.post(self.refresh_url, {"refresh": refresh_token}, format='json')
         self.assertEqual(response.status_code, 200)
         self.assertIn("access", response.data)
+
+
+class PrincipalCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.grade = Grade.objects.create(name="1학년")
+        self.user = User.objects.create_user(username="student", password="userpass")
+        self.profile = UserProfile.objects.create(user=self.user, grade=self.grade)
+        token = self.client.post(reverse("token_obtain_pair"), {
+            "username": "student", "password": "userpass"
+        }, format="json").data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def auth_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        tables = ("auth_user", "users_userprofile", "core_grade")
+        return response, [q["sql"] for q in ctx.captured_queries if any(t in q["sql"] for t in tables)]
+
+    def test_cached_principal_skips_auth_queries(self):
+        response, queries = self.auth_queries("/api/sessions/my_list/")
+        self.assertEqual(response.status_code, 200)
+        # 첫 요청은 사용자와 프로필을 한 번의 쿼리로 읽음
+        self.assertEqual(len(queries), 1)
+        response, queries = self.auth_queries("/api/sessions/my_list/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+
+    def test_user_and_profile_changes_invalidate_cache(self):
+        self.client.get("/api/sessions/my_list/")
+        other_grade = Grade.objects.create(name="2학년")
+        self.profile.grade = other_grade
+        self.profile.save()
+        self.assertEqual(len(self.auth_queries("/api/sessions/my_list/")[1]), 1)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get("/api/quizzes/admin/quizzes/").status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/api/sessions/my_list/").status_code, 401)
+
+        self.user.delete()
+        self.assertEqual(self.client.get("/api/sessions/my_list/").status_code, 401)